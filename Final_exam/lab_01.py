@@ -2,53 +2,24 @@
 Lab 01: Lexical Analyzer for C Language
 Recognizes: Identifiers, Constants, Comments, White space, Tab, Newline, Punctuation, Operators
 Example input: int sum = a + b * 10;
+Usage: PYTHONPATH=<repo root> python lab_01.py
 """
 
-import re
+from master_lexer import c_lexer
+from source_index import SourceIndex
+
+# Keywords, operators and punctuation are part of the rule set in master_lexer.py.
+# The master pattern is compiled once here, not on every solve_lab_problem() call.
+C_LEXER = c_lexer()
 
 def solve_lab_problem():
     print("=" * 60)
     print("LAB 01: LEXICAL ANALYZER FOR C LANGUAGE")
     print("=" * 60)
     
-
-    keywords = {"int", "float", "char", "double", "if", "else", "while", "for", "return", 
-                "void", "main", "include", "printf", "scanf", "const", "static"}
-    operators = {"=", "+", "-", "*", "/", "==", "!=", "<", ">", "<=", ">=", "&&", "||", 
-                "++", "--", "+=", "-=", "*=", "/=", "%", "!", "&", "|", "^", "~"}
-    punctuation = {";", ",", "(", ")", "{", "}", "[", "]", ".", ":", "?"}
-    
     def lexer(statement):
-       
-        pattern = r'(/\*[\s\S]*?\*/|//.*?$|[A-Za-z_]\w*|\d+\.?\d*|==|!=|<=|>=|\+\+|--|&&|\|\||[+\-*/=<>!&|^~%]|[;,(){}[\].?:]|\s+)'
-        tokens = re.findall(pattern, statement, re.MULTILINE)
-        
-        result = []
-        for tok in tokens:
-            if not tok.strip():  
-                if '\n' in tok:
-                    result.append(("\\n", "Newline"))
-                elif '\t' in tok:
-                    result.append(("\\t", "Tab"))
-                elif tok == ' ':
-                    result.append(("space", "White space"))
-            elif tok.startswith('//') or (tok.startswith('/*') and tok.endswith('*/')):
-                result.append((tok, "Comment"))
-            elif tok in keywords:
-                result.append((tok, "Keyword"))
-            elif tok in operators:
-                result.append((tok, "Operator"))
-            elif tok in punctuation:
-                result.append((tok, "Punctuation"))
-            elif re.fullmatch(r'\d+', tok):
-                result.append((tok, "Integer Constant"))
-            elif re.fullmatch(r'\d+\.\d+', tok):
-                result.append((tok, "Float Constant"))
-            elif re.fullmatch(r'[A-Za-z_]\w*', tok):
-                result.append((tok, "Identifier"))
-            else:
-                result.append((tok, "Invalid"))
-        return result
+        # (lexeme, token type) pairs; C_LEXER.tokenize() gives a TokenBuffer instead
+        return C_LEXER.lex(statement)
 
     
    
@@ -82,6 +53,10 @@ def solve_lab_problem():
         # Summary
         total_tokens = len(output)
         print(f"\nTotal tokens: {total_tokens}")
+        opener = C_LEXER.unterminated_comment(statement)
+        if opener != -1:
+            line, column = SourceIndex(statement).position(opener)
+            print(f"Unterminated comment at line {line}, column {column}")
     
     print("Analysis complete!")
 
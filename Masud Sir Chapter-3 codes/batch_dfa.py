@@ -0,0 +1,78 @@
+# Batch DFA membership with NumPy.
+# Many short strings are packed into one zero-padded uint8 matrix plus a
+# vector of lengths. Every string's state then advances together, one column
+# per step, through fancy indexing into the flat transition table (entries are
+# row offsets, as in CompiledDFA):
+#     states = table[states + classes[:, j]]
+# Strings are sorted by length (longest first) so the strings still running
+# at column j are always a prefix of the batch.
+
+from compiled_dfa import CompiledDFA, from_table
+
+try:
+    import numpy as np
+except ImportError:  # only the batch API needs NumPy
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("batch_dfa needs NumPy: pip install numpy")
+
+
+def pack_strings(strings):
+    """Return (matrix, lengths): a zero-padded uint8 matrix and int64 lengths."""
+    _require_numpy()
+    encoded = [s.encode() if isinstance(s, str) else bytes(s) for s in strings]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    width = int(lengths.max()) if len(encoded) else 0
+    matrix = np.zeros((len(encoded), width), dtype=np.uint8)
+    # row-major order of the mask matches the order of the joined bytes
+    matrix[np.arange(width) < lengths[:, None]] = np.frombuffer(b"".join(encoded), np.uint8)
+    return matrix, lengths
+
+
+class BatchDFA:
+    def __init__(self, dfa):
+        """dfa is a CompiledDFA (see compiled_dfa.from_table / from_regex)."""
+        _require_numpy()
+        self.k = dfa.n_classes
+        self.class_map = np.frombuffer(dfa.class_map, dtype=np.uint8)
+        self.table = np.asarray(dfa.trans, dtype=np.int32)
+        bits = np.unpackbits(np.frombuffer(dfa.accept, dtype=np.uint8), bitorder="little")
+        self.accept = bits[:dfa.n_states].astype(bool)
+        self.start = dfa.start
+
+    def accepts_packed(self, matrix, lengths):
+        """Boolean accept vector for a packed batch."""
+        n = len(lengths)
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+        order = np.argsort(-lengths, kind="stable")
+        ascending = lengths[order[::-1]]
+        width = matrix.shape[1]
+        # running[j]: how many strings are longer than j
+        running = n - np.searchsorted(ascending, np.arange(width), side="right")
+        # class numbers, one contiguous row per column of the input
+        columns = np.ascontiguousarray(self.class_map[matrix[order]].T, dtype=np.int32)
+
+        table = self.table
+        states = np.full(n, self.start * self.k, dtype=np.int32)
+        for j in range(width):
+            active = states[:running[j]]
+            active += columns[j, :running[j]]
+            np.take(table, active, out=active)
+
+        result = np.empty(n, dtype=bool)
+        result[order] = self.accept[states // self.k]
+        return result
+
+    def accepts(self, strings):
+        return self.accepts_packed(*pack_strings(strings))
+
+
+def batch_accepts(dfa, strings, start=None, accept=None):
+    """Accept vector for `strings`; dfa is a CompiledDFA or a dict table."""
+    if not isinstance(dfa, CompiledDFA):
+        dfa = from_table(dfa, start, accept)
+    return BatchDFA(dfa).accepts(strings)
@@ -0,0 +1,53 @@
+# Benchmark: scalar simulate_dfa loop vs NumPy batch membership.
+# DFA: binary strings with an even number of 0's (section 3.6 problem 2).
+# Usage: python bench_batch_dfa.py [number_of_strings]   (default 1000000)
+
+import random
+import sys
+import time
+
+from batch_dfa import BatchDFA, pack_strings
+from compiled_dfa import from_table
+
+dfa_table = {
+    "q0": {"0": "q1", "1": "q0"},
+    "q1": {"0": "q0", "1": "q1"},
+}
+start_state = "q0"
+accept_states = {"q0"}
+
+
+def simulate_dfa(string):
+    state = start_state
+    for ch in string:
+        state = dfa_table[state].get(ch, None)
+        if state is None:
+            return False
+    return state in accept_states
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rnd = random.Random(0)
+    strings = ["".join(rnd.choice("01") for _ in range(rnd.randint(0, 32)))
+               for _ in range(count)]
+
+    start = time.perf_counter()
+    expected = [simulate_dfa(s) for s in strings]
+    scalar_time = time.perf_counter() - start
+
+    batch = BatchDFA(from_table(dfa_table, start_state, accept_states))
+    start = time.perf_counter()
+    matrix, lengths = pack_strings(strings)
+    pack_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = batch.accepts_packed(matrix, lengths)
+    batch_time = time.perf_counter() - start
+
+    assert result.tolist() == expected
+    print(f"{count:,} strings of length 0-32")
+    print(f"scalar loop   {scalar_time:7.2f} s  {count / scalar_time:12,.0f} strings/s")
+    print(f"batch (run)   {batch_time:7.2f} s  {count / batch_time:12,.0f} strings/s"
+          f"  (+ {pack_time:.2f} s packing)")
+    print(f"Speed-up: {scalar_time / batch_time:.1f}x, "
+          f"{scalar_time / (batch_time + pack_time):.1f}x including packing")
@@ -0,0 +1,60 @@
+# Benchmark: set-based NFA simulation vs BitParallelNFA on long inputs.
+# Usage: python bench_bitparallel_nfa.py [size_in_MB]   (default 2)
+
+import random
+import sys
+import time
+
+from bitparallel_nfa import BitParallelNFA
+from regex_nfa import EPSILON, compile_nfa
+
+
+def epsilon_closure(nfa, states):
+    stack = list(states)
+    closure = set(stack)
+    while stack:
+        state = stack.pop()
+        for target in nfa[state].get(EPSILON, []):
+            if target not in closure:
+                closure.add(target)
+                stack.append(target)
+    return closure
+
+
+def simulate_nfa(nfa, string, start, accept):
+    # section 3.7 problem 2
+    states = epsilon_closure(nfa, {start})
+    for ch in string:
+        next_states = set()
+        for s in states:
+            if ch in nfa[s]:
+                next_states.update(nfa[s][ch])
+        states = epsilon_closure(nfa, next_states)
+    return bool(states & accept)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    rnd = random.Random(0)
+    text = "".join(rnd.choice("ab") for _ in range(int(size_mb * 1024 * 1024)))
+
+    cases = [("hand-written (a|b)*ab", {0: {"a": [0, 1], "b": [0]}, 1: {"b": [2]}, 2: {}}, 0, {2})]
+    for pattern in ("(a|b)*ab", "(a|b)*a(a|b){20}"):
+        nfa = compile_nfa(pattern)
+        cases.append((f"Thompson {pattern}", nfa.to_dict(), nfa.start, {nfa.accept}))
+
+    print(f"Input: {len(text) / (1024 * 1024):.1f} MB over {{a, b}}")
+    for name, nfa, start, accept in cases:
+        expected, set_time = timed(lambda: simulate_nfa(nfa, text, start, accept))
+        engine = BitParallelNFA(nfa, start, accept)
+        result, bit_time = timed(lambda: engine.accepts(text))
+        assert result == expected
+        print(f"{name:<28} {len(nfa):>3} states  sets {set_time:6.2f} s  "
+              f"{engine.mode} ({engine.width} bits) {bit_time:6.2f} s  "
+              f"{set_time / bit_time:5.1f}x")
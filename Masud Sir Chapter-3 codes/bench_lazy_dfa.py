@@ -0,0 +1,54 @@
+# Benchmark: full subset construction, set-based NFA simulation, BitParallelNFA
+# and LazyDFA on patterns whose DFA blows up.
+# Usage: python bench_lazy_dfa.py [size_in_MB]   (default 1)
+
+import random
+import sys
+
+from bench_bitparallel_nfa import simulate_nfa, timed
+from bitparallel_nfa import BitParallelNFA
+from lazy_dfa import LazyDFA
+from regex_nfa import compile_nfa
+from subset_construction import subset_construction
+
+FULL_DFA_LIMIT = 12  # build the full DFA only for (a|b)*a(a|b){n} with n <= this
+
+
+def make_inputs(size, rnd):
+    uniform = "".join(rnd.choice("ab") for _ in range(size))
+    # mostly b's with the odd a: few distinct NFA state sets are ever reached
+    sparse = "".join("a" if rnd.random() < 0.01 else "b" for _ in range(size))
+    return [("uniform a/b", uniform), ("1% a", sparse)]
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    rnd = random.Random(0)
+    inputs = make_inputs(int(size_mb * 1024 * 1024), rnd)
+    print(f"Input: {size_mb:.1f} MB per text")
+
+    for n in (10, 20):
+        pattern = f"(a|b)*a(a|b){{{n}}}"
+        compiled = compile_nfa(pattern)
+        nfa, start, accept = compiled.to_dict(), compiled.start, {compiled.accept}
+        print(f"\n{pattern}: {len(nfa)} NFA states")
+        if n <= FULL_DFA_LIMIT:
+            (dfa, _, _), build_time = timed(lambda: subset_construction(nfa, start, accept))
+            print(f"  full subset construction: {len(dfa)} states in {build_time:.2f} s")
+        else:
+            print(f"  full subset construction: skipped (~2^{n + 1} states)")
+
+        bit = BitParallelNFA(nfa, start, accept)
+        for name, text in inputs:
+            expected, set_time = timed(lambda: simulate_nfa(nfa, text, start, accept))
+            _, bit_time = timed(lambda: bit.accepts(text))
+            print(f"  {name:<12} sets {set_time:6.2f} s   bit-parallel {bit_time:6.2f} s")
+            for budget in (1000, 100000):
+                lazy = LazyDFA(nfa, start, accept, max_states=budget)
+                result, lazy_time = timed(lambda: lazy.accepts(text))
+                assert result == expected
+                stats = lazy.stats()
+                print(f"    lazy, {budget:>6} states  {lazy_time:6.2f} s  "
+                      f"{set_time / lazy_time:6.1f}x vs sets  "
+                      f"hit rate {stats['hit_rate']:.4f}  misses {stats['misses']}  "
+                      f"evictions {stats['evictions']}  fallbacks {stats['fallbacks']}")
@@ -0,0 +1,71 @@
+# Benchmark: re against linear_regex on the exercise 3.3 token patterns.
+# Ordinary lexemes first (where re's C backtracker is simply faster), then
+# the inputs that make backtracking blow up: an unterminated comment for
+# /\*.*?\*/ searched at every start (quadratic in re) and a run of a's for
+# (a+)+b (exponential in re). Sizes at which re would take far too long are
+# skipped for re.
+# Usage: python bench_linear_regex.py [lexemes]   (default 100000)
+
+import random
+import re
+import sys
+import time
+
+import linear_regex
+
+RE_LIMIT = 1.0     # stop timing re on a series once one run takes this long
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def lexemes(count, rnd):
+    kinds = (lambda: f"{rnd.randrange(1000)}.{rnd.randrange(1000)}e-{rnd.randrange(20)}",
+             lambda: str(rnd.randrange(10 ** 6)),
+             lambda: "/* " + "x" * rnd.randrange(40) + " */",
+             lambda: "".join(rnd.choice("01") for _ in range(rnd.randrange(1, 30))))
+    return [rnd.choice(kinds)() for _ in range(count)]
+
+
+def series(title, pattern, texts, run, flags=0):
+    print(f"\n{title}: {pattern}")
+    ours = linear_regex.compile(pattern, flags)
+    theirs = re.compile(pattern, flags)
+    re_done = False
+    for label, text in texts:
+        result, linear_time = timed(lambda: run(ours, text))
+        if re_done:
+            print(f"  {label:>12}  re {'skipped':>12}  linear {linear_time * 1e3:9.2f} ms")
+            continue
+        expected, re_time = timed(lambda: run(theirs, text))
+        assert result == expected
+        re_done = re_time > RE_LIMIT
+        print(f"  {label:>12}  re {re_time * 1e3:9.2f} ms  linear {linear_time * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    words = lexemes(count, random.Random(0))
+    print(f"{count} lexemes, fullmatch against each exercise pattern")
+    for pattern, flags in ((r"[0-9]+\.[0-9]+([eE][+-]?[0-9]+)?", 0),
+                           (r"[+-]?[0-9]+", 0),
+                           (r"/\*.*?\*/", re.DOTALL),
+                           (r"[01]*0", 0)):
+        ours = linear_regex.compile(pattern, flags).fullmatch
+        theirs = re.compile(pattern, flags).fullmatch
+        expected, re_time = timed(lambda: [bool(theirs(w)) for w in words])
+        result, linear_time = timed(lambda: [bool(ours(w)) for w in words])
+        assert result == expected
+        print(f"  {pattern:<36} re {re_time:6.3f} s  linear {linear_time:6.3f} s  "
+              f"({linear_time / re_time:.0f}x)")
+
+    spans = lambda p, text: [m.span() for m in p.finditer(text)]
+    series("unterminated comment, finditer", r"/\*.*?\*/",
+           [(f"{n} chars", "/* " * (n // 3)) for n in (3000, 10000, 30000, 100000)],
+           spans, re.DOTALL)
+    series("nested repetition, match", r"(a+)+b",
+           [(f"{n} a's", "a" * n) for n in (16, 20, 22, 24, 26, 1000)],
+           lambda p, text: p.match(text) is not None)
@@ -0,0 +1,55 @@
+# Benchmark: sequential CompiledDFA run vs parallel_final_state on a file.
+# Usage: python bench_parallel_dfa.py [size_in_MB] [max_workers]
+#        (defaults: 64 MB, os.cpu_count())
+# On an N-core machine the parallel time approaches 1/N of the sequential one
+# times the cost of running a chunk from every live state (the "map cost"
+# column: 1.0x when runs merge quickly, up to the number of live states).
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from compiled_dfa import from_regex, from_table
+from parallel_dfa import parallel_final_state, transition_map
+
+even_zeros = from_table({"q0": {"0": "q1", "1": "q0"}, "q1": {"0": "q0", "1": "q1"}},
+                        "q0", {"q0"})
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 64
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    size = int(size_mb * 1024 * 1024)
+    rnd = random.Random(0)
+    block = bytes(rnd.getrandbits(8) & 1 for _ in range(1 << 20))
+    print(f"Input: {size_mb:.0f} MB file, {os.cpu_count()} CPUs")
+
+    cases = [("even number of 0's", even_zeros, b"01"), ("(a|b)*abb", from_regex("(a|b)*abb"), b"ab")]
+    for name, dfa, alphabet in cases:
+        data = block.translate(bytes.maketrans(b"\0\1", alphabet))
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            for _ in range(-(-size // len(data))):
+                f.write(data)
+            f.truncate(size)
+        try:
+            _, one = timed(lambda: dfa.final_state(data))
+            _, mapped = timed(lambda: transition_map(dfa, data))
+            expected, sequential = timed(lambda: parallel_final_state(dfa, f.name, workers=1))
+            print(f"\n{name} ({dfa.n_states} states)  map cost {mapped / one:.1f}x  "
+                  f"sequential {sequential:6.2f} s")
+            workers = 2
+            while workers <= max(max_workers, 2):
+                result, elapsed = timed(lambda: parallel_final_state(dfa, f.name, workers=workers))
+                assert result == expected
+                print(f"  {workers:>3} workers {elapsed:6.2f} s  {sequential / elapsed:5.2f}x")
+                workers *= 2
+        finally:
+            os.unlink(f.name)
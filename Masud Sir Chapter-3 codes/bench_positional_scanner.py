@@ -0,0 +1,90 @@
+# Benchmark: scaling of the old code[index:] slicing loop vs PositionalScanner.
+# Input is generated C with scattered illegal characters (@, $, `).
+# Usage: PYTHONPATH=<repo root> python bench_positional_scanner.py [max_size_in_MB]   (default 50)
+
+import random
+import re
+import sys
+import time
+
+from positional_scanner import PositionalScanner
+
+token_specification = [
+    ("KEYWORD",    r'\b(if|else|while|for|return|int|float|double|char|void)\b'),
+    ("IDENTIFIER", r'[a-zA-Z_][a-zA-Z0-9_]*'),
+    ("NUMBER",     r'\b\d+(\.\d+)?\b'),
+    ("OPERATOR",   r'==|!=|<=|>=|\+|\-|\*|/|=|<|>'),
+    ("SEPARATOR",  r'[;,\(\)\{\}]'),
+    ("WHITESPACE", r'\s+'),
+]
+tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
+
+# the slicing loop is O(n^2); it is only timed up to this size
+OLD_MAX_SIZE = 1 << 20
+
+
+def old_panic_mode_lexer(code):
+    tokens = []
+    index = 0
+    while index < len(code):
+        match = re.match(tok_regex, code[index:])
+        if match:
+            kind = match.lastgroup
+            value = match.group()
+            if kind != "WHITESPACE":
+                tokens.append((value, kind))
+            index += len(value)
+        else:
+            tokens.append((code[index], "ERROR"))
+            index += 1
+    return tokens
+
+
+def make_input(size, seed=0):
+    rnd = random.Random(seed)
+    lines = [
+        "int x = 10;",
+        "if (x == 10) { return x; }",
+        "while (count >= 1) count = count - 1;",
+        "float ratio = total / 2.5;",
+    ]
+    parts = []
+    total = 0
+    while total < size:
+        line = rnd.choice(lines)
+        if rnd.random() < 0.1:  # scatter an illegal character
+            cut = rnd.randrange(len(line))
+            line = line[:cut] + rnd.choice("@$`") + line[cut:]
+        parts.append(line + "\n")
+        total += len(line) + 1
+    return "".join(parts)
+
+
+def timed(fn, code):
+    start = time.perf_counter()
+    fn(code)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    max_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    scanner = PositionalScanner(token_specification)
+    new_lexer = lambda code: list(scanner.scan(code))
+
+    sizes = [10 * 1024]
+    while sizes[-1] * 4 <= max_mb * 1024 * 1024:
+        sizes.append(sizes[-1] * 4)
+    sizes.append(int(max_mb * 1024 * 1024))
+
+    print(f"{'size':>10}  {'slicing (s)':>12}  {'positional (s)':>14}  {'us/KB':>7}")
+    points = []
+    for size in sizes:
+        code = make_input(size)
+        old = f"{timed(old_panic_mode_lexer, code):12.3f}" if size <= OLD_MAX_SIZE else f"{'-':>12}"
+        new = timed(new_lexer, code)
+        points.append((size, new))
+        print(f"{size // 1024:>8}KB  {old}  {new:14.3f}  {new * 1e6 / (size / 1024):7.1f}")
+
+    # constant us/KB means linear scaling; the slope compares the ends
+    (s0, t0), (s1, t1) = points[1], points[-1]
+    print(f"time ratio {t1 / t0:.1f}x for size ratio {s1 / s0:.1f}x")
@@ -0,0 +1,57 @@
+# Benchmark: per-request scanner rebuilding vs get_scanner() on short inputs.
+# Every "request" scans one short statement with one of a few rule sets.
+#   rebuild   -- the section 3.5/3.8 scripts: join the rules and re.finditer()
+#                on every call (re's own small pattern cache still applies)
+#   cold      -- rebuild with re's cache cleared, i.e. a real recompile per call
+#   cached    -- get_scanner(rules).scan(code)
+# Usage: python bench_scanner_cache.py [requests]   (default 20000)
+
+import re
+import sys
+import time
+
+from scanner_cache import cache_info, get_scanner
+
+RULE_SETS = [
+    [("NUMBER", r"\d+"), ("IDENT", r"[a-zA-Z_]\w*"), ("PLUS", r"\+"), ("MINUS", r"-"),
+     ("ASSIGN", r"="), ("SKIP", r"[ \t\n]+"), ("MISMATCH", r".")],
+    [("EQ", r"=="), ("ASSIGN", r"="), ("PLUS", r"\+"), ("IDENT", r"[a-zA-Z_]\w*"),
+     ("NUMBER", r"\d+"), ("WHITESPACE", r"[ \t\n]+"), ("MISMATCH", r".")],
+    [("IF", r"if(?=\s|[^a-zA-Z0-9_])"), ("IDENT", r"[a-zA-Z_]\w*"), ("NUMBER", r"\d+"),
+     ("OP", r"[+\-*/=]"), ("WHITESPACE", r"[ \t\n]+"), ("MISMATCH", r".")],
+]
+STATEMENTS = ["x = 10 + y - 5", "x==10", "if else ifelse x=5", "sum = a1 + 25 * x"]
+
+
+def rebuild(rules, code):
+    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
+    return [(m.lastgroup, m.start(), m.end()) for m in re.finditer(regex, code)
+            if m.lastgroup not in ("SKIP", "WHITESPACE")]
+
+
+def cold(rules, code):
+    re.purge()
+    return rebuild(rules, code)
+
+
+def cached(rules, code):
+    return list(get_scanner(rules).scan(code))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    requests = [(RULE_SETS[i % len(RULE_SETS)], STATEMENTS[i % len(STATEMENTS)])
+                for i in range(n)]
+    times = {}
+    for name, fn in (("rebuild", rebuild), ("cold", cold), ("cached", cached)):
+        count = n // 20 if name == "cold" else n
+        start = time.perf_counter()
+        for rules, code in requests[:count]:
+            fn(rules, code)
+        times[name] = (time.perf_counter() - start) / count
+    for name, per_call in times.items():
+        print(f"{name:<8} {per_call * 1e6:8.1f} us/request  "
+              f"{per_call / times['cached']:5.1f}x cached")
+    info = cache_info()
+    print(f"cache: {info['hits']} hits, {info['misses']} misses, hit rate {info['hit_rate']:.4f}, "
+          f"compile time {info['compile_time'] * 1000:.2f} ms")
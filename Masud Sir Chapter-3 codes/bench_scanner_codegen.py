@@ -0,0 +1,31 @@
+# Benchmark: the three scanner backends (re master pattern, table-driven DFA,
+# generated module) per rule set, and the one fastest_scanner() picks.
+# Usage: PYTHONPATH=<repo root> python bench_scanner_codegen.py [size_in_KB]   (default 256)
+
+import random
+import sys
+import tempfile
+
+from c_corpus import make_token_source
+from master_lexer import DFA_C_RULES
+from scanner_codegen import fastest_scanner
+
+RULE_SETS = {
+    "mini lex (3.8 problem 4)": [
+        ("NUMBER", r"\d+"), ("IDENT", r"[a-zA-Z_]\w*"), ("PLUS", r"\+"), ("MINUS", r"-"),
+        ("ASSIGN", r"="), ("SKIP", r"[ \t\n]+"), ("MISMATCH", r".")],
+    "longest match (3.5 problem 2)": [
+        ("EQ", r"=="), ("ASSIGN", r"="), ("PLUS", r"\+"), ("IDENT", r"[a-zA-Z_]\w*"),
+        ("NUMBER", r"\d+"), ("WHITESPACE", r"[ \t\n]+"), ("MISMATCH", r".")],
+    "C-like": DFA_C_RULES,
+}
+
+if __name__ == "__main__":
+    size_kb = float(sys.argv[1]) if len(sys.argv) > 1 else 256
+    sample = make_token_source(int(size_kb * 1024), random.Random(0))
+    cache_dir = tempfile.mkdtemp()
+    print(f"Sample: {len(sample) / 1024:.0f} KB")
+    for name, rules in RULE_SETS.items():
+        backend, scanner, timings = fastest_scanner(rules, sample, cache_dir)
+        cells = "  ".join(f"{b} {t:6.3f} s" for b, t in timings.items())
+        print(f"{name:<30} {cells}  -> {backend}")
@@ -0,0 +1,43 @@
+# Benchmark: scanner startup from rules vs from a mapped table file, and scan
+# speed of the table-driven DFA vs the re-based master pattern.
+# Usage: PYTHONPATH=<repo root> python bench_scanner_tables.py [size_in_KB]   (default 256)
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from c_corpus import make_token_source
+from master_lexer import DFA_C_RULES
+from scanner_cache import Scanner
+from scanner_tables import TableScanner, build_tables, load_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size_kb = float(sys.argv[1]) if len(sys.argv) > 1 else 256
+    code = make_token_source(int(size_kb * 1024), random.Random(0))
+    path = os.path.join(tempfile.mkdtemp(), "c.tables")
+
+    tables, build_time = timed(lambda: build_tables(DFA_C_RULES))
+    _, first_time = timed(lambda: load_tables(DFA_C_RULES, path))
+    mapped, load_time = timed(lambda: load_tables(DFA_C_RULES, path))
+    print(f"{tables.n_states} DFA states, {tables.n_classes} byte classes, "
+          f"file {os.path.getsize(path)} bytes")
+    print(f"build from rules {build_time * 1000:8.2f} ms")
+    print(f"first load       {first_time * 1000:8.2f} ms  (build + write + map)")
+    print(f"mapped load      {load_time * 1000:8.2f} ms  ({build_time / load_time:.0f}x faster)")
+
+    master = Scanner(DFA_C_RULES)
+    table = TableScanner(mapped)
+    expected, re_time = timed(lambda: list(master.scan(code)))
+    result, dfa_time = timed(lambda: list(table.scan(code)))
+    assert result == expected
+    print(f"\nscan {len(code) / 1024:.0f} KB: re master pattern {re_time:.3f} s, "
+          f"table DFA {dfa_time:.3f} s (same tokens)")
@@ -0,0 +1,233 @@
+# Bit-parallel NFA simulation.
+# The set of active NFA states is one Python int (bit i = state i), so a step
+# is a handful of shifts, ANDs and ORs instead of building a new set.
+#
+# Two step functions, picked from the shape of the NFA:
+#   shift-and -- the NFA is a start state looping on the whole alphabet plus a
+#                simple chain 1 -> 2 -> ... -> m (the "ends with p" shape):
+#                    D = ((D << 1) & B[ch]) | 1
+#   or-masks  -- any other NFA, epsilon moves included. Epsilon-closures are
+#                folded into the masks, and the state set is cut into bytes;
+#                for every symbol, byte position and byte value the OR of the
+#                successors is precomputed, so a step is one lookup per byte
+#                of the state set. Only the bytes holding a state with a move
+#                on the symbol get a table, and once the tables would pass
+#                TABLE_LIMIT entries in all (big NFAs over big alphabets) a
+#                step ORs the successor masks of the set bits instead.
+
+from regex_nfa import EPSILON
+
+TABLE_LIMIT = 1 << 18   # 256-entry byte tables, summed over all symbols
+
+
+def _closure(nfa, index, state):
+    mask = 1 << index[state]
+    stack = [state]
+    while stack:
+        for target in nfa[stack.pop()].get(EPSILON, ()):
+            bit = 1 << index[target]
+            if not mask & bit:
+                mask |= bit
+                stack.append(target)
+    return mask
+
+
+class BitParallelNFA:
+    def __init__(self, nfa, start, accept):
+        """nfa is a {state: {symbol: [states]}} table (EPSILON allowed)."""
+        self.alphabet = sorted({s for moves in nfa.values() for s in moves} - {EPSILON})
+        chain = self._chain(nfa, start, accept)
+        if chain is not None:
+            self.mode = "shift-and"
+            self._build_shift_and(nfa, chain, accept)
+        else:
+            self.mode = "or-masks"
+            self._build_or_masks(nfa, start, accept)
+
+    # ---- shift-and ----
+
+    def _chain(self, nfa, start, accept):
+        """Return [start, s1, ..., sm] if the NFA has the shift-and shape."""
+        moves = nfa[start]
+        if EPSILON in moves or any(start not in moves.get(a, ()) for a in self.alphabet):
+            return None
+        chain = [start]
+        seen = {start}
+        state = start
+        while True:
+            targets = {t for symbol, ts in nfa[state].items() for t in ts} - (
+                {start} if state == start else set())
+            if not targets:
+                break
+            if len(targets) != 1 or EPSILON in nfa[state]:
+                return None
+            (state,) = targets
+            if state in seen:
+                return None
+            seen.add(state)
+            chain.append(state)
+        if len(seen) != len(nfa) or not set(accept) <= seen:
+            return None
+        return chain
+
+    def _build_shift_and(self, nfa, chain, accept):
+        position = {state: i for i, state in enumerate(chain)}
+        masks = {symbol: 1 for symbol in self.alphabet}  # bit 0: the start loop
+        for i, state in enumerate(chain[:-1]):
+            for symbol, targets in nfa[state].items():
+                for target in targets:
+                    if target == chain[i + 1]:
+                        masks[symbol] |= 1 << (i + 1)
+        self.masks = masks
+        self.initial = 1
+        self.accept_mask = sum(1 << position[s] for s in accept)
+        self.width = len(chain)
+
+    # ---- or-masks ----
+
+    def _build_or_masks(self, nfa, start, accept):
+        states = list(nfa)
+        index = {state: i for i, state in enumerate(states)}
+        closure = {state: _closure(nfa, index, state) for state in states}
+
+        # only states with a symbol move or in the accept set need a bit;
+        # epsilon-only states are already covered by the closures
+        keep = [i for i, s in enumerate(states)
+                if s in accept or any(sym != EPSILON for sym in nfa[s])]
+        remap = {old: new for new, old in enumerate(keep)}
+
+        def compress(mask):
+            out = 0
+            while mask:
+                low = mask & -mask
+                old = low.bit_length() - 1
+                if old in remap:
+                    out |= 1 << remap[old]
+                mask ^= low
+            return out
+
+        width = len(keep)
+        self.width = width
+        self.initial = compress(closure[start])
+        self.accept_mask = sum(1 << remap[index[s]] for s in accept)
+
+        # follow[symbol]: {bit: OR of the successors of that state on symbol}
+        follow = {symbol: {} for symbol in self.alphabet}
+        for old in keep:
+            for symbol, targets in nfa[states[old]].items():
+                if symbol != EPSILON:
+                    mask = 0
+                    for target in targets:
+                        mask |= compress(closure[target])
+                    follow[symbol][remap[old]] = mask
+
+        chunks = {symbol: sorted({bit >> 3 for bit in moves}) for symbol, moves in follow.items()}
+        if 256 * sum(map(len, chunks.values())) > TABLE_LIMIT:
+            self.tables = {symbol: (sum(1 << bit for bit in moves), moves)
+                           for symbol, moves in follow.items()}
+            self._step_or_masks = self._step_bits
+            return
+        self.tables = {}
+        for symbol, moves in follow.items():
+            per_chunk = []
+            for c in chunks[symbol]:
+                table = [0] * 256
+                for value in range(1, 256):
+                    low = value & -value
+                    rest = table[value ^ low]
+                    table[value] = rest | moves.get(c * 8 + low.bit_length() - 1, 0)
+                per_chunk.append((c * 8, table))
+            self.tables[symbol] = per_chunk
+        self._step_or_masks = self._step_bytes
+        if width <= 8:
+            # one byte: the table itself, looked up without the loop
+            empty = [0] * 256
+            self.tables = {symbol: per_chunk[0][1] if per_chunk else empty
+                           for symbol, per_chunk in self.tables.items()}
+            self._step_or_masks = self._step_byte
+
+    @staticmethod
+    def _step_byte(states, table):
+        return table[states]
+
+    @staticmethod
+    def _step_bytes(states, tables):
+        """One lookup per byte of the state set that holds a state with a move."""
+        out = 0
+        for shift, table in tables:
+            out |= table[(states >> shift) & 255]
+        return out
+
+    @staticmethod
+    def _step_bits(states, tables):
+        """OR of the successor masks of the states in the set that have a move."""
+        movers, follow = tables
+        moving = states & movers
+        out = 0
+        while moving:
+            low = moving & -moving
+            out |= follow[low.bit_length() - 1]
+            moving ^= low
+        return out
+
+    # ---- running ----
+
+    def step(self, states, ch):
+        """State set after reading `ch` from `states`; 0 means no state is left."""
+        if self.mode == "shift-and":
+            mask = self.masks.get(ch)
+            return 0 if mask is None or not states else ((states << 1) & mask) | 1
+        table = self.tables.get(ch)
+        return 0 if table is None else self._step_or_masks(states, table)
+
+    def is_accepting(self, states):
+        return bool(states & self.accept_mask)
+
+    def accepts(self, string):
+        states = self.initial
+        if self.mode == "shift-and":
+            masks = self.masks
+            for ch in string:
+                mask = masks.get(ch)
+                if mask is None:
+                    return False
+                states = ((states << 1) & mask) | 1
+        else:
+            tables = self.tables
+            step = self._step_or_masks
+            for ch in string:
+                table = tables.get(ch)
+                if table is None:
+                    return False
+                states = step(states, table)
+                if not states:
+                    return False
+        return bool(states & self.accept_mask)
+
+    def match_ends(self, text):
+        """Yield every i such that text[:i] is accepted (search on Σ*p NFAs)."""
+        accept = self.accept_mask
+        states = self.initial
+        if states & accept:
+            yield 0
+        if self.mode == "shift-and":
+            masks = self.masks
+            for i, ch in enumerate(text, 1):
+                mask = masks.get(ch)
+                if mask is None:
+                    return
+                states = ((states << 1) & mask) | 1
+                if states & accept:
+                    yield i
+        else:
+            tables = self.tables
+            step = self._step_or_masks
+            for i, ch in enumerate(text, 1):
+                table = tables.get(ch)
+                if table is None:
+                    return
+                states = step(states, table)
+                if not states:
+                    return
+                if states & accept:
+                    yield i
@@ -0,0 +1,139 @@
+# Compiled DFA: integer states and flat arrays instead of dict-of-dict tables.
+#   class_map  -- 256 bytes mapping every input byte to its equivalence class
+#                 (bytes that behave the same in every state share a class)
+#   trans      -- flat array('H') of n_states * n_classes entries; each entry is
+#                 the target state's row offset (state * n_classes), so a step
+#                 is a single index: state = trans[state + cls]
+#   accept     -- bitmap with one bit per state
+# Input bytes are turned into class numbers by bytes.translate() in C, and
+# run() is then one lookup per byte. The hot loops index a list copy of
+# trans (list indexing is cheaper than array indexing in CPython); the array
+# stays the compact form that is stored and shared.
+
+from array import array
+
+OTHER = None  # symbol for "any byte not listed" in imported tables
+
+
+class CompiledDFA:
+    def __init__(self, class_map, trans, n_classes, start, accept_bits, dead=None):
+        self.class_map = bytes(class_map)
+        self.trans = trans
+        self._trans = trans.tolist()
+        self.n_classes = n_classes
+        self.n_states = len(trans) // n_classes
+        self.start = start                  # state id
+        self.accept = bytes(accept_bits)
+        self.dead = dead                    # state id of the dead state, if any
+
+    def is_accepting(self, state):
+        return self.accept[state >> 3] >> (state & 7) & 1 == 1
+
+    def final_state(self, data, state=None):
+        """State id reached after reading all of `data` (bytes-like) from
+        `state` (default: the start state)."""
+        trans = self._trans
+        k = self.n_classes
+        s = (self.start if state is None else state) * k
+        for c in bytes(data).translate(self.class_map):
+            s = trans[s + c]
+        return s // k
+
+    def run(self, data):
+        """True if the DFA accepts `data` (bytes-like)."""
+        return self.is_accepting(self.final_state(data))
+
+    def longest_match(self, data, pos=0):
+        """End of the longest accepted prefix of data[pos:], or -1."""
+        trans = self._trans
+        k = self.n_classes
+        class_map = self.class_map
+        accept = self.accept
+        dead = -1 if self.dead is None else self.dead * k
+        s = self.start * k
+        last = pos if self.is_accepting(self.start) else -1
+        for i in range(pos, len(data)):
+            s = trans[s + class_map[data[i]]]
+            if s == dead:
+                break
+            state = s // k
+            if accept[state >> 3] >> (state & 7) & 1:
+                last = i + 1
+        return last
+
+    def __repr__(self):
+        return f"<CompiledDFA {self.n_states} states, {self.n_classes} classes>"
+
+
+def _symbol_byte(symbol):
+    if isinstance(symbol, int):
+        code = symbol
+    elif isinstance(symbol, (bytes, str)) and len(symbol) == 1:
+        code = ord(symbol)
+    else:
+        raise ValueError(f"DFA symbols must be single bytes, got {symbol!r}")
+    if not 0 <= code < 256:
+        raise ValueError(f"symbol {symbol!r} is outside the byte range")
+    return code
+
+
+def from_table(dfa, start, accept):
+    """Import a {state: {symbol: next_state}} table.
+
+    States may be any hashable names (str, int, frozenset). Symbols are
+    single characters or byte values; OTHER stands for every byte that is not
+    listed for that state. Missing moves go to a dead state.
+    """
+    names = [start] + [s for s in dfa if s != start]
+    for moves in list(dfa.values()):
+        for target in moves.values():
+            if target not in dfa and target not in names:
+                names.append(target)
+    ids = {name: i for i, name in enumerate(names)}
+    dead = len(names)
+    n_states = dead + 1
+
+    # column of each byte: where it leads from every state
+    rows = []
+    for name in names:
+        moves = dfa.get(name, {})
+        default = moves.get(OTHER)
+        row = [ids[default] if default is not None else dead] * 256
+        for symbol, target in moves.items():
+            if symbol is not OTHER:
+                row[_symbol_byte(symbol)] = ids[target]
+        rows.append(row)
+    rows.append([dead] * 256)
+
+    class_map = bytearray(256)
+    class_of_column = {}
+    for b in range(256):
+        column = tuple(row[b] for row in rows)
+        class_map[b] = class_of_column.setdefault(column, len(class_of_column))
+    k = len(class_of_column)
+
+    typecode = "H" if n_states * k <= 0xFFFF else "I"
+    trans = array(typecode, bytes(array(typecode).itemsize * n_states * k))
+    for column, cls in class_of_column.items():
+        for state, target in enumerate(column):
+            trans[state * k + cls] = target * k
+
+    accept_bits = bytearray((n_states + 7) // 8)
+    for name in accept:
+        if name in ids:
+            i = ids[name]
+            accept_bits[i >> 3] |= 1 << (i & 7)
+    return CompiledDFA(class_map, trans, k, 0, accept_bits, dead)
+
+
+def from_regex(pattern, minimal=True):
+    """regex -> Thompson NFA -> subset construction (-> Hopcroft) -> CompiledDFA."""
+    from dfa_minimize import minimize
+    from regex_nfa import compile_nfa
+    from subset_construction import subset_construction
+
+    nfa = compile_nfa(pattern)
+    dfa, accept, _ = subset_construction(nfa.to_dict(), nfa.start, {nfa.accept})
+    if minimal:
+        dfa, accept, _ = minimize(dfa, 0, accept)
+    return from_table(dfa, 0, accept)
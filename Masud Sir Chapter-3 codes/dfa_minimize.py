@@ -0,0 +1,117 @@
+# DFA minimization (Hopcroft's partition refinement, O(n log n)).
+# Works on the chapter's DFA tables, {state: {symbol: next_state}}, with any
+# hashable state names (strings, ints, frozensets). Missing moves go to an
+# implicit dead state, which is dropped again from the result.
+# The accept set may also be a {state: label} dict (e.g. the token a scanner
+# state recognizes); states with different labels are then never merged.
+
+from collections import deque
+
+
+def reachable_states(dfa, start):
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for target in dfa.get(queue.popleft(), {}).values():
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def minimize(dfa, start, accept):
+    """Return (min_dfa, min_accept, report).
+
+    min_dfa is {id: {symbol: id}} with dense ids and start state 0;
+    min_accept is a set of ids, or an {id: label} dict if accept was a dict;
+    report counts the states before, after removing unreachable ones, and
+    after minimization.
+    """
+    reachable = reachable_states(dfa, start)
+    states = [start] + [s for s in dfa if s in reachable and s != start]
+    states += [s for s in reachable if s not in dfa]  # targets with no row
+    index = {state: i for i, state in enumerate(states)}
+    dead = len(states)
+    n = dead + 1
+    alphabet = sorted({symbol for s in states for symbol in dfa.get(s, {})})
+
+    # inverse transitions: inverse[symbol][target] = sources
+    inverse = {symbol: [[] for _ in range(n)] for symbol in alphabet}
+    for s in states:
+        moves = dfa.get(s, {})
+        i = index[s]
+        for symbol in alphabet:
+            target = moves.get(symbol)
+            inverse[symbol][dead if target is None else index[target]].append(i)
+    for symbol in alphabet:
+        inverse[symbol][dead].append(dead)
+
+    labels = accept if isinstance(accept, dict) else dict.fromkeys(accept, True)
+    final = {index[s] for s in states if s in labels}
+    by_label = {}
+    for s in states:
+        if s in labels:
+            by_label.setdefault(labels[s], set()).add(index[s])
+    blocks = [b for b in (*by_label.values(), set(range(n)) - final) if b]
+    block_of = [0] * n
+    for b, members in enumerate(blocks):
+        for i in members:
+            block_of[i] = b
+    # every initial block but the largest has to be used as a splitter
+    waiting = set(range(len(blocks))) - {max(range(len(blocks)), key=lambda b: len(blocks[b]))}
+
+    while waiting:
+        splitter = list(blocks[waiting.pop()])
+        for symbol in alphabet:
+            row = inverse[symbol]
+            touched = {}
+            for target in splitter:
+                for source in row[target]:
+                    touched.setdefault(block_of[source], set()).add(source)
+            for b, inside in touched.items():
+                if len(inside) == len(blocks[b]):
+                    continue
+                # split block b into `inside` (new block) and the rest (keeps b)
+                blocks[b] -= inside
+                new = len(blocks)
+                blocks.append(inside)
+                for i in inside:
+                    block_of[i] = new
+                if b in waiting or len(inside) <= len(blocks[b]):
+                    waiting.add(new)
+                else:
+                    waiting.add(b)
+
+    # renumber blocks breadth-first from the start block, skipping the dead one
+    dead_block = block_of[dead]
+    ids = {block_of[0]: 0}
+    order = [block_of[0]]
+    min_dfa = {}
+    for b in order:
+        representative = next(iter(blocks[b]))
+        moves = {}
+        if representative != dead:
+            for symbol, target in dfa.get(states[representative], {}).items():
+                tb = block_of[index[target]]
+                if tb == dead_block:
+                    continue
+                if tb not in ids:
+                    ids[tb] = len(order)
+                    order.append(tb)
+                moves[symbol] = ids[tb]
+        min_dfa[ids[b]] = moves
+    min_accept = {ids[b] for b in order if next(iter(blocks[b])) in final}
+    if isinstance(accept, dict):
+        min_accept = {i: labels[states[next(iter(blocks[order[i]]))]] for i in min_accept}
+
+    report = {
+        "states": len(dfa),
+        "reachable": len(states),
+        "minimal": len(min_dfa),
+    }
+    return min_dfa, min_accept, report
+
+
+def format_report(report):
+    return (f"{report['states']} states, {report['reachable']} reachable, "
+            f"{report['minimal']} after minimization")
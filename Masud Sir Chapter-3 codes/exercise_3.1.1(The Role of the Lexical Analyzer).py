@@ -1,8 +1,12 @@
 # Exercise 3.1.1:
 # Write a Python program to divide a C++ snippet into lexemes
 # and assign lexical categories (token types).
+# Usage: PYTHONPATH=<repo root> python "exercise_3.1.1(The Role of the Lexical Analyzer).py"
 
 import re
+import sys
+
+from stream_lexer import lex_file
 
 # Define token patterns
 token_specification = [
@@ -39,8 +43,15 @@ int main() {
 }
 """
 
-tokens = lexer(cpp_code)
+if len(sys.argv) > 1:
+    # Streaming mode for large (ASCII) files: the file is memory-mapped and
+    # scanned in place, releasing pages behind the scan, so memory use does
+    # not grow with the file.
+    for tok in lex_file(sys.argv[1], token_specification):
+        print(f"{tok.line}:{tok.column}\t{tok.value.decode(errors='replace'):10} -> {tok.kind}")
+else:
+    tokens = lexer(cpp_code)
 
-print("Lexemes and their Token Types:")
-for lexeme, token_type in tokens:
-    print(f"{lexeme:10} -> {token_type}")
+    print("Lexemes and their Token Types:")
+    for lexeme, token_type in tokens:
+        print(f"{lexeme:10} -> {token_type}")
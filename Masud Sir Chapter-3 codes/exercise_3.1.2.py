@@ -1,8 +1,13 @@
 # Exercise 3.1.2:
 # Write a Python program to divide an HTML snippet into lexemes
 # and assign lexical categories (token types).
+# Usage: PYTHONPATH=<repo root> python exercise_3.1.2.py [file.html]
 
 import re
+import sys
+
+from input_buffer import LexemeTooLong
+from token_buffer import TokenBuffer
 
 # Define token patterns
 token_specification = [
@@ -19,17 +24,87 @@ token_specification = [
 
 # Build combined regex
 tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-get_token = re.compile(tok_regex).finditer
+master_pattern = re.compile(tok_regex)
+get_token = master_pattern.finditer
+match_token = master_pattern.match
+
+KIND_NAMES = [name for name, _ in token_specification]
+KIND_ID = {name: i for i, name in enumerate(KIND_NAMES)}
 
 def html_lexer(code):
-    tokens = []
+    # tokens are stored as (kind, start, end, line) columns; the span is
+    # narrowed to the stripped lexeme, which is only cut out when printed
+    spans = []
     for match in get_token(code):
         kind = match.lastgroup
-        value = match.group().strip()
-        if not value or kind == "WHITESPACE":
+        if kind == "WHITESPACE":
             continue
-        tokens.append((value, kind))
-    return tokens
+        start, end = match.span()
+        while start < end and code[start].isspace():
+            start += 1
+        while end > start and code[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((KIND_ID[kind], start, end))
+    return TokenBuffer.from_spans(code, spans, KIND_NAMES)
+
+
+def _strip_token(match):
+    lexeme = match.group().strip()
+    return (lexeme, match.lastgroup) if lexeme and match.lastgroup != "WHITESPACE" else None
+
+
+# A match is only final once the text after it can no longer change it:
+# it must end before the data received so far, and must not start one of
+# these constructs that are still open at the end of the data -- a tag whose
+# name or trailing blanks may go on (and turn into TAG_OPEN / TAG_CLOSE once
+# '>' arrives), or a quote that may still be closed (ATTRIBUTE_VALUE instead
+# of TEXT).
+_open_construct = re.compile(r'</?[a-zA-Z]?[a-zA-Z0-9]*\s*\Z|"[^"]*\Z').match
+
+
+class HtmlLexer:
+    """Push-mode html_lexer: feed() the document in chunks of any size.
+
+    feed(chunk) and close() return the (lexeme, kind) tokens completed so
+    far; together they give exactly the tokens of html_lexer(document). Only
+    the unfinished tail is kept between calls, so memory is bounded by the
+    longest token (a text run, or a quoted value); a tail longer than
+    max_token raises LexemeTooLong.
+    """
+
+    def __init__(self, max_token=1 << 20):
+        self.max_token = max_token
+        self._pending = ""
+
+    def feed(self, chunk):
+        return self._scan(self._pending + chunk, final=False)
+
+    def close(self):
+        return self._scan(self._pending, final=True)
+
+    def _scan(self, data, final):
+        tokens = []
+        n = len(data)
+        resume = 0
+        for match in get_token(data):
+            if not final and (match.end() == n or _open_construct(data, match.start())):
+                break
+            token = _strip_token(match)
+            if token:
+                tokens.append(token)
+            resume = match.end()
+        if final:
+            resume = n
+        # a '<' that starts no token is skipped, as finditer does, once no
+        # tag can start there any more
+        while (resume < n and data[resume] == "<" and not match_token(data, resume)
+               and not _open_construct(data, resume)):
+            resume += 1
+        self._pending = data[resume:]
+        if len(self._pending) > self.max_token:
+            raise LexemeTooLong(f"unfinished token longer than {self.max_token} characters")
+        return tokens
 
 # Example HTML snippet
 html_code = """
@@ -39,8 +114,30 @@ html_code = """
 </div>
 """
 
-tokens = html_lexer(html_code)
+if len(sys.argv) > 1:
+    # Streaming mode for large files: the file is read in 64 KB chunks and
+    # pushed through HtmlLexer, so memory stays bounded by the chunk size
+    # and the longest token.
+    lexer = HtmlLexer()
+    with open(sys.argv[1], encoding="utf-8", errors="replace") as f:
+        for chunk in iter(lambda: f.read(1 << 16), ""):
+            for lexeme, token_type in lexer.feed(chunk):
+                print(f"{lexeme:15} -> {token_type}")
+    for lexeme, token_type in lexer.close():
+        print(f"{lexeme:15} -> {token_type}")
+else:
+    tokens = html_lexer(html_code)
+
+    print("Lexemes and their Token Types:")
+    for lexeme, token_type in tokens:
+        print(f"{lexeme:15} -> {token_type}")
 
-print("Lexemes and their Token Types:")
-for lexeme, token_type in tokens:
-    print(f"{lexeme:15} -> {token_type}")
+    # The same snippet pushed 5 characters at a time: tags and values that
+    # are cut between chunks come out whole.
+    lexer = HtmlLexer()
+    streamed = []
+    for i in range(0, len(html_code), 5):
+        streamed += lexer.feed(html_code[i:i + 5])
+    streamed += lexer.close()
+    print("\nStreamed in 5-character chunks:",
+          "identical" if streamed == list(tokens) else "DIFFERENT")
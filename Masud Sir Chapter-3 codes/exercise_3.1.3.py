@@ -2,8 +2,9 @@
 # Write a Python program to detect lexical errors in an input string.
 # Allowed tokens: identifiers, numbers, operators, separators, keywords.
 # Any character outside this set is considered a lexical error.
+# Usage: PYTHONPATH=<repo root> python exercise_3.1.3.py
 
-import re
+from positional_scanner import PositionalScanner
 
 # Define allowed token patterns
 token_specification = [
@@ -15,27 +16,14 @@ token_specification = [
     ("WHITESPACE", r'\s+'),
 ]
 
-# Build combined regex
-tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-get_token = re.compile(tok_regex).finditer
+# Build combined regex (compiled once; matched in place, no code[index:] copies)
+scanner = PositionalScanner(token_specification)
 
 def detect_lexical_errors(code):
-    errors = []
-    tokens = []
-    index = 0
-    while index < len(code):
-        match = re.match(tok_regex, code[index:])
-        if match:
-            kind = match.lastgroup
-            value = match.group()
-            if kind != "WHITESPACE":
-                tokens.append((value, kind))
-            index += len(value)
-        else:
-            # Unknown/illegal character
-            errors.append((code[index], index))
-            index += 1
-    return tokens, errors
+    # errors are (illegal_run, index, line, column); a run of illegal
+    # characters is one error. Lines are found by bisect in an index built
+    # once per input, not by counting newlines for every error.
+    return scanner.tokens_and_errors(code)
 
 # Example input (contains @ and $ which are invalid)
 cpp_code = """
@@ -54,5 +42,5 @@ for lexeme, token_type in tokens:
     print(f"{lexeme:10} -> {token_type}")
 
 print("\nLexical Errors Found:")
-for err, pos in errors:
-    print(f"Illegal character '{err}' at position {pos}")
+for err, pos, line, column in errors:
+    print(f"Illegal character '{err}' at line {line}, column {column} (position {pos})")
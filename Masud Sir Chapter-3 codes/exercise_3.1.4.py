@@ -1,8 +1,10 @@
 # Exercise 3.1.4:
 # Implement panic-mode lexical error recovery.
 # Illegal characters are reported, replaced with an ERROR token, and scanning continues.
+# Usage: PYTHONPATH=<repo root> python exercise_3.1.4.py
 
-import re
+from positional_scanner import PositionalScanner
+from token_buffer import TokenBuffer
 
 # Token patterns
 token_specification = [
@@ -14,26 +16,19 @@ token_specification = [
     ("WHITESPACE", r'\s+'),
 ]
 
-# Combined regex
-tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-get_token = re.compile(tok_regex).finditer
+# Combined regex (compiled once; matched in place, no code[index:] copies)
+scanner = PositionalScanner(token_specification)
+
+KIND_NAMES = [name for name, _ in token_specification] + ["ERROR"]
+KIND_ID = {name: i for i, name in enumerate(KIND_NAMES)}
 
 def panic_mode_lexer(code):
-    tokens = []
-    index = 0
-    while index < len(code):
-        match = re.match(tok_regex, code[index:])
-        if match:
-            kind = match.lastgroup
-            value = match.group()
-            if kind != "WHITESPACE":
-                tokens.append((value, kind))
-            index += len(value)
-        else:
-            # Panic-mode recovery: skip one char, mark error
-            tokens.append((code[index], "ERROR"))
-            index += 1
-    return tokens
+    # Panic-mode recovery: the illegal run up to the next valid token start
+    # becomes one ERROR token, and scanning continues from there.
+    # The result is a TokenBuffer; it iterates as (lexeme, token type) pairs.
+    spans = ((KIND_ID[kind], index, index + len(value))
+             for value, kind, index in scanner.scan(code))
+    return TokenBuffer.from_spans(code, spans, KIND_NAMES)
 
 # Example with lexical errors
 cpp_code = """
@@ -50,3 +45,12 @@ tokens = panic_mode_lexer(cpp_code)
 print("Tokens (with error recovery):")
 for lexeme, token_type in tokens:
     print(f"{lexeme:10} -> {token_type}")
+
+# Error positions: each token already knows its line, and the buffer's
+# SourceIndex (built once, on first use) says where that line starts.
+ERROR = KIND_ID["ERROR"]
+print("\nErrors:")
+for i in range(len(tokens)):
+    if tokens.kind[i] == ERROR:
+        line, column = tokens.position(i)
+        print(f"line {line}, column {column}: {tokens.lexeme(i)!r}")
@@ -3,6 +3,10 @@
 # Each buffer has a fixed size. The scanner reads characters sequentially.
 # When one buffer is exhausted, the other is filled with the next chunk of input.
 
+import re
+
+from input_buffer import open_buffer
+
 class BufferPair:
     def __init__(self, text, buffer_size=8):
         self.text = text
@@ -38,3 +42,14 @@ bp = BufferPair(text, buffer_size=10)
 print("Reading characters with buffer pairs:")
 for ch in bp.get_chars():
     print(ch, end="|")
+
+
+# The same scheme over a real file descriptor: DoubleBuffer reads into two
+# preallocated halves with readinto() and hands out lexemes as memoryviews.
+word = re.compile(rb"(?P<WORD>[A-Za-z_]+)|(?P<SPACE>\s+)|(?P<OTHER>.)")
+
+print("\n\nWords of this file, read through DoubleBuffer:")
+buffer = open_buffer(__file__, half_size=64)
+for kind, lexeme in buffer.scan(word, skip={"SPACE", "OTHER"}):
+    print(lexeme.tobytes().decode(), end="|")
+print()
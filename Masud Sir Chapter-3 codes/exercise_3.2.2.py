@@ -2,39 +2,45 @@
 # Simulate input buffering with sentinels.
 # A sentinel (special EOF marker) is placed at the end of the buffer to simplify scanning.
 
+import io
+
+# The buffer holds bytes and the sentinel is NUL: '$' can occur in the input,
+# NUL does not occur in source text (and one that does is told apart from the
+# sentinel by its position). The buffer is refilled in place with readinto().
+SENTINEL = 0
+
+
 class SentinelBuffer:
-    def __init__(self, text, buffer_size=8):
-        self.text = text + "$"  # Use '$' as sentinel marker (end of input)
-        self.buffer_size = buffer_size
-        self.index = 0
-        self.buffer = ""
+    def __init__(self, reader, buffer_size=8):
+        self.reader = reader
+        self.buffer = bytearray(buffer_size + 1)   # one spare slot for the sentinel
+        self.data = memoryview(self.buffer)[:buffer_size]
+        self.limit = 0   # index of the sentinel that ends the loaded data
 
     def load_buffer(self):
-        if self.index < len(self.text):
-            end = min(self.index + self.buffer_size - 1, len(self.text))
-            self.buffer = self.text[self.index:end]
-            self.buffer += "$"  # place sentinel at end of buffer
-            self.index = end
-        else:
-            self.buffer = "$"
+        self.limit = self.reader.readinto(self.data)
+        self.buffer[self.limit] = SENTINEL
 
     def get_chars(self):
         self.load_buffer()
+        i = 0
         while True:
-            for c in self.buffer:
-                if c == "$":   # sentinel reached
-                    if self.index >= len(self.text):  # real end of input
+            c = self.buffer[i]
+            if c == SENTINEL:            # the only test made for every character
+                if i == self.limit:      # end of the buffer, not a NUL in the input
+                    if self.limit == 0:  # real end of input
                         return
-                    else:
-                        self.load_buffer()
-                        break
-                yield c
+                    self.load_buffer()
+                    i = 0
+                    continue
+            yield c
+            i += 1
 
 # Example input
 text = "Lexical analyzer buffer simulation using sentinel."
 
-sb = SentinelBuffer(text, buffer_size=12)
+sb = SentinelBuffer(io.BytesIO(text.encode()), buffer_size=12)
 
 print("Reading characters with sentinel buffer:")
 for ch in sb.get_chars():
-    print(ch, end="|")
+    print(chr(ch), end="|")
@@ -2,7 +2,7 @@
 # Write Python regex patterns for common token classes
 # and test them on sample strings.
 
-import re
+import linear_regex   # same results as re, in linear time
 
 token_specification = [
     ("KEYWORD",    r'^(if|else|while|for|return|int|float|double|char|void)$'),
@@ -12,10 +12,13 @@ token_specification = [
     ("OPERATOR",   r'^(==|!=|<=|>=|\+|\-|\*|/|=|<|>)$'),
     ("SEPARATOR",  r'^[;,\(\)\{\}]$')
 ]
+# compiled once, to programs that never backtrack
+token_specification = [(token, linear_regex.compile(pattern))
+                       for token, pattern in token_specification]
 
 def classify_lexeme(lexeme):
     for token, pattern in token_specification:
-        if re.match(pattern, lexeme):
+        if pattern.match(lexeme):
             return token
     return "UNKNOWN"
 
@@ -1,9 +1,9 @@
 # Exercise 3.3.2:
 # Regex for binary numbers divisible by 2 (must end in 0).
 
-import re
+import linear_regex   # same results as re, in linear time
 
-pattern = re.compile(r'^[01]*0$')
+pattern = linear_regex.compile(r'^[01]*0$')
 
 tests = ["0", "10", "110", "111", "10101", "1010"]
 
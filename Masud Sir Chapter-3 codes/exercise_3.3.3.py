@@ -1,10 +1,10 @@
 # Exercise 3.3.3:
 # Regex for identifiers (start with letter/underscore, followed by letters/digits/underscores).
 
-import re
+import linear_regex   # same results as re, in linear time
 
 
-pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+pattern = linear_regex.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
 tests = ["var", "_temp1", "2cool", "hello_world", "while"]
 
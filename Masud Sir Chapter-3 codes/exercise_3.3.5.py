@@ -1,7 +1,7 @@
 # Exercise 3.3.5:
 # Regex for C-style comments /* ... */
-import re
-pattern = re.compile(r'^/\*.*?\*/$', re.DOTALL)
+import linear_regex   # same results as re, in linear time
+pattern = linear_regex.compile(r'^/\*.*?\*/$', linear_regex.DOTALL)
 
 tests = ["/* hello */", "/* multi\nline */", "notacomment"]
 
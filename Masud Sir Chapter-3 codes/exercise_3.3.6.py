@@ -1,8 +1,8 @@
 # Exercise 3.3.6:
 # Regex for signed integers (+ or - optional).
 
-import re
-pattern = re.compile(r'^[+-]?[0-9]+$')
+import linear_regex   # same results as re, in linear time
+pattern = linear_regex.compile(r'^[+-]?[0-9]+$')
 
 tests = ["123", "+456", "-789", "42a"]
 
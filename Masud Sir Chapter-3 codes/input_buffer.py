@@ -0,0 +1,146 @@
+# Double-buffer input engine (buffer pairs over a real file descriptor).
+# Two preallocated halves of one bytearray are filled with readinto(), so input
+# is never copied into new str/bytes objects. lexemeBegin and forward are the
+# two pointers of the textbook scheme, and lexemes come back as memoryview
+# slices of the buffer.
+#
+# Layout:  [ half 0 | half 1 | mirror of half 0 ]
+# A lexeme that starts in half 1 and runs on into a freshly loaded half 0 is
+# read through the mirror, so it is still one contiguous slice. The mirror is
+# written once per half-0 refill (a single memcpy), never per lexeme.
+
+import errno
+import io
+import os
+
+
+class LexemeTooLong(ValueError):
+    pass
+
+
+class DoubleBuffer:
+    def __init__(self, source, half_size=4096, lookahead=None):
+        """source is an OS file descriptor or a binary file object.
+
+        Patterns given to match() may look at most `lookahead` bytes past the
+        end of their match (default: a quarter of a half, at most 256); their
+        lexemes may then be up to half_size - lookahead bytes long. A
+        non-blocking source with no data ready raises BlockingIOError, and
+        the buffer can be used again once it is readable.
+        """
+        if isinstance(source, int):
+            self.reader = io.FileIO(source, closefd=False)
+        else:
+            self.reader = source
+        self.N = half_size
+        if lookahead is None:
+            lookahead = min(256, half_size // 4)
+        if not 0 < lookahead < half_size:
+            raise ValueError("lookahead must be between 0 and half_size")
+        self.lookahead = lookahead
+        self.buf = bytearray(3 * half_size)
+        self.view = memoryview(self.buf)
+        self.lexemeBegin = 0
+        self.forward = 0
+        self.end = 0            # index just past the valid data
+        self.offset = 0         # stream offset of lexemeBegin
+        self.eof = False
+        self._fill()
+
+    def _fill(self):
+        """Read more input after self.end; return the number of bytes read."""
+        N = self.N
+        end = self.end
+        if end == 3 * N or (end == 2 * N and self.lexemeBegin < N):
+            raise LexemeTooLong(f"lexeme longer than the buffer half ({N} bytes)")
+        if end < 2 * N:
+            n = self.reader.readinto(self.view[end:(end // N + 1) * N])
+        else:
+            real = end - 2 * N  # half 0 again, seen through the mirror
+            n = self.reader.readinto(self.view[real:N])
+            if n:
+                self.view[end:end + n] = self.view[real:real + n]
+        if n is None:           # non-blocking source: no data yet, not the end
+            raise BlockingIOError(errno.EAGAIN, "no input available yet")
+        if n == 0:
+            self.eof = True
+        self.end += n
+        return n
+
+    def next_char(self):
+        """Advance forward and return the byte there, or -1 at end of input."""
+        if self.forward == self.end and (self.eof or not self._fill()):
+            return -1
+        c = self.buf[self.forward]
+        self.forward += 1
+        return c
+
+    def retract(self, n=1):
+        self.forward -= n
+
+    def lexeme(self):
+        """The current lexeme as a memoryview (valid until the next refill)."""
+        return self.view[self.lexemeBegin:self.forward]
+
+    def accept(self):
+        """Return the current lexeme and start the next one at forward."""
+        lexeme = self.view[self.lexemeBegin:self.forward]
+        self.offset += self.forward - self.lexemeBegin
+        self.lexemeBegin = self.forward
+        if self.lexemeBegin >= 2 * self.N:
+            # both pointers are in the mirror: move them to the real half 0
+            shift = 2 * self.N
+            self.lexemeBegin -= shift
+            self.forward -= shift
+            self.end -= shift
+        return lexeme
+
+    def match(self, pattern):
+        """Match a compiled bytes regex at forward, refilling as needed.
+
+        A match that gets within `lookahead` bytes of the end of the loaded
+        data is retried after a refill, so a lexeme split across halves is
+        matched whole.
+        """
+        while True:
+            m = pattern.match(self.buf, self.forward, self.end)
+            if self.eof:
+                break
+            stop = self.forward if m is None else m.end()
+            if stop + self.lookahead <= self.end:
+                break
+            try:
+                self._fill()
+            except LexemeTooLong:
+                if m is None:
+                    break
+                raise LexemeTooLong(
+                    f"lexeme longer than {self.N - self.lookahead} bytes (the buffer half, "
+                    f"{self.N} bytes, less {self.lookahead} bytes of lookahead)") from None
+        if m is not None:
+            self.forward = m.end()
+        return m
+
+    def scan(self, pattern, skip=()):
+        """Yield (kind, lexeme) for a named-group master pattern.
+
+        Each lexeme is a memoryview that is only valid until the generator
+        resumes; use bytes(lexeme) to keep it.
+        """
+        while True:
+            m = self.match(pattern)
+            if m is None:
+                if self.forward == self.end and self.eof:
+                    return
+                self.forward += 1  # no rule matches: hand back one byte
+                yield None, self.accept()
+                continue
+            lexeme = self.accept()
+            if m.lastgroup not in skip:
+                yield m.lastgroup, lexeme
+
+
+def open_buffer(path, half_size=4096, lookahead=None):
+    """DoubleBuffer over a file path; the descriptor is closed with the buffer."""
+    return DoubleBuffer(io.FileIO(os.open(path, os.O_RDONLY), closefd=True), half_size,
+                        lookahead)
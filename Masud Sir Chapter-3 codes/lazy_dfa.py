@@ -0,0 +1,123 @@
+# Lazy DFA: subset construction on demand, during matching.
+# A DFA state is an NFA state set (a bitset int, stepped by BitParallelNFA)
+# plus a dict of the moves found so far. A move is computed the first time it
+# is taken (a miss) and followed through the dict afterwards (a hit), so only
+# the states the input actually reaches are ever built.
+#
+# The cache holds at most `max_states` states. When it is full it is flushed
+# as a whole: moves point straight at state objects, so dropping single states
+# would mean finding and cutting every move into them. If the cache keeps
+# filling up -- fewer than `min_progress` input characters per state built
+# since the last flush, counted over all runs since then -- it is not paying
+# for itself and the rest of that run steps the NFA directly. Those
+# characters count as progress too, so a full cache is flushed again once
+# enough input has gone by, however short the runs are.
+
+from bitparallel_nfa import BitParallelNFA
+
+
+class _State:
+    __slots__ = ("bits", "accepting", "next")
+
+    def __init__(self, bits, accepting):
+        self.bits = bits
+        self.accepting = accepting
+        self.next = {}
+
+
+class LazyDFA:
+    def __init__(self, nfa, start, accept, max_states=10000, min_progress=10):
+        """nfa is a {state: {symbol: [states]}} table (EPSILON allowed)."""
+        if max_states < 2:
+            raise ValueError("max_states must be at least 2")
+        self.nfa = BitParallelNFA(nfa, start, accept)
+        self.max_states = max_states
+        self.min_progress = min_progress
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0      # states dropped by flushes
+        self.flushes = 0
+        self.fallbacks = 0      # runs finished on NFA stepping
+        self.nfa_steps = 0      # characters read by those runs after the switch
+        self._read = 0          # characters read since the last flush, over all runs
+        self._flush_misses = 0  # self.misses at the last flush
+        self._cache = {}
+        self._start = self._state(self.nfa.initial)
+
+    def _state(self, bits):
+        state = self._cache.get(bits)
+        if state is None:
+            state = self._cache[bits] = _State(bits, self.nfa.is_accepting(bits))
+        return state
+
+    def _flush(self):
+        self.evictions += len(self._cache)
+        self.flushes += 1
+        self._read = 0
+        self._flush_misses = self.misses
+        self._cache = {}
+        self._start = self._state(self.nfa.initial)
+
+    def _finish_on_nfa(self, bits, rest):
+        self.fallbacks += 1
+        step = self.nfa.step
+        for ch in rest:
+            self.nfa_steps += 1
+            bits = step(bits, ch)
+            if not bits:
+                return False
+        return self.nfa.is_accepting(bits)
+
+    def accepts(self, string):
+        state = self._start
+        misses = self.misses
+        read = self._read       # characters read since the last flush before this run
+        mark = 0                # position of the last flush in this run
+        i = 0
+        for i, ch in enumerate(string, 1):
+            target = state.next.get(ch)
+            if target is not None:
+                state = target
+                continue
+            self.misses += 1
+            bits = self.nfa.step(state.bits, ch)
+            target = self._cache.get(bits)
+            if target is None:
+                if len(self._cache) >= self.max_states:
+                    built = self.misses - self._flush_misses
+                    if read + i - mark < self.min_progress * built:
+                        self.hits += i - (self.misses - misses)
+                        self._read = read + len(string) - mark
+                        return self._finish_on_nfa(bits, string[i:])
+                    self._flush()
+                    read, mark = 0, i
+                    state = self._state(state.bits)
+                target = self._state(bits)
+            state.next[ch] = target
+            state = target
+            if not bits:        # dead state: nothing can be accepted any more
+                break
+        self.hits += i - (self.misses - misses)
+        self._read = read + i - mark
+        return state.accepting
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "states": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "flushes": self.flushes,
+            "fallbacks": self.fallbacks,
+            "nfa_steps": self.nfa_steps,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def from_regex(pattern, max_states=10000, min_progress=10):
+    """regex -> Thompson NFA -> LazyDFA."""
+    from regex_nfa import compile_nfa
+
+    nfa = compile_nfa(pattern)
+    return LazyDFA(nfa.to_dict(), nfa.start, {nfa.accept}, max_states, min_progress)
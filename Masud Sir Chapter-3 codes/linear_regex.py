@@ -0,0 +1,588 @@
+# Backtracking-free regular expressions (a Pike VM).
+# The pattern is compiled to a Thompson-style program, and matching runs all
+# threads of the program in lockstep over the input, one character at a time,
+# like the NFA simulations in this chapter. Threads are kept in priority order
+# (greedy or lazy, left alternative first), and a thread that reaches MATCH
+# cuts every thread of lower priority -- so the match found is the one re's
+# backtracking would report, but no input character is ever read twice:
+# match(), fullmatch() and search() take O(len(text) * len(program)) time,
+# whatever the pattern and the input.
+#
+# finditer() restarts a search at the end of each match, like re; a search
+# can read ahead past the match it returns (a higher-priority thread that
+# fails later), so pathological pattern/input pairs can still make the whole
+# iteration quadratic -- never exponential.
+#
+# Supported: the regex_nfa syntax (| * + ? {m,n} ( ) (?:) [...] . escapes)
+# plus lazy quantifiers (*? +? ?? {m,n}?), the anchors ^ $ \A \Z \b \B and
+# the flags DOTALL, MULTILINE and ASCII, with re's meaning (Unicode \d \w \s
+# unless ASCII). Groups only group; Match.group() is the whole match.
+# Backreferences and lookaround need backtracking and raise RegexError, and
+# so does repeating something that can match the empty string, like (a*)*.
+
+import re
+from collections import deque
+
+from regex_nfa import RegexError, _CHAR_ESCAPES, _Parser
+
+DOTALL = re.DOTALL
+MULTILINE = re.MULTILINE
+ASCII = re.ASCII
+_FLAGS = DOTALL | MULTILINE | ASCII
+
+# opcodes
+CHAR, SPLIT, JMP, ASSERT, MATCH = range(5)
+
+# assertions: bits of the context mask that says which hold at a position
+BOL, EOL, START, END, BOUNDARY, NOT_BOUNDARY = (1 << i for i in range(6))
+_ASSERT_ESCAPES = {"A": START, "Z": END, "b": BOUNDARY, "B": NOT_BOUNDARY}
+
+_ASCII_CLASSES = {
+    "d": frozenset("0123456789"),
+    "w": frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"),
+    "s": frozenset(" \t\n\r\f\v"),
+}
+# the tests re uses for str patterns
+_UNICODE_CLASSES = {
+    "d": str.isdecimal,
+    "w": lambda ch: ch.isalnum() or ch == "_",
+    "s": str.isspace,
+}
+
+
+class CharSet:
+    """Characters in `chars` or passing one of `tests`; the complement if negated."""
+
+    CACHE_LIMIT = 1 << 12
+
+    def __init__(self, chars=(), tests=(), negated=False):
+        self.chars = frozenset(chars)
+        self.tests = tuple(tests)
+        self.negated = negated
+        self._known = {}
+
+    def __contains__(self, ch):
+        hit = self._known.get(ch)
+        if hit is None:
+            hit = (ch in self.chars or any(test(ch) for test in self.tests)) != self.negated
+            if len(self._known) < self.CACHE_LIMIT:
+                self._known[ch] = hit
+        return hit
+
+
+# ---------------- Parser ----------------
+# regex_nfa's parser with character sets as CharSet (so negation and Unicode
+# classes are not cut down to ASCII), anchors, and lazy quantifiers.
+# Nodes: ("set", CharSet) ("assert", bit) ("cat", a, b) ("alt", a, b)
+#        ("star"|"plus"|"opt", a, lazy) ("rep", a, m, n_or_None, lazy) ("empty",)
+
+class _LinearParser(_Parser):
+    def __init__(self, pattern, flags):
+        super().__init__(pattern)
+        self.flags = flags
+
+    def _class_escape(self, ch):
+        """CharSet pieces for \\d \\w \\s (and negations): (chars, tests, negated)."""
+        kind = ch.lower()
+        if self.flags & ASCII:
+            return _ASCII_CLASSES[kind], (), ch != kind
+        return (), (_UNICODE_CLASSES[kind],), ch != kind
+
+    def repetition(self):
+        node = self.atom()
+        while True:
+            ch = self.peek()
+            if ch in ("*", "+", "?"):
+                self.pos += 1
+                kind = {"*": "star", "+": "plus", "?": "opt"}[ch]
+                node = (kind, node, self._lazy())
+            elif ch == "{":
+                node = self.counted(node) + (self._lazy(),)
+            else:
+                return node
+            if self.peek() in ("*", "+", "?", "{"):
+                self.error("multiple repeat")
+
+    def _lazy(self):
+        if self.peek() == "?":
+            self.pos += 1
+            return True
+        return False
+
+    def atom(self):
+        ch = self.peek()
+        if ch == "^":
+            self.pos += 1
+            return ("assert", BOL)
+        if ch == "$":
+            self.pos += 1
+            return ("assert", EOL)
+        if ch == ".":
+            self.pos += 1
+            return ("set", CharSet(() if self.flags & DOTALL else "\n", negated=True))
+        if ch == "[":
+            self.pos += 1
+            return ("set", self.char_class())
+        if ch == "\\":
+            self.pos += 1
+            return self.escape()
+        if ch == "(" and self.pattern.startswith("(?", self.pos) \
+                and not self.pattern.startswith("(?:", self.pos):
+            self.error("unsupported group (lookaround and inline flags need backtracking)")
+        node = super().atom()
+        if node[0] == "chars":
+            return ("set", CharSet(node[1]))
+        return node
+
+    def escape(self):
+        ch = self.take()
+        if ch in _ASSERT_ESCAPES:
+            return ("assert", _ASSERT_ESCAPES[ch])
+        if ch in "dDwWsS":
+            return ("set", CharSet(*self._class_escape(ch)))
+        return ("set", CharSet(self._literal_escape(ch)))
+
+    def _literal_escape(self, ch):
+        if ch in _CHAR_ESCAPES:
+            return _CHAR_ESCAPES[ch]
+        if ch.isalnum():
+            self.error(f"unsupported escape \\{ch}")
+        return ch
+
+    def char_class(self):
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+        chars = set()
+        tests = []
+        first = True
+        while True:
+            ch = self.take()
+            if ch == "]" and not first:
+                break
+            first = False
+            if ch == "\\":
+                ch = self.take()
+                if ch in "dDwWsS":
+                    if (self.peek() == "-"
+                            and self.pattern[self.pos + 1:self.pos + 2] not in ("]", "")):
+                        self.error("bad character range")    # [\d-z]
+                    members, class_tests, negate = self._class_escape(ch)
+                    if negate:
+                        item = CharSet(members, class_tests, True)
+                        tests.append(item.__contains__)
+                    else:
+                        chars.update(members)
+                        tests.extend(class_tests)
+                    continue
+                ch = self._literal_escape(ch)
+            if self.peek() == "-" and self.pattern[self.pos + 1:self.pos + 2] not in ("]", ""):
+                self.pos += 1
+                end = self.take()
+                if end == "\\":
+                    end = self.take()
+                    if end in "dDwWsS":
+                        self.error("bad character range")    # [a-\d]
+                    end = self._literal_escape(end)
+                if ord(end) < ord(ch):
+                    self.error("bad character range")
+                chars.update(chr(c) for c in range(ord(ch), ord(end) + 1))
+            else:
+                chars.add(ch)
+        return CharSet(chars, tests, negated)
+
+
+# ---------------- Compiler: tree -> program ----------------
+
+# re stops a loop after an iteration that matched nothing; threads run in
+# lockstep cannot tell such an iteration apart, so those loops are refused
+_NULLABLE_LOOP = "repeating a subpattern that can match the empty string is not supported"
+
+
+def _nullable(node):
+    kind = node[0]
+    if kind == "set":
+        return False
+    if kind == "cat":
+        return _nullable(node[1]) and _nullable(node[2])
+    if kind == "alt":
+        return _nullable(node[1]) or _nullable(node[2])
+    if kind == "plus":
+        return _nullable(node[1])
+    if kind == "rep":
+        return node[2] == 0 or _nullable(node[1])
+    return True                           # assert, empty, star, opt
+
+
+class _Program:
+    def __init__(self):
+        self.op = []
+        self.arg = []       # CHAR: CharSet; ASSERT: bit; SPLIT: preferred target
+        self.next = []      # CHAR / ASSERT / JMP target; SPLIT: other target
+
+    def emit(self, op, arg=None, next=-1):
+        self.op.append(op)
+        self.arg.append(arg)
+        self.next.append(next)
+        return len(self.op) - 1
+
+    def split(self, first, second):
+        return self.emit(SPLIT, first, second)
+
+    def build(self, node):
+        """(start, end) of the fragment; `end` is a JMP whose target is patched later."""
+        kind = node[0]
+        if kind in ("set", "assert", "empty"):
+            end = self.emit(JMP)
+            if kind == "set":
+                return self.emit(CHAR, node[1], end), end
+            if kind == "assert":
+                return self.emit(ASSERT, node[1], end), end
+            return self.emit(JMP, next=end), end
+        if kind == "cat":
+            s1, e1 = self.build(node[1])
+            s2, e2 = self.build(node[2])
+            self.next[e1] = s2
+            return s1, e2
+        if kind == "alt":
+            s1, e1 = self.build(node[1])
+            s2, e2 = self.build(node[2])
+            end = self.emit(JMP)
+            self.next[e1] = self.next[e2] = end
+            return self.split(s1, s2), end
+        if kind in ("star", "plus", "opt"):
+            _, sub, lazy = node
+            if kind != "opt" and _nullable(sub):
+                raise RegexError(_NULLABLE_LOOP)
+            s1, e1 = self.build(sub)
+            end = self.emit(JMP)
+            fork = self.split(end, s1) if lazy else self.split(s1, end)
+            if kind == "opt":
+                self.next[e1] = end
+            else:
+                self.next[e1] = fork       # loop back through the fork
+            return (s1 if kind == "plus" else fork), end
+        if kind == "rep":
+            _, sub, low, high, lazy = node
+            if (high is None or high > max(low, 1)) and _nullable(sub):
+                raise RegexError(_NULLABLE_LOOP)
+            parts = [sub] * low
+            if high is None:
+                parts.append(("star", sub, lazy))
+            else:
+                parts.extend([("opt", sub, lazy)] * (high - low))
+            node = ("empty",)
+            for part in parts:
+                node = part if node == ("empty",) else ("cat", node, part)
+            return self.build(node)
+        raise RegexError(f"unknown node {kind!r}")
+
+
+class Match:
+    __slots__ = ("re", "string", "pos", "endpos", "_start", "_end")
+
+    def __init__(self, pattern, string, pos, endpos, start, end):
+        self.re = pattern
+        self.string = string
+        self.pos = pos
+        self.endpos = endpos
+        self._start = start
+        self._end = end
+
+    def group(self, group=0):
+        if group != 0:
+            raise IndexError("only group 0 is recorded")
+        return self.string[self._start:self._end]
+
+    __getitem__ = group
+
+    def start(self, group=0):
+        return self.span(group)[0]
+
+    def end(self, group=0):
+        return self.span(group)[1]
+
+    def span(self, group=0):
+        if group != 0:
+            raise IndexError("only group 0 is recorded")
+        return self._start, self._end
+
+    def __repr__(self):
+        return f"<linear_regex.Match object; span={self.span()}, match={self.group()!r}>"
+
+
+class _State:
+    __slots__ = ("pcs", "match", "next")
+
+    def __init__(self, pcs, match):
+        self.pcs = pcs          # live threads, by priority
+        self.match = match      # one of them is at MATCH
+        self.next = {}          # (ch, context mask) -> _State
+
+
+class Pattern:
+    STATE_LIMIT = 1 << 12
+
+    def __init__(self, pattern, flags=0):
+        if flags & ~_FLAGS:
+            raise RegexError("only the DOTALL, MULTILINE and ASCII flags are supported")
+        self.pattern = pattern
+        self.flags = flags
+        program = _Program()
+        start, end = program.build(_LinearParser(pattern, flags).parse())
+        program.next[end] = self._match = program.emit(MATCH)
+        self._op = program.op
+        self._arg = program.arg
+        self._next = program.next
+        self._start = start
+        self._asserts = 0
+        for op, arg in zip(program.op, program.arg):
+            if op == ASSERT:
+                self._asserts |= arg
+        self._word = (_ASCII_CLASSES["w"].__contains__ if flags & ASCII
+                      else _UNICODE_CLASSES["w"])
+        self._closures = {}
+        self._states = {}
+
+    def __len__(self):
+        return len(self._op)
+
+    def __repr__(self):
+        return f"linear_regex.compile({self.pattern!r})"
+
+    # ---- execution ----
+
+    def _context(self, string, i, endpos):
+        """Mask of the assertions that hold at position i."""
+        used = self._asserts
+        if not used:
+            return 0
+        mask = 0
+        if i == 0:
+            mask |= START | BOL
+        elif self.flags & MULTILINE and string[i - 1] == "\n":
+            mask |= BOL
+        if i == endpos:
+            mask |= END | EOL
+        elif string[i] == "\n" and (self.flags & MULTILINE or i == endpos - 1):
+            mask |= EOL
+        if used & (BOUNDARY | NOT_BOUNDARY):
+            word = self._word
+            before = i > 0 and word(string[i - 1])
+            after = i < endpos and word(string[i])
+            if before != after:
+                mask |= BOUNDARY
+            elif endpos:                  # like re, \B never matches an empty string
+                mask |= NOT_BOUNDARY
+        return mask & used
+
+    def _closure(self, pc, mask):
+        """CHAR and MATCH instructions reachable from pc without input, by priority."""
+        key = (pc, mask)
+        found = self._closures.get(key)
+        if found is not None:
+            return found
+        op, arg, nxt = self._op, self._arg, self._next
+        found = []
+        seen = set()
+        stack = [pc]
+        while stack:
+            pc = stack.pop()
+            if pc in seen:
+                continue
+            seen.add(pc)
+            kind = op[pc]
+            if kind == CHAR or kind == MATCH:
+                found.append(pc)
+            elif kind == JMP:
+                stack.append(nxt[pc])
+            elif kind == SPLIT:
+                stack.append(nxt[pc])
+                stack.append(arg[pc])     # preferred branch is explored first
+            elif arg[pc] & mask:
+                stack.append(nxt[pc])
+        found = self._closures[key] = tuple(found)
+        return found
+
+    def _run(self, string, pos, endpos, anchored, full=False, not_empty_at=-1):
+        """(start, end) of the match re would report, or None."""
+        op, arg, nxt = self._op, self._arg, self._next
+        closure = self._closure
+        context = self._context
+        threads = []          # (pc, start) by priority
+        present = set()
+        match = None
+        i = pos
+        while True:
+            if match is None and (not anchored or i == pos):
+                for pc in closure(self._start, context(string, i, endpos)):
+                    if pc not in present:
+                        present.add(pc)
+                        threads.append((pc, i))
+            if not threads:
+                if match is not None or anchored or i >= endpos:
+                    return match
+                i += 1                    # nothing started here; try the next position
+                continue
+            ch = string[i] if i < endpos else None
+            following = []
+            present = set()
+            mask = None
+            for pc, start in threads:
+                if op[pc] == MATCH:
+                    if (full and i != endpos) or (start == i == not_empty_at):
+                        continue
+                    match = (start, i)
+                    break                 # lower-priority threads are cut
+                if ch is not None and ch in arg[pc]:
+                    if mask is None:
+                        mask = context(string, i + 1, endpos)
+                    for target in closure(nxt[pc], mask):
+                        if target not in present:
+                            present.add(target)
+                            following.append((target, start))
+            if ch is None:
+                return match
+            threads = following
+            i += 1
+
+    # ---- anchored runs: thread lists cached as DFA states ----
+    # With a single start position a thread is just its pc, so the ordered
+    # tuple of pcs decides everything that follows. Tuples are interned as
+    # _State objects and each transition is computed once and then followed
+    # through a dict, as in lazy_dfa.py (flushed the same way when full).
+
+    def _state(self, pcs, full):
+        if not full and self._match in pcs:
+            pcs = pcs[:pcs.index(self._match) + 1]      # lower-priority threads are cut
+        key = (pcs, full)
+        state = self._states.get(key)
+        if state is None:
+            if len(self._states) >= self.STATE_LIMIT:
+                self._states = {}
+            state = self._states[key] = _State(pcs, self._match in pcs)
+        return state
+
+    def _step(self, state, ch, mask, full):
+        arg, nxt, closure = self._arg, self._next, self._closure
+        following = []
+        present = set()
+        for pc in state.pcs:
+            if pc != self._match and ch in arg[pc]:
+                for target in closure(nxt[pc], mask):
+                    if target not in present:
+                        present.add(target)
+                        following.append(target)
+        target = state.next[ch, mask] = self._state(tuple(following), full)
+        return target
+
+    def _run_anchored(self, string, pos, endpos, full):
+        """_run(anchored=True) without the per-thread work once states are cached."""
+        context = self._context
+        state = self._state(self._closure(self._start, context(string, pos, endpos)), full)
+        end = pos if state.match else None
+        i = pos
+        while i < endpos and state.pcs:
+            ch = string[i]
+            i += 1
+            mask = context(string, i, endpos)
+            state = state.next.get((ch, mask)) or self._step(state, ch, mask, full)
+            if state.match:
+                end = i
+        if full:
+            return (pos, endpos) if i == endpos and state.match else None
+        return None if end is None else (pos, end)
+
+    def shorter_match(self, alphabet):
+        """Shortest string over `alphabet` on which match() stops short of the
+        longest prefix the pattern matches, or None if there is no such string.
+
+        That is where re's first-match rule and a DFA's longest match part
+        ways. Explores pairs of anchored states, one cut at the first MATCH
+        as match() does and one not cut; patterns with anchors are refused.
+        """
+        if self._asserts:
+            raise RegexError("shorter_match() does not handle anchors")
+        start = self._closure(self._start, 0)
+        pair = (self._state(start, False), self._state(start, True))
+        key = (pair[0].pcs, pair[1].pcs)
+        parent = {key: None}
+        queue = deque([(key, pair)])
+        while queue:
+            key, (chosen, longest) = queue.popleft()
+            if longest.match and not chosen.match:
+                text = []
+                while parent[key] is not None:
+                    key, ch = parent[key]
+                    text.append(ch)
+                return "".join(reversed(text))
+            for ch in alphabet:
+                following = (chosen.next.get((ch, 0)) or self._step(chosen, ch, 0, False),
+                             longest.next.get((ch, 0)) or self._step(longest, ch, 0, True))
+                next_key = (following[0].pcs, following[1].pcs)
+                if following[1].pcs and next_key not in parent:
+                    parent[next_key] = key, ch
+                    queue.append((next_key, following))
+        return None
+
+    def _bounds(self, string, pos, endpos):
+        n = len(string)
+        endpos = n if endpos is None else min(max(endpos, 0), n)
+        return min(max(pos, 0), n), endpos
+
+    def match(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        span = self._run_anchored(string, pos, endpos, full=False)
+        return Match(self, string, pos, endpos, *span) if span else None
+
+    def fullmatch(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        span = self._run_anchored(string, pos, endpos, full=True)
+        return Match(self, string, pos, endpos, *span) if span else None
+
+    def search(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        span = self._run(string, pos, endpos, anchored=False)
+        return Match(self, string, pos, endpos, *span) if span else None
+
+    def finditer(self, string, pos=0, endpos=None):
+        pos, endpos = self._bounds(string, pos, endpos)
+        not_empty_at = -1
+        while pos <= endpos:
+            span = self._run(string, pos, endpos, anchored=False, not_empty_at=not_empty_at)
+            if span is None:
+                return
+            yield Match(self, string, pos, endpos, *span)
+            start, pos = span
+            # after an empty match, the next one may not be empty at the same place
+            not_empty_at = pos if start == pos else -1
+
+
+_cache = {}
+
+
+def compile(pattern, flags=0):
+    """Pattern for `pattern`; compiled patterns are cached like re's."""
+    key = (pattern, flags)
+    compiled = _cache.get(key)
+    if compiled is None:
+        if len(_cache) >= 512:
+            _cache.clear()
+        compiled = _cache[key] = Pattern(pattern, flags)
+    return compiled
+
+
+def match(pattern, string, flags=0):
+    return compile(pattern, flags).match(string)
+
+
+def fullmatch(pattern, string, flags=0):
+    return compile(pattern, flags).fullmatch(string)
+
+
+def search(pattern, string, flags=0):
+    return compile(pattern, flags).search(string)
+
+
+def finditer(pattern, string, flags=0):
+    return compile(pattern, flags).finditer(string)
@@ -0,0 +1,128 @@
+# Parallel DFA simulation by chunking and composing transition functions.
+# A DFA run over a chunk of input is a function f: state -> state. The input
+# is cut into chunks; worker processes compute f for every chunk but the
+# first, starting from every live state, and the parent composes them left to
+# right:  state = f_n(...f_2(f_1(start)))
+# The first chunk only needs the real start state, so the parent runs it
+# itself while the workers are busy.
+#
+# Running from every state costs up to n_states times the sequential work, but
+# the runs merge as soon as two of them reach the same state, and for most
+# DFAs they collapse to one or two within a few bytes. The chunk is walked a
+# block at a time, one tight loop per distinct state, and merged runs are
+# grouped between blocks. Runs that reach the dead state are dropped.
+#
+# Files are read by the workers themselves through mmap, so only offsets are
+# sent to them; in-memory data is sent chunk by chunk.
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from compiled_dfa import CompiledDFA, from_table
+
+BLOCK = 1 << 14
+MIN_CHUNK = 1 << 20           # below this a chunk is not worth a process
+MAX_CHUNK = 64 << 20          # bounds the memory a worker holds at once
+
+
+def transition_map(dfa, data, block=BLOCK):
+    """List m with m[s] = state reached from state s after reading `data`."""
+    trans = dfa._trans
+    k = dfa.n_classes
+    dead = dfa.dead
+    dead_row = -1 if dead is None else dead * k
+    classes = bytes(data).translate(dfa.class_map)
+    # row offset of every distinct run -> the start states that took it
+    groups = {s * k: [s] for s in range(dfa.n_states) if s != dead}
+    for lo in range(0, len(classes), block):
+        piece = classes[lo:lo + block]
+        moved = {}
+        for s, members in groups.items():
+            for c in piece:
+                s = trans[s + c]
+            if s != dead_row:
+                moved.setdefault(s, []).extend(members)
+        groups = moved
+        if not groups:
+            break
+    mapping = [dead] * dfa.n_states
+    for s, members in groups.items():
+        for state in members:
+            mapping[state] = s // k
+    return mapping
+
+
+def compose(state, mappings):
+    for mapping in mappings:
+        state = mapping[state]
+    return state
+
+
+# ---- workers ----
+
+_dfa = None
+
+
+def _init_worker(dfa):
+    global _dfa
+    _dfa = dfa
+
+
+def _map_bytes(data):
+    return transition_map(_dfa, data)
+
+
+def _map_file(path, lo, hi):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return transition_map(_dfa, mm[lo:hi])
+
+
+def _chunk_bounds(size, workers, chunk_size):
+    if chunk_size is None:
+        chunk_size = min(max(-(-size // workers), MIN_CHUNK), MAX_CHUNK)
+    return [(lo, min(lo + chunk_size, size)) for lo in range(0, size, chunk_size)]
+
+
+def parallel_final_state(dfa, source, workers=None, chunk_size=None):
+    """Final state id of `dfa` (a CompiledDFA) over `source`.
+
+    source is a bytes-like object or the path of a file. With one worker or
+    a single chunk this is just dfa.final_state().
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    is_path = isinstance(source, (str, os.PathLike))
+    size = os.path.getsize(source) if is_path else len(source)
+    bounds = _chunk_bounds(size, workers, chunk_size)
+
+    if workers <= 1 or len(bounds) <= 1:
+        if not is_path:
+            return dfa.final_state(source)
+        state = dfa.start
+        with open(source, "rb") as f:
+            for lo, hi in bounds:
+                state = dfa.final_state(f.read(hi - lo), state)
+        return state
+
+    view = None if is_path else memoryview(source)
+    with ProcessPoolExecutor(min(workers, len(bounds) - 1),
+                             initializer=_init_worker, initargs=(dfa,)) as pool:
+        if is_path:
+            futures = [pool.submit(_map_file, os.fspath(source), lo, hi)
+                       for lo, hi in bounds[1:]]
+            lo, hi = bounds[0]
+            with open(source, "rb") as f:
+                first = f.read(hi - lo)
+        else:
+            futures = [pool.submit(_map_bytes, bytes(view[lo:hi])) for lo, hi in bounds[1:]]
+            first = view[bounds[0][0]:bounds[0][1]]
+        state = dfa.final_state(first)
+        return compose(state, (future.result() for future in futures))
+
+
+def parallel_run(dfa, source, workers=None, chunk_size=None, start=None, accept=None):
+    """True if the DFA accepts all of `source`; dfa is a CompiledDFA or a dict table."""
+    if not isinstance(dfa, CompiledDFA):
+        dfa = from_table(dfa, start, accept)
+    return dfa.is_accepting(parallel_final_state(dfa, source, workers, chunk_size))
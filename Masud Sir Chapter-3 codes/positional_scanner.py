@@ -0,0 +1,55 @@
+# Positional scanning engine.
+# The master pattern is compiled once and matched in place with
+# regex.match(code, pos), so no copy of the remaining input is made per token.
+# On an illegal character, regex.search(code, pos) jumps straight to the next
+# position where a valid token starts, so a whole illegal run is skipped in one
+# step instead of one character at a time.
+
+import re
+
+from source_index import SourceIndex
+
+
+class PositionalScanner:
+    def __init__(self, token_specification, skip=("WHITESPACE",)):
+        self.regex = re.compile("|".join(
+            f"(?P<{name}>{pattern})" for name, pattern in token_specification))
+        self.skip = frozenset(skip)
+
+    def scan(self, code):
+        """Yield (value, kind, index); an illegal run comes out as kind "ERROR"."""
+        match = self.regex.match
+        search = self.regex.search
+        skip = self.skip
+        index = 0
+        length = len(code)
+        while index < length:
+            m = match(code, index)
+            if m is None:
+                # panic mode: one search finds where the next valid token starts
+                m = search(code, index + 1)
+                stop = m.start() if m else length
+                yield code[index:stop], "ERROR", index
+                index = stop
+                if m is None:
+                    break
+            kind = m.lastgroup
+            if kind not in skip:
+                yield m.group(), kind, index
+            index = m.end()
+
+    def tokens_and_errors(self, code):
+        """Split scan() into (tokens, errors): tokens are (value, kind), errors
+        (illegal_run, index, line, column), placed with one SourceIndex of code."""
+        tokens = []
+        errors = []
+        for value, kind, index in self.scan(code):
+            if kind == "ERROR":
+                errors.append((value, index))
+            else:
+                tokens.append((value, kind))
+        if errors:
+            positions = SourceIndex(code).positions(index for _, index in errors)
+            errors = [(value, index, line, column)
+                      for (value, index), (line, column) in zip(errors, positions)]
+        return tokens, errors
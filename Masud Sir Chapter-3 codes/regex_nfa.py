@@ -0,0 +1,347 @@
+# Regular expression -> NFA (Thompson's construction).
+# Supported syntax: concatenation, |, *, +, ?, {m}, {m,}, {m,n}, ( ),
+# character classes [abc] [a-z] [^...], . and escapes (\d \w \s \D \W \S,
+# \n \t \r \f \v and any escaped punctuation). Anything else re gives a
+# meaning to -- anchors (^ $ \b \B \A \Z), other letter or digit escapes,
+# lazy quantifiers, (?...) groups -- raises RegexError instead of being read
+# as literal characters.
+#
+# Internally the NFA is a set of integer arrays: state i either moves on a
+# character class (cls[i] >= 0, target out1[i]) or has up to two
+# epsilon moves (out1[i], out2[i]; -1 when absent). to_dict() gives the
+# {state: {symbol: [next_states]}} tables the simulators in this chapter use,
+# with EPSILON as the symbol of epsilon moves.
+
+from array import array
+
+EPSILON = "ε"
+
+# . and negated classes are taken relative to 7-bit ASCII
+ALPHABET = frozenset(chr(c) for c in range(128))
+
+_DIGITS = frozenset("0123456789")
+_WORD = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+_SPACE = frozenset(" \t\n\r\f\v")
+_CLASS_ESCAPES = {
+    "d": _DIGITS, "w": _WORD, "s": _SPACE,
+    "D": ALPHABET - _DIGITS, "W": ALPHABET - _WORD, "S": ALPHABET - _SPACE,
+}
+_CHAR_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+
+class RegexError(ValueError):
+    pass
+
+
+# ---------------- Parser: pattern -> syntax tree ----------------
+# Nodes: ("chars", frozenset) ("cat", a, b) ("alt", a, b) ("star", a)
+#        ("plus", a) ("opt", a) ("rep", a, m, n_or_None) ("empty",)
+
+class _Parser:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, message):
+        raise RegexError(f"{message} at position {self.pos} in {self.pattern!r}")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def take(self):
+        ch = self.peek()
+        if ch is None:
+            self.error("unexpected end of pattern")
+        self.pos += 1
+        return ch
+
+    def parse(self):
+        node = self.alternation()
+        if self.peek() is not None:
+            self.error(f"unexpected {self.peek()!r}")
+        return node
+
+    def alternation(self):
+        node = self.concatenation()
+        while self.peek() == "|":
+            self.pos += 1
+            node = ("alt", node, self.concatenation())
+        return node
+
+    def concatenation(self):
+        node = None
+        while self.peek() not in (None, "|", ")"):
+            item = self.repetition()
+            node = item if node is None else ("cat", node, item)
+        return node or ("empty",)
+
+    def repetition(self):
+        node = self.atom()
+        while True:
+            ch = self.peek()
+            if ch == "*":
+                node = ("star", node)
+            elif ch == "+":
+                node = ("plus", node)
+            elif ch == "?":
+                node = ("opt", node)
+            elif ch == "{":
+                node = self.counted(node)
+                self._single_repeat()
+                continue
+            else:
+                return node
+            self.pos += 1
+            self._single_repeat()
+
+    def _single_repeat(self):
+        if self.peek() in ("*", "+", "?", "{"):
+            self.error("multiple repeat (lazy quantifiers are not supported)")
+
+    def counted(self, node):
+        self.pos += 1
+        low = self.number()
+        high = low
+        if self.peek() == ",":
+            self.pos += 1
+            high = self.number() if self.peek() != "}" else None
+        if self.take() != "}":
+            self.error("expected '}'")
+        if low is None or (high is not None and high < low):
+            self.error("bad repetition count")
+        return ("rep", node, low, high)
+
+    def number(self):
+        start = self.pos
+        while self.peek() is not None and self.peek().isdigit():
+            self.pos += 1
+        return int(self.pattern[start:self.pos]) if self.pos > start else None
+
+    def atom(self):
+        ch = self.take()
+        if ch == "(":
+            if self.pattern.startswith("?:", self.pos):
+                self.pos += 2
+            elif self.peek() == "?":
+                self.error("unsupported group")
+            node = self.alternation()
+            if self.take() != ")":
+                self.error("expected ')'")
+            return node
+        if ch == "[":
+            return ("chars", self.char_class())
+        if ch == ".":
+            return ("chars", ALPHABET - {"\n"})
+        if ch == "\\":
+            return ("chars", self.escape())
+        if ch in "*+?{":
+            self.error(f"nothing to repeat before {ch!r}")
+        if ch in ")|":
+            self.error(f"unexpected {ch!r}")
+        if ch in "^$":
+            self.error(f"unsupported anchor {ch!r}")
+        return ("chars", frozenset(ch))
+
+    def escape(self):
+        ch = self.take()
+        if ch in _CLASS_ESCAPES:
+            return _CLASS_ESCAPES[ch]
+        if ch in _CHAR_ESCAPES:
+            return frozenset(_CHAR_ESCAPES[ch])
+        if ch.isalnum():
+            self.error(f"unsupported escape \\{ch}")
+        return frozenset(ch)
+
+    def char_class(self):
+        negate = self.peek() == "^"
+        if negate:
+            self.pos += 1
+        chars = set()
+        first = True
+        while True:
+            ch = self.take()
+            if ch == "]" and not first:
+                break
+            first = False
+            item = self.escape() if ch == "\\" else None
+            ranged = self.peek() == "-" and self.pattern[self.pos + 1:self.pos + 2] not in ("]", "")
+            if item is not None:
+                if len(item) > 1:
+                    if ranged:
+                        self.error("bad character range")    # [\d-z]
+                    chars |= item
+                    continue
+                (ch,) = item
+            if ranged:
+                self.pos += 1
+                end = self.take()
+                if end == "\\":
+                    item = self.escape()
+                    if len(item) > 1:
+                        self.error("bad character range")    # [a-\d]
+                    (end,) = item
+                if ord(end) < ord(ch):
+                    self.error("bad character range")
+                chars.update(chr(c) for c in range(ord(ch), ord(end) + 1))
+            else:
+                chars.add(ch)
+        return ALPHABET - chars if negate else frozenset(chars)
+
+
+def parse(pattern):
+    return _Parser(pattern).parse()
+
+
+# ---------------- Thompson construction: tree -> NFA ----------------
+
+class NFA:
+    def __init__(self):
+        self.cls = array("i")    # character class index, or -1 for epsilon states
+        self.out1 = array("i")
+        self.out2 = array("i")
+        self.classes = []        # class index -> frozenset of characters
+        self._class_ids = {}
+        self.start = -1
+        self.accept = -1
+
+    def __len__(self):
+        return len(self.cls)
+
+    def new_state(self, cls=-1, out1=-1, out2=-1):
+        self.cls.append(cls)
+        self.out1.append(out1)
+        self.out2.append(out2)
+        return len(self.cls) - 1
+
+    def class_id(self, chars):
+        cid = self._class_ids.get(chars)
+        if cid is None:
+            cid = self._class_ids[chars] = len(self.classes)
+            self.classes.append(chars)
+        return cid
+
+    def epsilon(self, state, target):
+        if self.out1[state] == -1:
+            self.out1[state] = target
+        else:
+            self.out2[state] = target
+
+    def build(self, node):
+        """Return (start, end) of the fragment for `node`."""
+        kind = node[0]
+        if kind == "chars":
+            end = self.new_state()
+            return self.new_state(self.class_id(node[1]), end), end
+        if kind == "empty":
+            end = self.new_state()
+            return self.new_state(out1=end), end
+        if kind == "cat":
+            s1, e1 = self.build(node[1])
+            s2, e2 = self.build(node[2])
+            self.epsilon(e1, s2)
+            return s1, e2
+        if kind == "alt":
+            s1, e1 = self.build(node[1])
+            s2, e2 = self.build(node[2])
+            end = self.new_state()
+            self.epsilon(e1, end)
+            self.epsilon(e2, end)
+            return self.new_state(out1=s1, out2=s2), end
+        if kind in ("star", "plus", "opt"):
+            s1, e1 = self.build(node[1])
+            end = self.new_state()
+            self.epsilon(e1, end)
+            if kind != "opt":
+                self.epsilon(e1, s1)      # loop back
+            if kind == "plus":
+                return s1, end
+            return self.new_state(out1=s1, out2=end), end
+        if kind == "rep":
+            _, sub, low, high = node
+            parts = [sub] * low
+            if high is None:
+                parts.append(("star", sub))
+            else:
+                parts.extend([("opt", sub)] * (high - low))
+            if not parts:
+                return self.build(("empty",))
+            start, end = self.build(parts[0])
+            for part in parts[1:]:
+                s, e = self.build(part)
+                self.epsilon(end, s)
+                end = e
+            return start, end
+        raise RegexError(f"unknown node {kind!r}")
+
+    # ---- views used by the rest of the chapter ----
+
+    def alphabet(self):
+        symbols = set()
+        for chars in self.classes:
+            symbols |= chars
+        return symbols
+
+    def to_dict(self):
+        """{state: {symbol: [next_states]}}, epsilon moves under EPSILON."""
+        table = {}
+        for state in range(len(self.cls)):
+            moves = {}
+            cid = self.cls[state]
+            if cid >= 0:
+                for ch in sorted(self.classes[cid]):
+                    moves[ch] = [self.out1[state]]
+            else:
+                targets = [t for t in (self.out1[state], self.out2[state]) if t != -1]
+                if targets:
+                    moves[EPSILON] = targets
+            table[state] = moves
+        return table
+
+    def epsilon_closure(self, states):
+        stack = list(states)
+        closure = set(stack)
+        while stack:
+            state = stack.pop()
+            if self.cls[state] < 0:
+                for target in (self.out1[state], self.out2[state]):
+                    if target != -1 and target not in closure:
+                        closure.add(target)
+                        stack.append(target)
+        return closure
+
+    def accepts(self, string):
+        current = self.epsilon_closure([self.start])
+        for ch in string:
+            moved = [self.out1[s] for s in current
+                     if self.cls[s] >= 0 and ch in self.classes[self.cls[s]]]
+            if not moved:
+                return False
+            current = self.epsilon_closure(moved)
+        return self.accept in current
+
+
+def compile_nfa(pattern):
+    """Build the Thompson NFA of `pattern`; the result has one accept state."""
+    nfa = NFA()
+    nfa.start, nfa.accept = nfa.build(parse(pattern))
+    return nfa
+
+
+if __name__ == "__main__":
+    nfa = compile_nfa("(a|b)*ab")
+    for state, moves in nfa.to_dict().items():
+        print(state, moves)
+    print("start:", nfa.start, "accept:", nfa.accept)
+
+    # self-check: assertions and escapes without a meaning here are refused
+    for bad in (r"\bint\b", r"\Bx", r"\Aa", r"a\Z", r"\x41", r"\1", "^a", "a$",
+                "a*?", "a{2}+", "(?=a)", r"[\b]"):
+        try:
+            compile_nfa(bad)
+        except RegexError:
+            continue
+        raise AssertionError(f"{bad!r} was accepted")
+    for good, text in ((r"\d+\.\d*", "12.5"), (r"[\w\-]+", "a-b_1"), (r"\(\*\)", "(*)"),
+                       (r"\t\n", "\t\n"), (r"[^\s]{2,}", "ab")):
+        assert compile_nfa(good).accepts(text), good
+    print("self-check passed")
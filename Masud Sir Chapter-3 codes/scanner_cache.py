@@ -0,0 +1,111 @@
+# Compiled scanners, memoized per rule set.
+# get_scanner(rules) joins the (name, regex) rules into one master pattern,
+# compiles it and keeps the result in a process-wide LRU keyed by a hash of the
+# rules, so callers that scan per request with the same few rule sets compile
+# each set once. cache_info() reports hits, misses and the time spent
+# compiling.
+#
+# A Scanner yields (kind_id, start, end) tuples; kind_names[kind_id] is the
+# rule name. The kind is read from match.lastindex through a table built at
+# compile time, which is cheaper than looking up match.lastgroup by name.
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = 32
+DEFAULT_SKIP = ("SKIP", "WHITESPACE")
+
+
+class Scanner:
+    def __init__(self, rules, skip=DEFAULT_SKIP, flags=0):
+        start = time.perf_counter()
+        self.regex = re.compile(
+            "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules), flags)
+        self.kind_names = tuple(name for name, _ in rules)
+        self.kind_ids = {name: i for i, name in enumerate(self.kind_names)}
+        # group index -> kind id; groups nested inside a rule map to that rule
+        self._kind_of_group = [None] * (self.regex.groups + 1)
+        for i, name in enumerate(self.kind_names):
+            first = self.regex.groupindex[name]
+            last = (self.regex.groupindex[self.kind_names[i + 1]]
+                    if i + 1 < len(self.kind_names) else self.regex.groups + 1)
+            self._kind_of_group[first:last] = [i] * (last - first)
+        self.skip = frozenset(self.kind_ids[name] for name in skip if name in self.kind_ids)
+        self.compile_time = time.perf_counter() - start
+
+    def scan(self, code, pos=0, endpos=None):
+        """Yield (kind_id, start, end) for every token that is not skipped."""
+        kind_of_group = self._kind_of_group
+        skip = self.skip
+        matches = self.regex.finditer(code, pos) if endpos is None else \
+            self.regex.finditer(code, pos, endpos)
+        for m in matches:
+            kind = kind_of_group[m.lastindex]
+            if kind not in skip:
+                yield kind, m.start(), m.end()
+
+    __call__ = scan
+
+    def tokens(self, code):
+        """Yield (value, kind_name) pairs, for printing."""
+        names = self.kind_names
+        for kind, start, end in self.scan(code):
+            yield code[start:end], names[kind]
+
+    def __repr__(self):
+        return f"<Scanner {len(self.kind_names)} rules>"
+
+
+def rules_key(rules, skip=DEFAULT_SKIP, flags=0):
+    """Stable digest of a rule set (the same in every process)."""
+    text = repr(([(str(name), str(pattern)) for name, pattern in rules],
+                 sorted(skip), int(flags)))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "compile_time": 0.0}
+
+
+def get_scanner(rules, skip=DEFAULT_SKIP, flags=0):
+    """Return the compiled Scanner for `rules`, compiling it on first use."""
+    # the rules as a tuple: hashing it reuses the strings' cached hashes, so
+    # a lookup costs far less than the digest in rules_key()
+    key = (tuple(map(tuple, rules)), tuple(skip), flags)
+    with _lock:
+        scanner = _cache.get(key)
+        if scanner is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return scanner
+    scanner = Scanner(rules, skip, flags)
+    with _lock:
+        _stats["misses"] += 1
+        _stats["compile_time"] += scanner.compile_time
+        _cache[key] = scanner
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return scanner
+
+
+def cache_info():
+    with _lock:
+        calls = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_rate": _stats["hits"] / calls if calls else 0.0,
+            "size": len(_cache),
+            "maxsize": CACHE_SIZE,
+            "compile_time": _stats["compile_time"],
+        }
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, compile_time=0.0)
@@ -0,0 +1,251 @@
+# Code-generating scanner backend.
+# The minimized DFA of scanner_tables.build_tables() is written out as a
+# standalone Python module: the state is an integer local, each state's moves
+# are branches on the character class, and the token bookkeeping (the rule
+# recognized, where it ends) is inlined into the branches that enter an
+# accepting state. Both the state dispatch and the class branches are
+# balanced if/else trees, so a step costs O(log states + log classes)
+# comparisons and no table lookups.
+#
+# Modules are written to a cache directory as scanner_<digest>.py and
+# imported from there on later runs (Python then also reuses their .pyc).
+# A module whose RULES_DIGEST does not match the rules is regenerated.
+# Importing a file runs it, so the cache is per user (under XDG_CACHE_HOME or
+# ~/.cache, not the shared temp dir): the directory is created 0o700, and it
+# and every module are checked to belong to this user and be closed to others
+# before anything is read from them.
+#
+# fastest_scanner() times the three backends -- the re master pattern, the
+# table-driven DFA and the generated module -- on a sample and keeps the
+# fastest. The DFA backends follow Lex's longest-match rule while re takes the
+# first alternative that matches: build_tables() refuses rule sets on which
+# the two differ, and a DFA backend is only a candidate if its tokens on the
+# sample are re's, so the choice never changes the tokens.
+
+import importlib.util
+import os
+import stat
+import time
+
+from regex_nfa import RegexError
+from scanner_cache import DEFAULT_SKIP, get_scanner, rules_key
+from scanner_tables import build_tables, load_scanner
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                         "chapter3_scanners")
+
+_HEADER = '''\
+# Generated by scanner_codegen; do not edit.
+# {n_states} DFA states, {n_classes} character classes.
+
+RULES_DIGEST = {digest!r}
+KIND_NAMES = {names!r}
+CLASS_MAP = {class_map!r}
+
+
+def scan(code, pos=0, endpos=None, skip=frozenset()):
+    if isinstance(code, str):
+        code = code.encode("ascii", "replace")
+    classes = code[:endpos].translate(CLASS_MAP)
+    n = len(classes)
+    while pos < n:
+        state = 0
+        kind = -1
+        end = pos
+        i = pos
+        while i < n:
+            c = classes[i]
+            i += 1'''
+
+_FOOTER = '''\
+        if kind < 0:
+            pos += 1
+            continue
+        if kind not in skip:
+            yield kind, pos, end
+        pos = end
+'''
+
+
+def _runs(row):
+    """[(first_class, last_class, target)] for consecutive classes with one target."""
+    runs = []
+    for c, target in enumerate(row):
+        if runs and runs[-1][2] == target:
+            runs[-1][1] = c
+        else:
+            runs.append([c, c, target])
+    return runs
+
+
+def _emit_tree(lines, items, indent, leaf, key, var):
+    """Balanced if/else over sorted `items`, comparing `var` with key(item)."""
+    if len(items) == 1:
+        leaf(lines, items[0], indent)
+        return
+    mid = len(items) // 2
+    pad = " " * indent
+    lines.append(f"{pad}if {var} < {key(items[mid])}:")
+    _emit_tree(lines, items[:mid], indent + 4, leaf, key, var)
+    lines.append(f"{pad}else:")
+    _emit_tree(lines, items[mid:], indent + 4, leaf, key, var)
+
+
+def generate_source(tables):
+    """Python source of a scanner module for ScannerTables `tables`."""
+    k = tables.n_classes
+    dead = tables.dead
+    # renumber the states so the start state is 0 and the dead state is gone
+    order = [tables.start] + [s for s in range(tables.n_states) if s not in (tables.start, dead)]
+    new_id = {old: new for new, old in enumerate(order)}
+    rows = [[tables.trans[old * k + c] // k for c in range(k)] for old in order]
+    rows = [[None if t == dead else new_id[t] for t in row] for row in rows]
+    token = [tables.token[old] for old in order]
+    final = [all(t is None for t in row) for row in rows]  # nothing can follow
+
+    def move(lines, run, indent):
+        pad = " " * indent
+        target = run[2]
+        if target is None:
+            lines.append(f"{pad}break")
+            return
+        if not final[target]:
+            lines.append(f"{pad}state = {target}")
+        if token[target] >= 0:
+            lines.append(f"{pad}kind = {token[target]}")
+            lines.append(f"{pad}end = i")
+        if final[target]:
+            lines.append(f"{pad}break")
+
+    def state_code(lines, state, indent):
+        _emit_tree(lines, _runs(rows[state]), indent, move, lambda run: run[0], "c")
+
+    lines = [_HEADER.format(n_states=len(order), n_classes=k, digest=tables.digest,
+                            names=tuple(tables.names), class_map=bytes(tables.class_map))]
+    _emit_tree(lines, list(range(len(order))), 12, state_code, lambda s: s, "state")
+    lines.append(_FOOTER)
+    return "\n".join(lines)
+
+
+_modules = {}  # path -> module imported by this process
+
+
+def _check_private(path, closed=0o022):
+    """Raise PermissionError unless `path` is this user's, not a symlink, and
+    grants others none of the `closed` mode bits."""
+    info = os.lstat(path)
+    if stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & closed:
+        raise PermissionError(f"{path} must be owned by this user and closed to others")
+
+
+def private_dir(cache_dir):
+    """Create `cache_dir` with mode 0o700 if needed and check that it is private."""
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    _check_private(cache_dir, 0o077)
+    return cache_dir
+
+
+def _import(path):
+    _check_private(path)
+    spec = importlib.util.spec_from_file_location(
+        os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_module(rules, cache_dir=CACHE_DIR):
+    """Import the generated scanner module for `rules`, generating it if needed."""
+    digest = rules_key(rules, (), 0)
+    path = os.path.join(private_dir(cache_dir), f"scanner_{digest[:16]}.py")
+    module = _modules.get(path)
+    if module is None and os.path.exists(path):
+        module = _import(path)
+    if getattr(module, "RULES_DIGEST", None) == digest:
+        _modules[path] = module
+        return module
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(generate_source(build_tables(rules)))
+    os.replace(tmp, path)
+    module = _modules[path] = _import(path)
+    return module
+
+
+class GeneratedScanner:
+    """Scanner backed by a generated module; same API as scanner_cache.Scanner."""
+
+    def __init__(self, module, skip=DEFAULT_SKIP):
+        self.module = module
+        self.kind_names = tuple(module.KIND_NAMES)
+        self.kind_ids = {name: i for i, name in enumerate(self.kind_names)}
+        self.skip = frozenset(self.kind_ids[name] for name in skip if name in self.kind_ids)
+        self._scan = module.scan
+
+    def scan(self, code, pos=0, endpos=None):
+        """Yield (kind_id, start, end); characters no rule matches are passed over."""
+        return self._scan(code, pos, endpos, self.skip)
+
+    __call__ = scan
+
+    def tokens(self, code):
+        """Yield (value, kind_name) pairs, for printing."""
+        names = self.kind_names
+        for kind, start, end in self.scan(code):
+            yield code[start:end], names[kind]
+
+    def __repr__(self):
+        return f"<GeneratedScanner {len(self.kind_names)} rules, {self.module.__file__}>"
+
+
+def load_generated_scanner(rules, cache_dir=CACHE_DIR, skip=DEFAULT_SKIP):
+    return GeneratedScanner(load_module(rules, cache_dir), skip)
+
+
+BACKENDS = ("re", "table", "codegen")
+
+
+def backend_scanner(rules, backend="re", cache_dir=CACHE_DIR, skip=DEFAULT_SKIP):
+    """Scanner for `rules` from one backend; the DFA ones keep their files in cache_dir."""
+    if backend == "re":
+        return get_scanner(rules, skip)
+    if backend == "table":
+        name = f"scanner_{rules_key(rules, (), 0)[:16]}.tables"
+        return load_scanner(rules, os.path.join(private_dir(cache_dir), name), skip)
+    if backend == "codegen":
+        return load_generated_scanner(rules, cache_dir, skip)
+    raise ValueError(f"unknown scanner backend {backend!r}")
+
+
+def fastest_scanner(rules, sample, cache_dir=CACHE_DIR, skip=DEFAULT_SKIP, repeat=3):
+    """Return (backend, scanner, timings) for the backend that scans `sample` fastest.
+
+    timings maps each backend to its best time in seconds. The re backend
+    is always timed; a DFA backend is timed only if it builds (build_tables()
+    raises RegexError for rules it cannot reproduce, \\b and lookaround among
+    them) and gives re's tokens on `sample`.
+    """
+    timings = {}
+    scanners = {}
+    expected = None
+    for backend in BACKENDS:
+        try:
+            scanner = backend_scanner(rules, backend, cache_dir, skip)
+        except RegexError:
+            continue
+        tokens = list(scanner.scan(sample))
+        if expected is None:
+            expected = tokens
+        elif tokens != expected:
+            continue
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in scanner.scan(sample):
+                pass
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[backend] = best
+        scanners[backend] = scanner
+    backend = min(timings, key=timings.get)
+    return backend, scanners[backend], timings
@@ -0,0 +1,254 @@
+# DFA scanner tables, persisted in a binary file that is loaded with mmap.
+# build_tables(rules) runs the whole chapter pipeline once:
+#   rules -> one Thompson NFA (a start state with epsilon moves into every rule)
+#         -> subset construction -> Hopcroft minimization -> byte classes
+# Each DFA state is labelled with the token it recognizes: the first rule
+# (highest priority) whose accept state is in its NFA state set.
+#
+# load_scanner(rules, path) maps the file instead. Its header carries a digest
+# of the rules (scanner_cache.rules_key); if the file is missing, stale or from
+# another format version it is rebuilt and replaced atomically. The arrays are
+# used in place through memoryviews of the mapping, so every process that
+# loads the same file shares its pages and does no construction at startup.
+#
+# File layout (little-endian; sections start on 8-byte boundaries):
+#   header     MAGIC, version, 32-byte rules digest, n_states, n_classes,
+#              start, dead, item size of trans, n_rules, CRC-32 of the
+#              other fields and the sections
+#   class_map  256 bytes: byte -> class
+#   trans      n_states * n_classes entries (u16 or u32), row offsets as in
+#              CompiledDFA
+#   token      n_states i16: rule index recognized in each state, -1 if none
+#   names      rule names, UTF-8, newline-separated
+# A file that is truncated or fails its CRC is rebuilt like a stale one.
+#
+# Scanning is Lex's rule: the longest match wins, ties go to the earlier rule.
+# Patterns use the regex_nfa syntax (ASCII, no lookaround). build_tables()
+# refuses rule sets on which that differs from the re master pattern's first
+# match (check_rules), so the tables never quietly disagree with the rules.
+
+import mmap
+import os
+import re
+import struct
+import zlib
+from array import array
+
+import linear_regex
+from compiled_dfa import from_table
+from dfa_minimize import minimize
+from regex_nfa import ALPHABET, NFA, RegexError, parse
+from scanner_cache import DEFAULT_SKIP, rules_key
+from subset_construction import subset_construction
+
+MAGIC = b"LEXTABLE"
+VERSION = 2
+_HEADER = struct.Struct("<8sI32sIIIIIII")
+ALPHABET_ORDER = "".join(sorted(ALPHABET))
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _crc(fields, body):
+    """CRC-32 of the header fields (all but the CRC itself) and the sections."""
+    return zlib.crc32(body, zlib.crc32(_HEADER.pack(*fields, 0)))
+
+
+class ScannerTables:
+    """The arrays of a compiled scanner; in memory or views of a mapped file."""
+
+    def __init__(self, class_map, trans, token, n_classes, start, dead, names, digest):
+        self.class_map = class_map
+        self.trans = trans
+        self.token = token
+        self.n_classes = n_classes
+        self.n_states = len(token)
+        self.start = start
+        self.dead = dead
+        self.names = names
+        self.digest = digest
+
+    def to_bytes(self):
+        names = "\n".join(self.names).encode()
+        trans = bytes(self.trans)
+        token = bytes(self.token)
+        body = bytearray()
+        for section in (bytes(self.class_map), trans, token, names):
+            body += section
+            body += bytes(_align(len(body)) - len(body))
+        fields = (MAGIC, VERSION, bytes.fromhex(self.digest), self.n_states, self.n_classes,
+                  self.start, self.dead, self.trans.itemsize, len(self.names))
+        header = _HEADER.pack(*fields, _crc(fields, body))
+        return header + bytes(_align(len(header)) - len(header)) + bytes(body)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Tables viewing `buffer` (bytes or an mmap) without copying the arrays."""
+        view = memoryview(buffer)
+        *fields, crc = _HEADER.unpack_from(view)
+        magic, version, digest, n_states, k, start, dead, itemsize, n_rules = fields
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a scanner table file of this version")
+        pos = _align(_HEADER.size)
+        if _crc(fields, view[pos:]) != crc or itemsize not in (2, 4):
+            raise ValueError("corrupt scanner table file")
+        class_map = view[pos:pos + 256]
+        pos = _align(pos + 256)
+        size = n_states * k * itemsize
+        trans = view[pos:pos + size]
+        pos = _align(pos + size)
+        token = view[pos:pos + 2 * n_states]
+        pos = _align(pos + 2 * n_states)
+        if len(view) < pos or len(trans) != size:
+            raise ValueError("truncated scanner table file")
+        trans = trans.cast("H" if itemsize == 2 else "I")
+        token = token.cast("h")
+        names = bytes(view[pos:]).rstrip(b"\0").decode().split("\n")
+        if len(names) != n_rules:
+            raise ValueError("truncated scanner table file")
+        return cls(class_map, trans, token, k, start, dead, names, digest.hex())
+
+
+def check_rules(rules):
+    """Raise RegexError unless a longest-match DFA tokenizes like the re master pattern.
+
+    re takes the first rule that matches and that rule's own first match;
+    the DFA takes the longest match of any rule. The two agree on every
+    ASCII input exactly when no string makes the pattern's match stop short
+    of its longest one (linear_regex.shorter_match), and no rule matches ""
+    (re yields empty tokens there, the DFA skips a character).
+    """
+    joined = "|".join(f"(?:{pattern})" for _, pattern in rules)
+    pattern = linear_regex.compile(joined, linear_regex.ASCII)
+    if pattern.fullmatch("") is not None:
+        raise RegexError("a rule matches the empty string")
+    text = pattern.shorter_match(ALPHABET_ORDER)
+    if text is not None:
+        named = re.compile("|".join(f"(?P<{name}>{p})" for name, p in rules))
+        first = named.match(text)
+        longest = next(name for name, p in rules if re.fullmatch(p, text))
+        raise RegexError(f"on {text!r} re takes {first.group()!r} as {first.lastgroup} "
+                         f"but the longest match is {text!r} as {longest}; "
+                         f"a DFA scanner cannot reproduce these rules")
+
+
+def build_tables(rules):
+    nfa = NFA()
+    starts = []
+    accept = {}
+    for i, (_, pattern) in enumerate(rules):
+        start, end = nfa.build(parse(pattern))
+        starts.append(start)
+        accept[end] = i
+    check_rules(rules)
+    # chain of two-way epsilon splits into every rule
+    start = starts[-1]
+    for s in reversed(starts[:-1]):
+        start = nfa.new_state(out1=s, out2=start)
+
+    dfa, _, state_sets = subset_construction(nfa.to_dict(), start, accept)
+    labels = {}
+    for state, nfa_states in enumerate(state_sets):
+        matched = [accept[s] for s in nfa_states if s in accept]
+        if matched:
+            labels[state] = min(matched)
+    dfa, labels, _ = minimize(dfa, 0, labels)
+
+    compiled = from_table(dfa, 0, labels)
+    # from_table keeps the dense ids of minimize() and appends its dead state
+    assert compiled.n_states == len(dfa) + 1 and compiled.dead == len(dfa)
+    token = array("h", [labels.get(state, -1) for state in range(compiled.n_states)])
+    return ScannerTables(compiled.class_map, compiled.trans, token, compiled.n_classes,
+                         compiled.start, compiled.dead, [name for name, _ in rules],
+                         rules_key(rules, (), 0))
+
+
+def write_tables(tables, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(tables.to_bytes())
+    os.replace(tmp, path)
+
+
+def _map_file(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_tables(rules, path):
+    """Map the tables for `rules` from `path`, rebuilding the file if stale."""
+    digest = rules_key(rules, (), 0)
+    try:
+        tables = ScannerTables.from_buffer(_map_file(path))
+        if tables.digest == digest:
+            return tables
+        del tables      # drop the stale mapping before replacing the file
+    except (OSError, ValueError, TypeError, struct.error):
+        pass            # missing, truncated or corrupt: rebuilt like a stale file
+    write_tables(build_tables(rules), path)
+    return ScannerTables.from_buffer(_map_file(path))
+
+
+class TableScanner:
+    """Longest-match DFA scanner over ScannerTables; same API as scanner_cache.Scanner."""
+
+    def __init__(self, tables, skip=DEFAULT_SKIP):
+        self.tables = tables
+        self.kind_names = tuple(tables.names)
+        self.kind_ids = {name: i for i, name in enumerate(self.kind_names)}
+        self.skip = frozenset(self.kind_ids[name] for name in skip if name in self.kind_ids)
+        self._class_map = bytes(tables.class_map)
+
+    def scan(self, code, pos=0, endpos=None):
+        """Yield (kind_id, start, end); characters no rule matches are passed over.
+
+        code is bytes or ASCII text; other characters are read as "?".
+        """
+        if isinstance(code, str):
+            code = code.encode("ascii", "replace")
+        classes = code[:endpos].translate(self._class_map)
+        tables = self.tables
+        trans = tables.trans
+        token = tables.token
+        k = tables.n_classes
+        start = tables.start * k
+        dead = tables.dead * k
+        skip = self.skip
+        n = len(classes)
+        while pos < n:
+            s = start
+            kind = -1
+            end = pos
+            i = pos
+            while i < n:
+                s = trans[s + classes[i]]
+                if s == dead:
+                    break
+                i += 1
+                t = token[s // k]
+                if t >= 0:
+                    kind = t
+                    end = i
+            if kind < 0:
+                pos += 1
+                continue
+            if kind not in skip:
+                yield kind, pos, end
+            pos = end
+
+    __call__ = scan
+
+    def tokens(self, code):
+        """Yield (value, kind_name) pairs, for printing."""
+        names = self.kind_names
+        for kind, start, end in self.scan(code):
+            yield code[start:end], names[kind]
+
+    def __repr__(self):
+        return f"<TableScanner {len(self.kind_names)} rules, {self.tables.n_states} states>"
+
+
+def load_scanner(rules, path, skip=DEFAULT_SKIP):
+    return TableScanner(load_tables(rules, path), skip)
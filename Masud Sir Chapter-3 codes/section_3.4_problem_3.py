@@ -1,7 +1,7 @@
 # Problem: Write a lexical analyzer that splits an arithmetic expression 
 # into tokens (numbers, identifiers, operators, parentheses).
 
-import re
+from scanner_cache import get_scanner
 
 token_spec = [
     ("NUMBER",   r"\d+"),
@@ -14,13 +14,9 @@ token_spec = [
 ]
 
 def tokenize(code):
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_spec)
-    for match in re.finditer(regex, code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
+    # compiled once per rule set and reused (see scanner_cache)
+    for value, kind in get_scanner(token_spec).tokens(code):
+        if kind == "MISMATCH":
             print(f"{value} --> Invalid")
         else:
             print(f"{value} --> {kind}")
@@ -1,7 +1,7 @@
 # Problem: Simulate Lex by defining token rules and generating a scanner.
 # The scanner should recognize identifiers, numbers, operators, and whitespace.
 
-import re
+from scanner_cache import get_scanner
 
 rules = [
     ("NUMBER",   r"\d+"),
@@ -12,13 +12,9 @@ rules = [
 ]
 
 def lex_scanner(code):
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
-    for match in re.finditer(regex, code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == "WHITESPACE":
-            continue
-        elif kind == "MISMATCH":
+    # compiled once per rule set and reused (see scanner_cache)
+    for value, kind in get_scanner(rules).tokens(code):
+        if kind == "MISMATCH":
             print(f"Error: Unexpected token {value}")
         else:
             print(f"{value} --> {kind}")
@@ -1,6 +1,6 @@
 # Problem: Simulate Lex's "longest match" behavior
 # Example: "==" should be recognized as one operator, not two "=".
-import re
+from scanner_cache import get_scanner
 rules = [
     ("EQ",       r"=="),
     ("ASSIGN",   r"="),
@@ -12,13 +12,9 @@ rules = [
 ]
 
 def lex_longest_match(code):
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
-    for match in re.finditer(regex, code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == "WHITESPACE":
-            continue
-        elif kind == "MISMATCH":
+    # compiled once per rule set and reused (see scanner_cache)
+    for value, kind in get_scanner(rules).tokens(code):
+        if kind == "MISMATCH":
             print(f"Error: Unexpected token {value}")
         else:
             print(f"{value} --> {kind}")
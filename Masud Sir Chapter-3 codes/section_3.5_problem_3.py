@@ -1,7 +1,7 @@
 # Problem: Simulate Lex lookahead to differentiate "if" as a keyword 
 # only when followed by space or symbol, not inside identifiers like "ifelse".
 
-import re
+from scanner_cache import get_scanner
 
 rules = [
     ("IF",       r"if(?=\s|[^a-zA-Z0-9_])"),  # lookahead ensures "if" is whole word
@@ -13,13 +13,9 @@ rules = [
 ]
 
 def lex_with_lookahead(code):
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
-    for match in re.finditer(regex, code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == "WHITESPACE":
-            continue
-        elif kind == "MISMATCH":
+    # compiled once per rule set and reused (see scanner_cache)
+    for value, kind in get_scanner(rules).tokens(code):
+        if kind == "MISMATCH":
             print(f"Error: Unexpected token {value}")
         else:
             print(f"{value} --> {kind}")
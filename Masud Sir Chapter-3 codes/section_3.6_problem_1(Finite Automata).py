@@ -16,7 +16,21 @@ def dfa_accepts(string):
 
     return state == "q2"
 
+# The same DFA as a table, compiled to integer states and flat arrays.
+# OTHER covers every character that is not listed for a state.
+from compiled_dfa import OTHER, from_table
+
+compiled = from_table({
+    "q0":   {"0": "q1", OTHER: "q0"},
+    "q1":   {"1": "q2", OTHER: "q1"},
+    "q2":   {"0": "q2", "1": "q2", OTHER: "dead"},
+    "dead": {OTHER: "dead"},
+}, "q0", {"q2"})
+
+def dfa_accepts_compiled(string):
+    return compiled.run(string.encode())
+
 # Example usage:
 tests = ["01", "001", "1001", "111", "110"]
 for t in tests:
-    print(f"{t}: {dfa_accepts(t)}")
+    print(f"{t}: {dfa_accepts(t)} (compiled: {dfa_accepts_compiled(t)})")
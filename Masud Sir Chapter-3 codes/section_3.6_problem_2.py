@@ -1,6 +1,9 @@
 # Problem: Build DFA using transition table and simulate it.
 # DFA accepts binary strings with even number of 0's.
 
+from compiled_dfa import from_table
+from parallel_dfa import compose, transition_map
+
 dfa_table = {
     "q0": {"0": "q1", "1": "q0"},  # start (q0) is even
     "q1": {"0": "q0", "1": "q1"}   # q1 means odd number of 0's
@@ -17,7 +20,26 @@ def simulate_dfa(string):
             return False
     return state in accept_states
 
+# Compiled form: integer states, byte-class map and a flat transition array
+compiled = from_table(dfa_table, start_state, accept_states)
+
+def simulate_compiled(string):
+    return compiled.run(string.encode())
+
 # Example usage:
 tests = ["", "0", "00", "1010", "1100"]
 for t in tests:
-    print(f"{t}: {simulate_dfa(t)}")
+    print(f"{t}: {simulate_dfa(t)} (compiled: {simulate_compiled(t)})")
+
+# Batch mode: every string advances together, one column per step (NumPy)
+try:
+    from batch_dfa import batch_accepts
+    print("batch:", batch_accepts(compiled, tests).tolist())
+except ImportError:
+    print("batch mode needs NumPy")
+
+# Parallel mode (parallel_dfa.parallel_run) splits the input into chunks and
+# composes per-chunk state -> state maps; the same composition, in-process:
+chunks = [b"110", b"010", b"0"]
+state = compose(compiled.final_state(chunks[0]), [transition_map(compiled, c) for c in chunks[1:]])
+print(f"chunked 1100100: {compiled.is_accepting(state)} (whole: {simulate_dfa('1100100')})")
@@ -1,30 +1,44 @@
 # Problem: Simulate NFA using epsilon-closure and state transitions.
 # NFA accepts strings over {a,b} ending with "ab".
 
-from collections import defaultdict
+from bitparallel_nfa import BitParallelNFA
+from regex_nfa import EPSILON, compile_nfa
 
 # NFA transition table with epsilon (ε) transitions
-# Format: {state: {symbol: [next_states]}}
-nfa = {
-    0: {"a": [0, 1], "b": [0]},  # loop on 'a' or 'b', move to q1 on 'a'
-    1: {"b": [2]},               # q1 goes to q2 on 'b'
-    2: {}                        # accepting state
-}
+# Format: {state: {symbol: [next_states]}}, epsilon moves under EPSILON
+# Built from the regex by Thompson's construction (regex_nfa.py)
+compiled = compile_nfa("(a|b)*ab")
+nfa = compiled.to_dict()
 
-start_state = 0
-accept_states = {2}
+start_state = compiled.start
+accept_states = {compiled.accept}
+
+def epsilon_closure(nfa, states):
+    stack = list(states)
+    closure = set(stack)
+    while stack:
+        state = stack.pop()
+        for target in nfa[state].get(EPSILON, []):
+            if target not in closure:
+                closure.add(target)
+                stack.append(target)
+    return closure
 
 def nfa_simulate(nfa, string, start, accept):
-    current_states = {start}
+    current_states = epsilon_closure(nfa, {start})
     for ch in string:
         next_states = set()
         for state in current_states:
             if ch in nfa[state]:
                 next_states.update(nfa[state][ch])
-        current_states = next_states
+        current_states = epsilon_closure(nfa, next_states)
     return len(current_states & accept) > 0
 
 # Example usage:
 tests = ["ab", "aab", "babab", "aaa", "bb"]
 for t in tests:
     print(f"{t}: {nfa_simulate(nfa, t, start_state, accept_states)}")
+
+# Bit-parallel simulation: the active state set is one integer
+fast = BitParallelNFA(nfa, start_state, accept_states)
+print(f"bit-parallel ({fast.mode}, {fast.width} bits):", [fast.accepts(t) for t in tests])
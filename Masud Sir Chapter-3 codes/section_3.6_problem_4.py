@@ -1,9 +1,13 @@
 # Problem: Construct NFA for regex a* (any number of 'a's).
 # Accepts "", "a", "aa", "aaa", ...
 
+from regex_nfa import compile_nfa
+
+# Thompson construction builds the NFA for a* from the regex itself
+a_star = compile_nfa("a*")
+
 def nfa_a_star(string):
-    # Simple simulation: accepts if all chars are 'a'
-    return all(ch == "a" for ch in string)
+    return a_star.accepts(string)
 
 tests = ["", "a", "aa", "b", "ab"]
 for t in tests:
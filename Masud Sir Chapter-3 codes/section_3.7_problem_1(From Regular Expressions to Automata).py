@@ -1,8 +1,17 @@
 # Problem: Construct NFA for regex a* (zero or more 'a's).
 # Accepts "", "a", "aa", "aaa", ...
 
+from regex_nfa import compile_nfa
+
+# Thompson construction: regex -> NFA with epsilon moves
+nfa = compile_nfa("a*")
+
+print(f"NFA for a* (start {nfa.start}, accept {nfa.accept}):")
+for state, moves in nfa.to_dict().items():
+    print(f"  {state}: {moves}")
+
 def nfa_regex_a_star(string):
-    return all(ch == "a" for ch in string)  # only 'a's allowed
+    return nfa.accepts(string)
 
 tests = ["", "a", "aa", "aaa", "b", "ab"]
 for t in tests:
@@ -1,28 +1,43 @@
 # Problem: Simulate NFA with epsilon transitions.
 # Regex: (a|b)*ab (all strings ending with "ab")
 
-from collections import defaultdict
+from bitparallel_nfa import BitParallelNFA
+from regex_nfa import EPSILON, compile_nfa
 
-nfa = {
-    0: {"a": [0, 1], "b": [0]},  # loop on a|b, go to q1 on 'a'
-    1: {"b": [2]},               # q1 -> q2 on 'b'
-    2: {}                        # accept state
-}
+# Built from the regex by Thompson's construction (regex_nfa.py)
+# Format: {state: {symbol: [next_states]}}, epsilon moves under EPSILON
+compiled = compile_nfa("(a|b)*ab")
+nfa = compiled.to_dict()
 
-start_state = 0
-accept_states = {2}
+start_state = compiled.start
+accept_states = {compiled.accept}
+
+def epsilon_closure(nfa, states):
+    stack = list(states)
+    closure = set(stack)
+    while stack:
+        state = stack.pop()
+        for target in nfa[state].get(EPSILON, []):
+            if target not in closure:
+                closure.add(target)
+                stack.append(target)
+    return closure
 
 def simulate_nfa(nfa, string, start, accept):
-    states = {start}
+    states = epsilon_closure(nfa, {start})
     for ch in string:
         next_states = set()
         for s in states:
             if ch in nfa[s]:
                 next_states.update(nfa[s][ch])
-        states = next_states
+        states = epsilon_closure(nfa, next_states)
     return bool(states & accept)
 
 # Example usage
 tests = ["ab", "aab", "babab", "aaa", "bb"]
 for t in tests:
     print(f"{t}: {simulate_nfa(nfa, t, start_state, accept_states)}")
+
+# Bit-parallel simulation: the active state set is one integer
+fast = BitParallelNFA(nfa, start_state, accept_states)
+print(f"bit-parallel ({fast.mode}, {fast.width} bits):", [fast.accepts(t) for t in tests])
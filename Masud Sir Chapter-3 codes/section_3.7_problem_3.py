@@ -1,44 +1,39 @@
 # Problem: Convert NFA to DFA using subset construction.
 
-nfa = {
-    0: {"a": [0, 1], "b": [0]},  # same NFA as before
-    1: {"b": [2]},
-    2: {}
-}
-
-accept_states = {2}
-
-def nfa_to_dfa(nfa, start, accept):
-    dfa = {}
-    unmarked = [frozenset([start])]
-    marked = set()
-    dfa_accept = set()
-
-    while unmarked:
-        current = unmarked.pop()
-        if current in marked:
-            continue
-        marked.add(current)
-
-        dfa[current] = {}
-        for symbol in {"a", "b"}:  # alphabet
-            next_states = set()
-            for state in current:
-                if symbol in nfa[state]:
-                    next_states.update(nfa[state][symbol])
-            next_set = frozenset(next_states)
-            if next_set:
-                dfa[current][symbol] = next_set
-                if next_set not in marked:
-                    unmarked.append(next_set)
-            if next_states & accept:
-                dfa_accept.add(next_set)
-
-    return dfa, dfa_accept
-
-dfa, dfa_accept = nfa_to_dfa(nfa, 0, accept_states)
+from regex_nfa import compile_nfa
+from dfa_minimize import format_report, minimize
+from lazy_dfa import from_regex as lazy_dfa
+from subset_construction import subset_construction
+
+compiled = compile_nfa("(a|b)*ab")  # same NFA as before
+nfa = compiled.to_dict()
+
+accept_states = {compiled.accept}
+
+# The alphabet is inferred from the NFA and epsilon-closures are included.
+# DFA states are dense ids (0 = start); state_sets[id] are the NFA states.
+nfa_to_dfa = subset_construction
+
+dfa, dfa_accept, state_sets = nfa_to_dfa(nfa, compiled.start, accept_states)
 
 print("DFA Transition Table:")
 for state, trans in dfa.items():
-    print(f"{state} -> {trans}")
+    print(f"{state} {set(state_sets[state])} -> {trans}")
 print("Accepting States:", dfa_accept)
+
+# Hopcroft minimization merges equivalent DFA states
+min_dfa, min_accept, report = minimize(dfa, 0, dfa_accept)
+
+print("\nMinimal DFA:", format_report(report))
+for state, trans in min_dfa.items():
+    print(f"{state} -> {trans}")
+print("Accepting States:", min_accept)
+
+
+# For (a|b)*a(a|b){20} the full DFA would have about 2^21 states, so build
+# states lazily instead, only as the input reaches them, in a bounded cache
+lazy = lazy_dfa("(a|b)*a(a|b){20}", max_states=1000)
+print()
+for string in ["a" + "b" * 20, "b" * 30, "ab" * 40 + "a" + "b" * 20]:
+    print(f"{string[:24] + '...' if len(string) > 24 else string}: {lazy.accepts(string)}")
+print("Lazy DFA cache:", lazy.stats())
@@ -1,5 +1,8 @@
 # Problem: Use the DFA obtained to test strings
 
+from compiled_dfa import from_table
+from dfa_minimize import format_report, minimize
+
 # Define the DFA transition table
 dfa = {
     frozenset([0]): {'a': frozenset([1]), 'b': frozenset([2])},
@@ -23,3 +26,13 @@ def simulate_dfa(dfa, start, accept, string):
 tests = ["ab", "aab", "babab", "aaa", "bb"]
 for t in tests:
     print(f"{t}: {simulate_dfa(dfa, 0, dfa_accept, t)}")
+
+# Compiled form of the frozenset-keyed table
+compiled = from_table(dfa, frozenset([0]), dfa_accept)
+print(compiled, [compiled.run(t.encode()) for t in tests])
+
+# The same table after Hopcroft minimization (integer states, start 0)
+min_dfa, min_accept, report = minimize(dfa, frozenset([0]), dfa_accept)
+print("Minimized:", format_report(report))
+for state, trans in min_dfa.items():
+    print(f"{state} -> {trans}")
@@ -1,7 +1,7 @@
 # Problem: Define token rules for identifiers, numbers, operators, and keywords.
 # The program should generate a scanner using regex patterns.
 
-import re
+from scanner_cache import get_scanner
 
 rules = [
     ("NUMBER",   r"\d+"),
@@ -18,13 +18,9 @@ rules = [
 ]
 
 def lex_generator(code):
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
-    for match in re.finditer(regex, code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
+    # compiled once per rule set and reused (see scanner_cache)
+    for value, kind in get_scanner(rules).tokens(code):
+        if kind == "MISMATCH":
             print(f"Error: Unexpected token {value}")
         else:
             print(f"{value} --> {kind}")
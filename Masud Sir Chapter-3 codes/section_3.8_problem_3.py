@@ -1,24 +1,21 @@
 # Problem: Implement a DFA-based scanner for simple arithmetic expressions.
 # DFA states are simulated by regex matching in this simplified version.
-import re
+from scanner_cache import get_scanner
+
+token_spec = [
+    ("NUMBER",   r"\d+"),
+    ("IDENT",    r"[a-zA-Z_]\w*"),
+    ("OP",       r"[+\-*/=]"),
+    ("LPAREN",   r"\("),
+    ("RPAREN",   r"\)"),
+    ("SKIP",     r"[ \t\n]+"),
+    ("MISMATCH", r".")
+]
+
 def dfa_scanner(code):
-    token_spec = [
-        ("NUMBER",   r"\d+"),
-        ("IDENT",    r"[a-zA-Z_]\w*"),
-        ("OP",       r"[+\-*/=]"),
-        ("LPAREN",   r"\("),
-        ("RPAREN",   r"\)"),
-        ("SKIP",     r"[ \t\n]+"),
-        ("MISMATCH", r".")
-    ]
-    
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_spec)
-    for match in re.finditer(regex, code):
-        kind = match.lastgroup
-        value = match.group()
-        if kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
+    # compiled once per rule set and reused (see scanner_cache)
+    for value, kind in get_scanner(token_spec).tokens(code):
+        if kind == "MISMATCH":
             print(f"Error: Unexpected token {value}")
         else:
             print(f"{value} --> {kind}")
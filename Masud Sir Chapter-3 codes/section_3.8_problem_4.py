@@ -1,20 +1,23 @@
 # Problem: Write a mini "Lex" generator in Python.
 # Given a list of (token_name, regex) rules, produce a function that scans input.
-import re
-def generate_scanner(rules):
-    regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
-    
-    def scanner(code):
-        for match in re.finditer(regex, code):
-            kind = match.lastgroup
-            value = match.group()
-            if kind == "SKIP":
-                continue
-            elif kind == "MISMATCH":
-                print(f"Error: Unexpected token {value}")
-            else:
-                print(f"{value} --> {kind}")
-    return scanner
+from scanner_cache import cache_info
+from scanner_codegen import backend_scanner, fastest_scanner
+
+def generate_scanner(rules, backend="re", sample=None):
+    # backend="re": the master pattern, compiled once per rule set and shared
+    #   through a process-wide LRU, so calling this per request is cheap.
+    # backend="table": the minimized DFA as tables in a cache file, mapped on
+    #   later runs (rebuilt if the rules change).
+    # backend="codegen": the DFA as a generated Python module in the cache
+    #   directory, imported on later runs.
+    # backend="auto": whichever of the three scans `sample` fastest; a DFA
+    #   backend is only picked if it gives re's tokens on `sample`.
+    # The result yields (kind_id, start, end); kind_names[kind_id] is the rule name.
+    if backend == "auto":
+        if sample is None:
+            raise ValueError('backend="auto" needs a sample to time the backends on')
+        return fastest_scanner(rules, sample)[1]
+    return backend_scanner(rules, backend)
 
 # Define rules
 rules = [
@@ -29,6 +32,24 @@ rules = [
 
 # Generate scanner
 my_scanner = generate_scanner(rules)
+MISMATCH = my_scanner.kind_ids["MISMATCH"]
 
 # Example usage:
-my_scanner("x = 10 + y - 5")
+code = "x = 10 + y - 5"
+for kind, start, end in my_scanner(code):
+    value = code[start:end]
+    if kind == MISMATCH:
+        print(f"Error: Unexpected token {value}")
+    else:
+        print(f"{value} --> {my_scanner.kind_names[kind]}")
+
+# The same rules again come from the cache instead of being recompiled
+assert generate_scanner(list(rules)) is my_scanner
+info = cache_info()
+print(f"\nscanner cache: {info['hits']} hits, {info['misses']} misses "
+      f"(hit rate {info['hit_rate']:.0%}), compile time {info['compile_time'] * 1000:.2f} ms")
+
+# The DFA backends give the same tokens (built on the first run, loaded afterwards)
+for backend in ("table", "codegen"):
+    print(backend, list(generate_scanner(rules, backend).tokens(code)) ==
+          list(my_scanner.tokens(code)))
@@ -0,0 +1,87 @@
+# Streaming lexer over memory-mapped files.
+# The file is mapped with mmap and the master pattern runs over the mapping
+# itself: re reads the pages in place, so nothing but the lexemes is copied,
+# and the pages behind the scan are released as it goes, so memory use does
+# not depend on the file size (apart from the line index, 8 bytes a line:
+# the shared SourceIndex, filled block by block in the first pass and then
+# walked forward with the tokens). There are no windows, so no token is ever cut
+# at a window edge or decided on less of the text than the str lexer sees.
+#
+# The pattern is a bytes pattern, and \b, \w, \d and . mean the same for
+# bytes as for str only on ASCII text: a file with any other byte is refused
+# (ValueError) before the first token.
+
+import mmap
+import re
+from collections import namedtuple
+
+from source_index import SourceIndex
+
+# offset is the byte offset in the file; line and column start at 1
+Token = namedtuple("Token", "value kind offset line column")
+
+_NON_ASCII = re.compile(rb"[^\x00-\x7f]")
+
+
+def compile_spec(token_specification):
+    """Build a bytes master pattern from (name, str_regex) pairs."""
+    return re.compile(b"|".join(
+        b"(?P<%s>%s)" % (name.encode(), pattern.encode())
+        for name, pattern in token_specification))
+
+
+def _release(mm, start, end):
+    """Drop the pages of mm[start:end] from memory (start is page aligned;
+    the pages are read back in if needed again)."""
+    if hasattr(mm, "madvise") and end > start:
+        mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def lex_file(path, token_specification, skip=("WHITESPACE",), release_size=1 << 20):
+    """Yield a Token for every lexeme of the ASCII file at `path`.
+
+    The tokens are those the str master pattern finds in the decoded text.
+    Raises ValueError if the file holds a non-ASCII byte. Pages are released
+    every `release_size` bytes of progress (rounded up to whole pages).
+    """
+    release_size = -(-release_size // mmap.PAGESIZE) * mmap.PAGESIZE
+    regex = compile_spec(token_specification)
+    skip = frozenset(skip)
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mm:
+            size = len(mm)
+            index = SourceIndex(mm, 0)
+            for block in range(0, size, release_size):
+                found = _NON_ASCII.search(mm, block, block + release_size)
+                if found:
+                    raise ValueError(f"{path}: non-ASCII byte at offset {found.start()}; "
+                                     "lex_file() reads ASCII text only")
+                index.extend(min(block + release_size, size))
+                _release(mm, block, min(block + release_size, size))
+
+            line_starts = index.line_starts
+            lines = len(line_starts)
+            line = 1
+            released = 0
+            matches = regex.finditer(mm)
+            try:
+                for match in matches:
+                    start = match.start()
+                    kind = match.lastgroup
+                    if kind not in skip:
+                        # tokens come in order, so the line only moves forward
+                        while line < lines and line_starts[line] <= start:
+                            line += 1
+                        yield Token(match.group(), kind, start, line,
+                                    start - line_starts[line - 1] + 1)
+                    if start - released >= release_size:
+                        done = start // mmap.PAGESIZE * mmap.PAGESIZE
+                        _release(mm, released, done)
+                        released = done
+            finally:
+                # the iterator and the last match hold the mapping's buffer
+                match = matches = None
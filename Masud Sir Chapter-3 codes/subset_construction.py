@@ -0,0 +1,104 @@
+# Subset construction (NFA -> DFA) with epsilon-closures.
+# NFA state sets are Python ints used as bitsets (bit i = NFA state i), so
+# hashing and union are single integer operations. The epsilon-closure of
+# every NFA state and the closure of every (state, symbol) move are computed
+# once up front; a DFA step is then an OR over the bits of the current set.
+# DFA states get dense integer ids in discovery order, 0 being the start.
+
+from regex_nfa import EPSILON
+
+
+def infer_alphabet(nfa):
+    symbols = set()
+    for moves in nfa.values():
+        symbols.update(moves)
+    symbols.discard(EPSILON)
+    return sorted(symbols)
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def subset_construction(nfa, start, accept, alphabet=None):
+    """Convert a {state: {symbol: [states]}} NFA into a DFA.
+
+    Returns (dfa, dfa_accept, state_sets): dfa is {id: {symbol: id}} with
+    start state 0, dfa_accept a set of ids, and state_sets[id] the frozenset
+    of NFA states behind each DFA state. Moves to the empty set are left out.
+    """
+    if alphabet is None:
+        alphabet = infer_alphabet(nfa)
+    # states with no entry in the nfa dict (typically the accepting state)
+    # have no moves, but still get a bit
+    index = {}
+    for state in [start, *nfa, *accept]:
+        index.setdefault(state, len(index))
+    for moves in nfa.values():
+        for targets in moves.values():
+            for target in targets:
+                index.setdefault(target, len(index))
+    states = list(index)
+
+    # epsilon-closure of each single NFA state, memoized as a bitset
+    closure = [0] * len(states)
+
+    def close(i):
+        if closure[i]:
+            return closure[i]
+        mask = 1 << i
+        stack = [i]
+        while stack:
+            for target in nfa.get(states[stack.pop()], {}).get(EPSILON, ()):
+                bit = 1 << index[target]
+                if not mask & bit:
+                    mask |= bit
+                    stack.append(index[target])
+        closure[i] = mask
+        return mask
+
+    for i in range(len(states)):
+        close(i)
+
+    # move_closure[symbol][i]: closure of the states reached from i on symbol
+    move_closure = {}
+    for symbol in alphabet:
+        row = [0] * len(states)
+        for i, state in enumerate(states):
+            for target in nfa.get(state, {}).get(symbol, ()):
+                row[i] |= closure[index[target]]
+        move_closure[symbol] = row
+
+    accept_mask = 0
+    for state in accept:
+        accept_mask |= 1 << index[state]
+
+    start_set = closure[index[start]]
+    ids = {start_set: 0}
+    sets = [start_set]
+    dfa = {}
+    dfa_accept = set()
+    for current, current_set in enumerate(sets):  # `sets` grows as we go
+        moves = {}
+        members = list(_bits(current_set))
+        for symbol in alphabet:
+            row = move_closure[symbol]
+            target = 0
+            for i in members:
+                target |= row[i]
+            if not target:
+                continue
+            target_id = ids.get(target)
+            if target_id is None:
+                target_id = ids[target] = len(sets)
+                sets.append(target)
+            moves[symbol] = target_id
+        dfa[current] = moves
+        if current_set & accept_mask:
+            dfa_accept.add(current)
+
+    state_sets = [frozenset(states[i] for i in _bits(mask)) for mask in sets]
+    return dfa, dfa_accept, state_sets
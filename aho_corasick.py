@@ -0,0 +1,219 @@
+# Aho-Corasick automaton for the fixed-string token classes.
+# The strings are put in a trie, failure links are added breadth first, and
+# the goto/failure pair is then compiled into one complete transition table,
+# so a step is a single index and never follows a failure chain:
+#   column  -- {char: column}; characters in no string share column 0
+#   trans   -- flat list of n_states * width entries holding the target's row
+#              offset (state * width), as in compiled_dfa.py: s = trans[s + col]
+#   depth   -- length of the string spelled by each state's trie path
+#   ends    -- index of the string spelled by each state, -1 if none
+#   outputs -- per state, the strings that end there: its own and those of
+#              its dictionary-suffix chain, longest first, flattened into one
+#              list (out_at[state] .. out_at[state + 1] are its entries)
+# iter_matches() reads ASCII text as column numbers made by bytes.translate()
+# in C, as compiled_dfa.py does, and finds each state's outputs by row offset.
+#
+# longest_match(text, pos) is the lexer's question -- which string starts at
+# pos -- and only walks trie edges (an edge is a trie edge when it adds one
+# to the depth). With word_chars given, a string ending in a word character
+# only matches when no word character follows it, so "int" is not found at
+# the start of "integer". iter_matches(text) reports every occurrence,
+# overlapping ones included, in one pass over the text.
+#
+# This is reference code: no lexer in the repo uses it. bench_aho_corasick.py
+# puts longest_match at about 0.4x the alternation regex (a Python loop per
+# token start against re's C matcher) and the keyword scan at about 1.0x, so
+# master_lexer keeps its regexes.
+
+import string
+from collections import deque
+
+# characters that continue a C identifier
+C_WORD_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+
+class AhoCorasick:
+    """Automaton over `strings`; `values` (default: the strings) are reported.
+
+    word_chars, if given, holds the characters that continue a word; see
+    longest_match().
+    """
+
+    def __init__(self, strings, values=None, word_chars=None):
+        strings = list(strings)
+        if not all(strings):
+            raise ValueError("the empty string cannot be matched")
+        values = strings if values is None else list(values)
+        if len(values) != len(strings):
+            raise ValueError("one value per string")
+        # duplicates: the first occurrence wins
+        self.strings = []
+        self.values = []
+        for string, value in zip(strings, values):
+            if string not in self.strings:
+                self.strings.append(string)
+                self.values.append(value)
+        self.word_chars = word_chars
+        self._build()
+
+    def _build(self):
+        column = {}
+        for string in self.strings:
+            for ch in string:
+                column.setdefault(ch, len(column) + 1)
+        width = len(column) + 1
+
+        # trie: goto[state] = {column: state}; ends[state] = string index or -1
+        goto = [{}]
+        ends = [-1]
+        depth = [0]
+        for index, string in enumerate(self.strings):
+            state = 0
+            for ch in string:
+                col = column[ch]
+                nxt = goto[state].get(col)
+                if nxt is None:
+                    nxt = goto[state][col] = len(goto)
+                    goto.append({})
+                    ends.append(-1)
+                    depth.append(depth[state] + 1)
+                state = nxt
+            ends[state] = index
+
+        # breadth first: a state's failure target is shallower, so its row
+        # and outputs are complete by the time they are copied
+        n = len(goto)
+        trans = [0] * (n * width)
+        outputs = [[] for _ in range(n)]
+        fail = [0] * n
+        queue = deque()
+        for col, child in goto[0].items():
+            trans[col] = child * width
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            row = state * width
+            back = fail[state] * width
+            trans[row:row + width] = trans[back:back + width]
+            for col, child in goto[state].items():
+                fail[child] = trans[back + col] // width
+                trans[row + col] = child * width
+                queue.append(child)
+            own = [ends[state]] if ends[state] != -1 else []
+            outputs[state] = own + outputs[fail[state]]
+
+        out_at = [0]
+        flat = []
+        for found in outputs:
+            flat.extend(found)
+            out_at.append(len(flat))
+        self.column = column
+        self.width = width
+        self.n_states = n
+        self.trans = trans
+        self.depth = depth
+        self.fail = fail
+        self.ends = ends
+        self.out_at = out_at
+        self.outputs = flat
+        self._lengths = [len(s) for s in self.strings]
+        # states whose own string must not be followed by a word character
+        word_chars = self.word_chars or ()
+        self._bounded = [ends[state] != -1 and self.strings[ends[state]][-1] in word_chars
+                         for state in range(n)]
+        # for iter_matches: the (value, length) pairs of each state, at its row offset
+        self._row_out = [None] * len(trans)
+        for state in range(n):
+            if out_at[state] != out_at[state + 1]:
+                found = flat[out_at[state]:out_at[state + 1]]
+                self._row_out[state * width] = tuple(
+                    (self.values[i], self._lengths[i]) for i in found)
+        # ASCII text is turned into column numbers by bytes.translate() in C
+        self.class_map = None
+        if width < 256 and all(ch.isascii() for ch in column):
+            self.class_map = bytes(column.get(chr(b), 0) for b in range(256))
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __contains__(self, string):
+        match = self.longest_match(string)
+        return match is not None and match[1] == len(string)
+
+    def longest_match(self, text, pos=0):
+        """(value, end) of the longest string starting at text[pos], or None.
+
+        A string ending in one of word_chars is skipped when a word character
+        follows it.
+        """
+        trans, get, width = self.trans, self.column.get, self.width
+        depth, ends, bounded = self.depth, self.ends, self._bounded
+        word_chars = self.word_chars
+        size = len(text)
+        s = 0
+        found = -1
+        end = pos
+        for i in range(pos, size):
+            col = get(text[i])
+            if col is None:
+                break
+            s = trans[s + col]
+            state = s // width
+            if depth[state] != i - pos + 1:
+                break                     # a failure edge: no string continues here
+            if ends[state] != -1:
+                if bounded[state] and i + 1 < size and text[i + 1] in word_chars:
+                    continue
+                found = ends[state]
+                end = i + 1
+        if found == -1:
+            return None
+        return self.values[found], end
+
+    def iter_matches(self, text, pos=0, endpos=None):
+        """Yield (value, start, end) for every occurrence, by end then longest first."""
+        trans, row_out = self.trans, self._row_out
+        if endpos is None:
+            endpos = len(text)
+        text = text[pos:endpos]
+        if self.class_map is not None and text.isascii():
+            columns = text.encode("ascii").translate(self.class_map)
+        else:
+            get = self.column.get
+            columns = [get(ch, 0) for ch in text]
+        s = 0
+        i = pos
+        for col in columns:
+            s = trans[s + col]
+            i += 1
+            found = row_out[s]
+            if found is not None:
+                for value, length in found:
+                    if i - length >= pos:
+                        yield value, i - length, i
+
+    def __repr__(self):
+        return f"<AhoCorasick {len(self)} strings, {self.n_states} states>"
+
+
+def c_fixed_tokens():
+    """The C keywords, operators and punctuation of master_lexer, by label.
+
+    Keywords only match as whole words: "integer" starts no keyword.
+    """
+    from master_lexer import C_KEYWORDS, C_LABELS, C_OPERATORS, C_PUNCTUATION
+    pairs = ([(word, "Keyword") for word in sorted(C_KEYWORDS)]
+             + [(op, C_LABELS["OPERATOR"]) for op in C_OPERATORS]
+             + [(p, C_LABELS["PUNCTUATION"]) for p in C_PUNCTUATION])
+    return AhoCorasick([s for s, _ in pairs], [label for _, label in pairs],
+                       word_chars=C_WORD_CHARS)
+
+
+if __name__ == "__main__":
+    fixed = c_fixed_tokens()
+    print(fixed)
+    text = "if (count >= 10) return count++;"
+    print(fixed.longest_match(text, 10), fixed.longest_match(text, 17),
+          fixed.longest_match("integer", 0))
+    for value, start, end in fixed.iter_matches(text):
+        print(f"{text[start:end]:<8}{value}")
@@ -0,0 +1,68 @@
+# Benchmark: AhoCorasick against the alternation regex on the C keyword,
+# operator and punctuation strings.
+#   longest match -- the lexer's question at every token start: which fixed
+#                    string begins here, keywords as whole words only (re:
+#                    longest-first alternation .match)
+#   keyword scan  -- every keyword occurrence in a corpus (re: finditer over
+#                    (?=(kw|...)) so that overlapping occurrences count too)
+# Usage: python bench_aho_corasick.py [size_in_MB]   (default 1)
+
+import re
+import sys
+import time
+
+from aho_corasick import AhoCorasick, c_fixed_tokens
+from c_corpus import make_corpus
+from master_lexer import C_KEYWORDS, C_OPERATORS, C_PUNCTUATION, _alternation, c_lexer
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    text = make_corpus(int(size_mb * 1024 * 1024))
+    print(f"Input: {len(text) / 2**20:.1f} MB of generated C")
+
+    fixed, build_time = timed(c_fixed_tokens)
+    print(f"{fixed} built in {build_time * 1e3:.2f} ms")
+
+    pattern = re.compile(f"(?:{_alternation(C_KEYWORDS)})(?![A-Za-z0-9_])|"
+                         f"{_alternation(C_OPERATORS + C_PUNCTUATION)}")
+    starts = [start for _, start, _ in c_lexer().scan(text)]
+
+    def by_regex():
+        match = pattern.match
+        ends = []
+        for pos in starts:
+            m = match(text, pos)
+            ends.append(m.end() if m else -1)
+        return ends
+
+    def by_automaton():
+        longest = fixed.longest_match
+        ends = []
+        for pos in starts:
+            found = longest(text, pos)
+            ends.append(found[1] if found else -1)
+        return ends
+
+    expected, re_time = timed(by_regex)
+    result, ac_time = timed(by_automaton)
+    assert result == expected
+    print(f"\nlongest match at {len(starts):,} token starts")
+    print(f"  alternation regex {re_time:7.3f} s   Aho-Corasick {ac_time:7.3f} s   "
+          f"({re_time / ac_time:.2f}x)")
+
+    keywords = AhoCorasick(sorted(C_KEYWORDS))
+    lookahead = re.compile(f"(?=({_alternation(C_KEYWORDS)}))")
+    expected, re_time = timed(lambda: [(m.group(1), m.start()) for m in lookahead.finditer(text)])
+    result, ac_time = timed(lambda: [(word, start)
+                                     for word, start, _ in keywords.iter_matches(text)])
+    assert result == expected
+    print(f"\nkeyword scan: {len(result):,} occurrences of {len(keywords)} keywords")
+    print(f"  alternation regex {re_time:7.3f} s   Aho-Corasick {ac_time:7.3f} s   "
+          f"({re_time / ac_time:.2f}x)")
@@ -0,0 +1,62 @@
+# Benchmark: comments through the regex alternation (the COMMENT rule of the
+# master pattern) vs the str.find() fast path of c_lexer(), with and without
+# trivia, on
+#   code      -- a generated C corpus (10% of lines commented)
+#   header    -- a generated header: every declaration under a long /** */
+#                block and a few // lines
+#   unclosed  -- "/* " repeated, no closer anywhere (the regex rescans the
+#                rest of the text for each opener; sizes are smaller)
+# Usage: python bench_comment_skip.py [size_in_MB]   (default 4)
+
+import random
+import re
+import sys
+import time
+
+from c_corpus import WORDS, make_corpus
+from master_lexer import C_DISPLAY, C_KEYWORDS, C_LABELS, C_RULES, MasterLexer, c_lexer
+
+
+def make_header(size, rnd):
+    parts = []
+    total = 0
+    while total < size:
+        lines = [" * " + " ".join(rnd.choice(WORDS) for _ in range(8)) for _ in range(12)]
+        name = "".join(rnd.choice("abcdefghij") for _ in range(8))
+        part = ("/**\n" + "\n".join(lines) + "\n */\n"
+                + f"// {rnd.choice(WORDS)} {rnd.choice(WORDS)}\n"
+                + f"int {name}(int count, float scale);\n\n")
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    size = int(size_mb * 1024 * 1024)
+    regex = MasterLexer(C_RULES, C_LABELS, C_KEYWORDS, skip=("WHITESPACE",),
+                        display=C_DISPLAY, flags=re.MULTILINE, memo=True)
+    lexers = [("regex comments", regex), ("find() comments", c_lexer()),
+              ("find(), no trivia", c_lexer(keep_trivia=False))]
+    inputs = [("code", make_corpus(size)), ("header", make_header(size, random.Random(0)))]
+    inputs += [(f"unclosed {n // 1024}K", "/* " * (n // 3)) for n in (16 << 10, 64 << 10)]
+
+    for label, text in inputs:
+        print(f"\n{label}: {len(text) / 2**20:.2f} MB")
+        expected = None
+        for name, lexer in lexers:
+            tokens, seconds = timed(lambda: lexer.lex(text))
+            if expected is None:
+                expected = tokens
+            elif lexer.keep_trivia:
+                assert tokens == expected
+            print(f"  {name:<18} {seconds:8.3f} s  {len(tokens):>10,} tokens  "
+                  f"{len(text) / seconds / 2**20:8.2f} MB/s")
+        opener, seconds = timed(lambda: c_lexer().unterminated_comment(text))
+        print(f"  unterminated_comment() -> {opener} in {seconds * 1e3:.2f} ms")
@@ -0,0 +1,57 @@
+# Benchmark: per-keystroke latency of relex() vs lexing the whole buffer again.
+# Keystrokes are typed at a cursor that moves a little between them, with the
+# odd backspace, like an editor session. The first edit is timed on its own:
+# it moves the token gap from the end of the buffer to the cursor.
+# Usage: python bench_incremental_lexer.py [keystrokes]   (default 500)
+
+import random
+import sys
+import time
+
+from bench_master_lexer import make_c_source
+from incremental_lexer import IncrementalLexer
+from master_lexer import c_lexer
+
+SIZES_KB = (100, 1000, 10000)
+
+
+def session(text, count, rnd):
+    """(edit_start, edit_end, new_text) edits around a wandering cursor."""
+    cursor = len(text) // 2
+    length = len(text)
+    for _ in range(count):
+        cursor = min(max(cursor + rnd.randint(-40, 40), 1), length - 1)
+        if rnd.random() < 0.2:
+            yield cursor - 1, cursor, ""
+            cursor -= 1
+            length -= 1
+        else:
+            yield cursor, cursor, rnd.choice("abcx1 ;=+(\n")
+            cursor += 1
+            length += 1
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    lexer = c_lexer()
+    for size_kb in SIZES_KB:
+        text = make_c_source(size_kb * 1024)
+        inc = IncrementalLexer(text, lexer)
+        edits = list(session(text, count + 1, random.Random(0)))
+
+        start = time.perf_counter()
+        inc.relex(*edits[0])
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for edit in edits[1:]:
+            inc.relex(*edit)
+        incremental = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        lexer.tokenize(inc.text)
+        full = time.perf_counter() - start
+
+        assert list(lexer.scan(inc.text)) == [inc.token(i) for i in range(len(inc))]
+        print(f"{size_kb:>6} KB  relex {incremental * 1000:7.3f} ms/keystroke  "
+              f"(first edit {first * 1000:6.1f} ms)  "
+              f"full re-lex {full * 1000:9.1f} ms  ({full / incremental:,.0f}x)")
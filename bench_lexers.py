@@ -0,0 +1,265 @@
+# Benchmark suite: every lexer in the repo on the same generated C corpora.
+# Each scanner is wrapped by an adapter that turns "lex this text" into a
+# token count, and every (scanner, size) run happens in a fresh process, so
+# peak RSS belongs to that run alone. Reported per run: tokens/second, MB/s
+# and peak RSS; per scanner: the scaling slope, the least-squares slope of
+# log(time) over log(size) on the inputs of 64 KB and up (1.0 is linear).
+#
+# Usage: python bench_lexers.py [--sizes 1K,10K,100K,1M,10M] [--only NAME,...]
+#            [--comment-density 0.1] [--ident-length 6] [--error-rate 0.01]
+#            [--budget 30] [--json results.json] [--baseline old.json]
+# With --baseline, runs more than --tolerance slower (tokens/s) than the same
+# run in the old JSON are listed and the exit status is 1.
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+from c_corpus import write_corpus
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CHAPTER3 = os.path.join(ROOT, "Masud Sir Chapter-3 codes")
+MIN_TIMED = 0.2          # small inputs are lexed repeatedly for at least this long
+SLOPE_FROM = 64 * 1024
+
+
+def _load(path):
+    """Import a script by path, with its demo output and command line hidden."""
+    path = os.path.join(ROOT, path)
+    name = "bench_" + "".join(c if c.isalnum() else "_" for c in os.path.basename(path)[:-3])
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    argv = sys.argv
+    sys.argv = [path]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.loader.exec_module(module)
+    finally:
+        sys.argv = argv
+    return module
+
+
+def _generated(backend):
+    from master_lexer import DFA_C_RULES
+    generate_scanner = _load("Masud Sir Chapter-3 codes/section_3.8_problem_4.py").generate_scanner
+    return generate_scanner(DFA_C_RULES, backend).tokens
+
+
+def _c_lexer_tokenize(**options):
+    from master_lexer import c_lexer
+    return c_lexer(**options).tokenize
+
+
+def _get_scanner_tokens(path, attribute):
+    from scanner_cache import get_scanner
+    return get_scanner(getattr(_load(path), attribute)).tokens
+
+
+# name -> factory returning fn(text); fn's result is a sized or iterable token stream
+SCANNERS = {
+    "lexicalAnalyzer.lexer":
+        lambda: _load("lexicalAnalyzer.py").lexer,
+    "lab_01 lexer":
+        lambda: _load("Final_exam/lab_01.py").C_LEXER.lex,
+    "c_lexer tokenize":
+        lambda: _c_lexer_tokenize(),
+    "c_lexer without trivia":
+        lambda: _c_lexer_tokenize(keep_trivia=False),
+    "exercise_3.1.1 lexer":
+        lambda: _load("Masud Sir Chapter-3 codes/exercise_3.1.1(The Role of the Lexical Analyzer).py").lexer,
+    "exercise_3.1.2 html_lexer":
+        lambda: _load("Masud Sir Chapter-3 codes/exercise_3.1.2.py").html_lexer,
+    "exercise_3.1.3 detect_lexical_errors":
+        lambda: _load("Masud Sir Chapter-3 codes/exercise_3.1.3.py").detect_lexical_errors,
+    "exercise_3.1.4 panic_mode_lexer":
+        lambda: _load("Masud Sir Chapter-3 codes/exercise_3.1.4.py").panic_mode_lexer,
+    # these two print their tokens; the adapter runs the scanner they print from
+    "section_3.5 lex_scanner":
+        lambda: _get_scanner_tokens("Masud Sir Chapter-3 codes/section_3.5_problem_1"
+                                    "(Lexical Analyzer Generator (Lex)).py", "rules"),
+    "section_3.8 dfa_scanner":
+        lambda: _get_scanner_tokens("Masud Sir Chapter-3 codes/section_3.8_problem_3.py",
+                                    "token_spec"),
+    "generate_scanner re":
+        lambda: _generated("re"),
+    "generate_scanner table":
+        lambda: _generated("table"),
+    "generate_scanner codegen":
+        lambda: _generated("codegen"),
+}
+
+
+def _count(result):
+    if isinstance(result, tuple):          # detect_lexical_errors: (tokens, errors)
+        return sum(map(_count, result))
+    try:
+        return len(result)
+    except TypeError:
+        return sum(1 for _ in result)
+
+
+def _run(name, path):
+    """Worker: lex the corpus at `path` with scanner `name` (in its own process)."""
+    sys.path[:0] = [ROOT, CHAPTER3]
+    lex = SCANNERS[name]()
+    with open(path, encoding="utf-8", newline="") as f:
+        text = f.read()
+    _count(lex(text[:4096]))                    # warm up caches and generated code
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        tokens = _count(lex(text))
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIMED:
+            break
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == "darwin" else 1024      # ru_maxrss is in KB on Linux
+    return {"tokens": tokens, "seconds": elapsed / runs, "runs": runs,
+            "peak_rss_mb": peak * scale / 2**20,
+            "rss_growth_mb": (peak - before) * scale / 2**20}
+
+
+def scaling_slope(points):
+    """Least-squares slope of log(seconds) over log(size); None with fewer than 2 points."""
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    if sxx == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in points) / sxx
+
+
+def parse_size(text):
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def human(size):
+    for unit, factor in (("M", 1 << 20), ("K", 1 << 10)):
+        if size >= factor:
+            return f"{size / factor:g}{unit}"
+    return str(size)
+
+
+def run_suite(names, sizes, corpus, budget):
+    results = []
+    skipped = set()
+    workdir = tempfile.mkdtemp(prefix="lexer_bench_")
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        path = os.path.join(workdir, f"corpus_{size}.c")
+        length = write_corpus(path, size, **corpus)
+        for name in names:
+            if name in skipped:
+                continue
+            with context.Pool(1) as pool:
+                run = pool.apply(_run, (name, path))
+            run.update(scanner=name, size=size, chars=length,
+                       tokens_per_s=run["tokens"] / run["seconds"],
+                       mb_per_s=length / run["seconds"] / 2**20)
+            results.append(run)
+            print(f"{name:<38} {human(size):>6}  {run['tokens_per_s']:>13,.0f} tokens/s  "
+                  f"{run['mb_per_s']:7.2f} MB/s  peak RSS {run['peak_rss_mb']:7.1f} MB",
+                  file=sys.stderr)
+            if run["seconds"] > budget:
+                skipped.add(name)             # larger inputs would take too long
+        os.remove(path)
+    os.rmdir(workdir)
+    slopes = {name: scaling_slope([(r["chars"], r["seconds"]) for r in results
+                                   if r["scanner"] == name and r["size"] >= SLOPE_FROM])
+              for name in names}
+    return results, slopes
+
+
+def print_table(results, slopes, sizes):
+    names = list(slopes)
+    by_run = {(r["scanner"], r["size"]): r for r in results}
+    print(f"{'tokens/s':<38}" + "".join(f"{human(s):>12}" for s in sizes) + "   slope  peak RSS")
+    for name in names:
+        cells = []
+        peak = 0
+        for size in sizes:
+            run = by_run.get((name, size))
+            cells.append(f"{run['tokens_per_s']:>12,.0f}" if run else f"{'-':>12}")
+            peak = max(peak, run["peak_rss_mb"]) if run else peak
+        slope = slopes[name]
+        print(f"{name:<38}" + "".join(cells) +
+              (f"  {slope:6.2f}" if slope is not None else f"  {'-':>6}") + f"  {peak:6.1f} MB")
+
+
+def regressions(results, baseline, tolerance):
+    old = {(r["scanner"], r["size"]): r for r in baseline["results"]}
+    found = []
+    for run in results:
+        before = old.get((run["scanner"], run["size"]))
+        if before and run["tokens_per_s"] < before["tokens_per_s"] * (1 - tolerance):
+            found.append((run["scanner"], run["size"], before["tokens_per_s"], run["tokens_per_s"]))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every lexer in the repo.")
+    parser.add_argument("--sizes", default="1K,10K,100K,1M,10M",
+                        help="corpus sizes, comma separated (K/M suffixes; up to 100M)")
+    parser.add_argument("--only", help="comma-separated scanner names (default: all)")
+    parser.add_argument("--comment-density", type=float, default=0.1)
+    parser.add_argument("--ident-length", type=float, default=6)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=30,
+                        help="skip larger sizes for a scanner once one run takes this long (s)")
+    parser.add_argument("--json", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--list", action="store_true", help="list the scanners and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(SCANNERS))
+        return 0
+    names = args.only.split(",") if args.only else list(SCANNERS)
+    unknown = [name for name in names if name not in SCANNERS]
+    if unknown:
+        parser.error(f"unknown scanner(s): {', '.join(unknown)}")
+    sizes = sorted(parse_size(s) for s in args.sizes.split(","))
+    corpus = {"comment_density": args.comment_density, "ident_length": args.ident_length,
+              "error_rate": args.error_rate, "seed": args.seed}
+
+    results, slopes = run_suite(names, sizes, corpus, args.budget)
+    print_table(results, slopes, sizes)
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "cpus": os.cpu_count(), "corpus": corpus, "results": results, "slopes": slopes}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for name, size, before, after in found:
+            print(f"REGRESSION {name} at {human(size)}: {before:,.0f} -> {after:,.0f} tokens/s "
+                  f"({after / before - 1:+.0%})")
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
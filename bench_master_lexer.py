@@ -0,0 +1,89 @@
+# Benchmark: findall + reclassify (the old lab_01 lexer) vs the single-pass
+# MasterLexer on a generated C input: lex(), the path lab_01 and
+# lexicalAnalyzer run, and tokenize(), the opt-in TokenBuffer.
+# Usage: python bench_master_lexer.py [size_in_MB]   (default 100)
+
+import random
+import re
+import sys
+import time
+
+from master_lexer import C_KEYWORDS, c_lexer
+
+OLD_PATTERN = r'(/\*[\s\S]*?\*/|//.*?$|[A-Za-z_]\w*|\d+\.?\d*|==|!=|<=|>=|\+\+|--|&&|\|\||[+\-*/=<>!&|^~%]|[;,(){}[\].?:]|\s+)'
+OLD_OPERATORS = {"=", "+", "-", "*", "/", "==", "!=", "<", ">", "<=", ">=", "&&", "||",
+                 "++", "--", "+=", "-=", "*=", "/=", "%", "!", "&", "|", "^", "~"}
+OLD_PUNCTUATION = {";", ",", "(", ")", "{", "}", "[", "]", ".", ":", "?"}
+
+
+def old_lexer(statement):
+    tokens = re.findall(OLD_PATTERN, statement, re.MULTILINE)
+    result = []
+    for tok in tokens:
+        if not tok.strip():
+            if '\n' in tok:
+                result.append(("\\n", "Newline"))
+            elif '\t' in tok:
+                result.append(("\\t", "Tab"))
+            elif tok == ' ':
+                result.append(("space", "White space"))
+        elif tok.startswith('//') or (tok.startswith('/*') and tok.endswith('*/')):
+            result.append((tok, "Comment"))
+        elif tok in C_KEYWORDS:
+            result.append((tok, "Keyword"))
+        elif tok in OLD_OPERATORS:
+            result.append((tok, "Operator"))
+        elif tok in OLD_PUNCTUATION:
+            result.append((tok, "Punctuation"))
+        elif re.fullmatch(r'\d+', tok):
+            result.append((tok, "Integer Constant"))
+        elif re.fullmatch(r'\d+\.\d+', tok):
+            result.append((tok, "Float Constant"))
+        elif re.fullmatch(r'[A-Za-z_]\w*', tok):
+            result.append((tok, "Identifier"))
+        else:
+            result.append((tok, "Invalid"))
+    return result
+
+
+def make_c_source(size, seed=0):
+    rnd = random.Random(seed)
+    lines = [
+        "int sum = a + b * 10;",
+        "float avg = total / 3.5;",
+        "if (x >= 10 && y != 0) { count++; }",
+        "while (i < n) { arr[i] = i * 2; i++; }",
+        "/* block comment */ return value;",
+        "\tprintf(result); // print it",
+        "for (j = 0; j <= limit; j++) total += j;",
+    ]
+    parts = []
+    total = 0
+    while total < size:
+        line = rnd.choice(lines) + "\n"
+        parts.append(line)
+        total += len(line)
+    return "".join(parts)
+
+
+def measure(name, fn, text):
+    start = time.perf_counter()
+    tokens = fn(text)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} {len(tokens):>12,} tokens  {elapsed:8.2f} s  "
+          f"{len(tokens) / elapsed:>14,.0f} tokens/s")
+    return tokens, elapsed
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    text = make_c_source(int(size_mb * 1024 * 1024))
+    print(f"Input: {len(text) / (1024 * 1024):.1f} MB of generated C")
+
+    old_tokens, old_time = measure("findall+classify", old_lexer, text)
+    lexer = c_lexer()
+    new_tokens, new_time = measure("lex()", lexer.lex, text)
+    assert old_tokens == new_tokens, "token streams differ"
+    buf, buf_time = measure("tokenize()", lexer.tokenize, text)
+    assert buf == new_tokens, "token streams differ"
+    print(f"Speed-up: lex() {old_time / new_time:.2f}x, tokenize() {old_time / buf_time:.2f}x")
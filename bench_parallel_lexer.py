@@ -0,0 +1,48 @@
+# Benchmark: sequential MasterLexer.tokenize() vs parallel_tokenize() on a
+# generated C input with multi-line block comments.
+# Usage: python bench_parallel_lexer.py [size_in_MB] [max_workers]
+#        (defaults: 100 MB, os.cpu_count())
+
+import os
+import random
+import sys
+import time
+
+from bench_master_lexer import make_c_source
+from master_lexer import c_lexer
+from parallel_lexer import parallel_tokenize
+
+
+def with_block_comments(source, seed=0):
+    """Wrap about one line in twenty into a multi-line /* ... */ comment."""
+    rnd = random.Random(seed)
+    lines = source.split("\n")
+    for i in range(0, len(lines) - 3, 20):
+        j = i + rnd.randrange(20)
+        if j + 3 < len(lines):
+            lines[j] = "/* " + lines[j]
+            lines[j + 2] += " */"
+    return "\n".join(lines)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    source = with_block_comments(make_c_source(int(size_mb * 1024 * 1024)))
+    print(f"Input: {len(source) / (1024 * 1024):.1f} MB, {os.cpu_count()} CPUs")
+
+    expected, sequential = timed(lambda: c_lexer().tokenize(source))
+    print(f"sequential   {sequential:7.2f} s  {len(expected)} tokens")
+    columns = (expected.kind, expected.start, expected.end, expected.line)
+    workers = 2
+    while workers <= max(max_workers, 2):
+        result, elapsed = timed(lambda: parallel_tokenize(source, workers))
+        assert (result.kind, result.start, result.end, result.line) == columns
+        print(f"{workers:>3} workers  {elapsed:7.2f} s  {sequential / elapsed:5.2f}x  (identical)")
+        workers *= 2
@@ -0,0 +1,41 @@
+# Benchmark: memory held by the token stream of a generated C input.
+#   list (match)  -- (lexeme, label) tuples built per match (MasterLexer without memo)
+#   list (memo)   -- lex() with memoized tuples: distinct tuples are shared
+#   TokenBuffer   -- tokenize(): four array columns, lexemes cut on request
+# Usage: python bench_token_buffer.py [size_in_MB]   (default 20)
+
+import re
+import sys
+import time
+import tracemalloc
+
+from bench_master_lexer import make_c_source
+from master_lexer import C_DISPLAY, C_KEYWORDS, C_LABELS, C_RULES, MasterLexer, c_lexer
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held, elapsed
+
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    source = make_c_source(int(size_mb * 1024 * 1024))
+    plain = MasterLexer(C_RULES, C_LABELS, C_KEYWORDS, skip=("WHITESPACE",),
+                        display=C_DISPLAY, flags=re.MULTILINE)
+    memo = c_lexer()
+
+    cases = [("list (match)", lambda: plain.lex(source)),
+             ("list (memo)", lambda: memo.lex(source)),
+             ("TokenBuffer", lambda: memo.tokenize(source))]
+    print(f"Input: {len(source) / (1024 * 1024):.1f} MB")
+    for name, fn in cases:
+        tokens, held, elapsed = measure(fn)
+        print(f"{name:<14} {len(tokens):>9} tokens  {held / (1024 * 1024):8.1f} MB held  "
+              f"{held / len(tokens):6.1f} B/token  (traced run {elapsed:.2f} s)")
+        del tokens
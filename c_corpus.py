@@ -0,0 +1,120 @@
+# Reproducible C-like corpora for the lexer benchmarks.
+# A corpus is drawn from a pool of generated statements, so a 100 MB corpus
+# costs little more than the join. The knobs shape the pool:
+#   comment_density -- fraction of lines that carry a comment; a third of
+#                      them are /* ... */ blocks spanning several lines
+#   ident_length    -- mean identifier length (lengths are geometric, >= 1)
+#   error_rate      -- fraction of lines with a character no C rule accepts
+# The same arguments always give the same text.
+
+import random
+
+KEYWORDS = ("int", "float", "char", "double", "if", "else", "while", "for", "return", "void")
+TYPES = ("int", "float", "char", "double")
+OPERATORS = ("+", "-", "*", "/", "%", "==", "!=", "<", ">", "<=", ">=", "&&", "||")
+ILLEGAL = "@$`"
+WORDS = ("note", "check", "update", "value", "loop", "fixme", "counter", "result")
+POOL_SIZE = 4096
+
+
+def _identifier(rnd, mean):
+    first = "abcdefghijklmnopqrstuvwxyz_ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    rest = first + "0123456789"
+    length = 1
+    while length < 64 and rnd.random() > 1 / max(mean, 1):
+        length += 1
+    name = rnd.choice(first) + "".join(rnd.choice(rest) for _ in range(length - 1))
+    return name + "_" if name in KEYWORDS else name
+
+
+def _operand(rnd, mean):
+    roll = rnd.random()
+    if roll < 0.6:
+        return _identifier(rnd, mean)
+    if roll < 0.85:
+        return str(rnd.randrange(1000))
+    return f"{rnd.randrange(100)}.{rnd.randrange(100)}"
+
+
+def _expression(rnd, mean):
+    parts = [_operand(rnd, mean)]
+    for _ in range(rnd.randrange(3)):
+        parts += [rnd.choice(OPERATORS), _operand(rnd, mean)]
+    return " ".join(parts)
+
+
+def _statement(rnd, mean):
+    a, b = _identifier(rnd, mean), _expression(rnd, mean)
+    kind = rnd.randrange(6)
+    if kind == 0:
+        return f"{rnd.choice(TYPES)} {a} = {b};"
+    if kind == 1:
+        return f"{a} = {b};"
+    if kind == 2:
+        return f"if ({b}) {{ {a}++; }} else {{ {a}--; }}"
+    if kind == 3:
+        return f"while ({a} < {b}) {{ {a} = {a} + 1; }}"
+    if kind == 4:
+        return f"for ({a} = 0; {a} <= {b}; {a}++) total += {a};"
+    return f"return {a}({b}, {_operand(rnd, mean)});"
+
+
+def _comment(rnd):
+    text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randrange(1, 6)))
+    if rnd.random() < 1 / 3:
+        lines = [text] + [" ".join(rnd.choice(WORDS) for _ in range(3))
+                          for _ in range(rnd.randrange(1, 4))]
+        return "/* " + "\n   ".join(lines) + " */"
+    return "// " + text
+
+
+def _line(rnd, comment_density, ident_length, error_rate):
+    indent = "\t" if rnd.random() < 0.3 else "    " * rnd.randrange(3)
+    line = _statement(rnd, ident_length)
+    if rnd.random() < error_rate:
+        cut = rnd.randrange(len(line) + 1)
+        line = line[:cut] + rnd.choice(ILLEGAL) + line[cut:]
+    if rnd.random() < comment_density:
+        comment = _comment(rnd)
+        line = comment + "\n" + indent + line if comment.startswith("/*") else line + " " + comment
+    return indent + line + "\n"
+
+
+def make_corpus(size, comment_density=0.1, ident_length=6, error_rate=0.0, seed=0):
+    """About `size` characters (never less) of C-like text, cut at a line end."""
+    rnd = random.Random(seed)
+    pool = [_line(rnd, comment_density, ident_length, error_rate) for _ in range(POOL_SIZE)]
+    average = sum(map(len, pool)) / len(pool)
+    parts = []
+    total = 0
+    while total < size:
+        batch = rnd.choices(pool, k=int((size - total) / average) + 1)
+        parts += batch
+        total += sum(map(len, batch))
+    return "".join(parts)
+
+
+def write_corpus(path, size, comment_density=0.1, ident_length=6, error_rate=0.0, seed=0):
+    text = make_corpus(size, comment_density, ident_length, error_rate, seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return len(text)
+
+
+def make_token_source(size, rnd):
+    """About `size` characters of C tokens drawn at random, one blank apart,
+    with a string, a // comment and a stray "@" among them (no statements)."""
+    words = ["int", "x1", "total", "3.25", "42", '"text"', "// note\n", "==", "+", "(", ")",
+             "{", "}", ";", "while", "return", "count_2", "\n", "@"]
+    parts = []
+    length = 0
+    while length < size:
+        word = rnd.choice(words)
+        parts.append(word)
+        parts.append(" ")
+        length += len(word) + 1
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    print(make_corpus(600, comment_density=0.3, error_rate=0.1))
@@ -0,0 +1,307 @@
+# Incremental re-lexing after edits.
+# The lexers here are stateless between tokens, so the end of every token is
+# a restart checkpoint: scanning from it reproduces the rest of the stream.
+# relex() restarts at the last checkpoint before the edit, scans the new text,
+# and stops as soon as it produces a token that the old stream also has at
+# the same (shifted) position past the edit -- from there on the two streams
+# are identical. Only the tokens in between are replaced.
+#
+# Nothing is proportional to the size of the buffer:
+#   text    -- kept in chunks of about CHUNK characters; an edit rebuilds one
+#              chunk, and the scan runs over a window cut from the chunks
+#              around the edit, grown only if a token reaches its end.
+#   lines   -- each chunk keeps its newline count, and a SourceIndex of it is
+#              built the first time position() looks inside it, so placing
+#              an offset never indexes the whole text.
+#   tokens  -- a gap buffer of two column stacks. Tokens before the gap are
+#              stored with their offsets; tokens after it in reverse order and
+#              less a common _shift, so an edit before them moves them all by
+#              changing one number. Moving the gap to the next edit costs the
+#              number of tokens in between (array slices, not a Python loop).
+#
+# One dependency is not local: "/*" with no "*/" anywhere after it lexes as
+# the operators / and *. A window may end before the "*/", so such a token is
+# only kept once the rest of the text has been searched for the closer; and
+# an edit that brings a "*/" into existence restarts from the first
+# unterminated opener before it. The starts of those opener tokens are kept
+# in a second gap buffer that moves and shifts with the token columns, so
+# finding the first one does not search the text.
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from itertools import accumulate
+
+from master_lexer import c_lexer
+from source_index import SourceIndex
+from token_buffer import TokenBuffer
+
+CHUNK = 1 << 16
+WINDOW = 1 << 12   # initial scan window past the edit
+MARGIN = 16        # tokens ending this close to the window end are rescanned
+
+# index: first token replaced; removed/inserted: (kind, start, end) lists,
+# removed in old-text offsets and inserted in new-text offsets
+TokenDiff = namedtuple("TokenDiff", "index removed inserted")
+
+
+class IncrementalLexer:
+    def __init__(self, text, lexer=None, block_comment=("/*", "*/")):
+        self.lexer = lexer or c_lexer()
+        self.block_comment = block_comment
+        self._chunks = [text[i:i + CHUNK] for i in range(0, len(text), CHUNK)] or [""]
+        self._chunk_newlines = [chunk.count("\n") for chunk in self._chunks]
+        self._chunk_index = [None] * len(self._chunks)
+        self._reindex()
+        # before the gap: offsets; after the gap: reversed, offset - _shift
+        self._kind_l, self._start_l, self._end_l = array("i"), array("q"), array("q")
+        self._kind_r, self._start_r, self._end_r = array("i"), array("q"), array("q")
+        # starts of the unterminated opener tokens, split and stored the same way
+        self._open_l, self._open_r = array("q"), array("q")
+        self._shift = 0
+        for kind, start, end in self.lexer.scan(text):
+            self._kind_r.append(kind)
+            self._start_r.append(start)
+            self._end_r.append(end)
+            if self._is_opener(text, start, end):
+                self._open_r.append(start)
+        for column in (self._kind_r, self._start_r, self._end_r, self._open_r):
+            column.reverse()
+
+    # ---- text chunks ----
+
+    def _reindex(self):
+        self._chunk_start = [0, *accumulate(map(len, self._chunks))]
+        self.length = self._chunk_start.pop()
+        self._chunk_line = [0, *accumulate(self._chunk_newlines)]
+        self._chunk_line.pop()
+
+    def _index_of(self, i):
+        """SourceIndex of chunk i, built on first use."""
+        index = self._chunk_index[i]
+        if index is None:
+            index = self._chunk_index[i] = SourceIndex(self._chunks[i])
+        return index
+
+    def position(self, offset):
+        """(line, column) of `offset` in the current text, 1-based."""
+        i = self._chunk_at(offset)
+        line, column = self._index_of(i).position(offset - self._chunk_start[i])
+        if line == 1:
+            # the line began in an earlier chunk: find its last newline
+            j = i - 1
+            while j >= 0 and not self._chunk_newlines[j]:
+                j -= 1
+            line_start = self._chunk_start[j] + self._index_of(j).line_starts[-1] if j >= 0 else 0
+            column = offset - line_start + 1
+        return self._chunk_line[i] + line, column
+
+    def _chunk_at(self, offset):
+        return max(bisect_right(self._chunk_start, offset) - 1, 0)
+
+    def _slice(self, lo, hi):
+        i = self._chunk_at(lo)
+        parts = []
+        while lo < hi and i < len(self._chunks):
+            start = self._chunk_start[i]
+            parts.append(self._chunks[i][lo - start:hi - start])
+            lo = start + len(self._chunks[i])
+            i += 1
+        return "".join(parts)
+
+    def _find(self, sub, lo, hi=None):
+        """text.find(sub, lo, hi) over the chunks."""
+        hi = self.length if hi is None else hi
+        i = self._chunk_at(lo)
+        while i < len(self._chunks) and self._chunk_start[i] < hi:
+            start = self._chunk_start[i]
+            # the chunk plus enough of the next one for a match across the seam
+            stop = min(start + len(self._chunks[i]) + len(sub) - 1, hi)
+            pos = self._slice(max(lo, start), stop).find(sub)
+            if pos != -1:
+                return max(lo, start) + pos
+            i += 1
+        return -1
+
+    def _replace_text(self, edit_start, edit_end, new_text):
+        first = self._chunk_at(edit_start)
+        last = self._chunk_at(edit_end)
+        merged = (self._chunks[first][:edit_start - self._chunk_start[first]] + new_text
+                  + self._chunks[last][edit_end - self._chunk_start[last]:])
+        pieces = [merged[i:i + CHUNK] for i in range(0, len(merged), CHUNK)]
+        self._chunks[first:last + 1] = pieces
+        self._chunk_newlines[first:last + 1] = [piece.count("\n") for piece in pieces]
+        self._chunk_index[first:last + 1] = [None] * len(pieces)
+        if not self._chunks:
+            self._chunks = [""]
+            self._chunk_newlines = [0]
+            self._chunk_index = [None]
+        self._reindex()
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+    # ---- token gap buffer ----
+
+    def __len__(self):
+        return len(self._kind_l) + len(self._kind_r)
+
+    def token(self, i):
+        """(kind, start, end) of token i in the current text."""
+        left = len(self._kind_l)
+        if i < left:
+            return self._kind_l[i], self._start_l[i], self._end_l[i]
+        j = len(self._kind_r) - 1 - (i - left)
+        if j < 0:
+            raise IndexError("token index out of range")
+        return self._kind_r[j], self._start_r[j] + self._shift, self._end_r[j] + self._shift
+
+    def _end_of(self, i):
+        return self.token(i)[2]
+
+    def _start_of(self, i):
+        return self.token(i)[1]
+
+    def _is_opener(self, text, start, end):
+        """Whether the token text[start:end] is a comment opener lexed as an operator."""
+        if self.block_comment is None:
+            return False
+        opener = self.block_comment[0]
+        return end - start < len(opener) and text.startswith(opener, start)
+
+    def _move_gap(self, index):
+        left = len(self._kind_l)
+        if index == left:
+            return
+        self._move_openers(self._start_of(index) if index < len(self) else self.length + 1)
+        columns = ((self._kind_l, self._kind_r, 0),
+                   (self._start_l, self._start_r, self._shift),
+                   (self._end_l, self._end_r, self._shift))
+        for column_l, column_r, shift in columns:
+            if index < left:
+                moved = column_l[index:]
+                del column_l[index:]
+                shift = -shift
+                target = column_r
+            else:
+                moved = column_r[len(column_r) - (index - left):]
+                del column_r[len(column_r) - (index - left):]
+                target = column_l
+            moved.reverse()
+            if shift:
+                moved = array(moved.typecode, [offset + shift for offset in moved])
+            target.extend(moved)
+
+    def _move_openers(self, boundary):
+        """Move the gap of the opener starts to `boundary` (a token start)."""
+        open_l, open_r, shift = self._open_l, self._open_r, self._shift
+        if open_l and open_l[-1] >= boundary:
+            i = bisect_left(open_l, boundary)
+            moved = array("q", [offset - shift for offset in reversed(open_l[i:])])
+            del open_l[i:]
+            open_r.extend(moved)
+        elif open_r and open_r[-1] + shift < boundary:
+            # open_r is descending: the starts before the boundary are at its end
+            i = bisect_right(range(len(open_r)), shift - boundary, key=lambda j: -open_r[j])
+            moved = array("q", [offset + shift for offset in reversed(open_r[i:])])
+            del open_r[i:]
+            open_l.extend(moved)
+
+    def tokens(self):
+        """All tokens as a TokenBuffer over the current text."""
+        self._move_gap(len(self))
+        lexer = self.lexer
+        return TokenBuffer.from_spans(self.text, zip(self._kind_l, self._start_l, self._end_l),
+                                      lexer.kind_names, lexer.kind_labels, lexer.display)
+
+    def _unterminated_opener(self, before):
+        """Index of the first unterminated comment opener token if it starts before `before`."""
+        if self._open_l:
+            pos = self._open_l[0]
+        elif self._open_r:
+            pos = self._open_r[-1] + self._shift
+        else:
+            return None
+        if pos >= before:
+            return None
+        return bisect_left(range(len(self)), pos, key=self._start_of)
+
+    # ---- editing ----
+
+    def relex(self, edit_start, edit_end, new_text):
+        """Replace text[edit_start:edit_end] with new_text; return the TokenDiff."""
+        edited_end = edit_start + len(new_text)
+
+        # restart after the last token that ends before the edit
+        first = bisect_left(range(len(self)), edit_start, key=self._end_of)
+        if self.block_comment is not None:
+            closer = self.block_comment[1]
+            seam = len(closer) - 1
+            around = (self._slice(max(edit_start - seam, 0), edit_start) + new_text
+                      + self._slice(edit_end, edit_end + seam))
+            if closer in around:
+                opener = self._unterminated_opener(edit_start)
+                if opener is not None:
+                    first = min(first, opener)
+        self._move_gap(first)
+        pos = self._end_l[-1] if first else 0
+        self._replace_text(edit_start, edit_end, new_text)
+        new_length = self.length
+        # tokens after the gap move by the length change
+        old_shift = self._shift
+        new_shift = self._shift = old_shift + len(new_text) - (edit_end - edit_start)
+
+        kr, sr, er, open_r = self._kind_r, self._start_r, self._end_r, self._open_r
+        removed = []
+        inserted = []
+        openers = []      # starts of the inserted unterminated openers
+        scan = self.lexer.scan
+        opener = self.block_comment[0] if self.block_comment else None
+        hi = min(max(pos, edited_end) + WINDOW, new_length)
+        synced = False
+        while not synced:
+            lo = max(pos - 1, 0)      # one character of look-behind context
+            window = self._slice(lo, hi)
+            at_end = hi == new_length
+            limit = len(window) - MARGIN
+            for kind, start, end in scan(window, pos - lo):
+                is_opener = self._is_opener(window, start, end)
+                if not at_end:
+                    if end > limit:
+                        break         # may continue past the window
+                    if is_opener:
+                        close = self._find(self.block_comment[1], lo + start + len(opener))
+                        if close != -1:
+                            hi = close
+                            break     # a comment after all; rescan up to its end
+                start += lo
+                end += lo
+                if start >= edited_end:
+                    # drop old tokens that overlap the edit or start before this one
+                    while kr and sr[-1] + new_shift < start:
+                        if open_r and open_r[-1] == sr[-1]:
+                            open_r.pop()
+                        removed.append((kr.pop(), sr.pop() + old_shift, er.pop() + old_shift))
+                    if (kr and sr[-1] + new_shift == start and er[-1] + new_shift == end
+                            and kr[-1] == kind):
+                        synced = True
+                        break
+                inserted.append((kind, start, end))
+                if is_opener:
+                    openers.append(start)
+                pos = end
+            else:
+                if at_end:
+                    while kr:
+                        removed.append((kr.pop(), sr.pop() + old_shift, er.pop() + old_shift))
+                    del open_r[:]
+                    synced = True
+            hi = min(hi + max(WINDOW, hi - lo), new_length)
+
+        for kind, start, end in inserted:
+            self._kind_l.append(kind)
+            self._start_l.append(start)
+            self._end_l.append(end)
+        self._open_l.extend(openers)
+        return TokenDiff(first, removed, inserted)
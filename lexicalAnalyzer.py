@@ -1,37 +1,21 @@
-import re
+from master_lexer import simple_lexer
 
-# Define token categories
-keywords = {"int", "float", "if", "else", "while", "for", "return"}
-operators = {"=", "+", "-", "*", "/", "==", "!="}
-separators = {";", ",", "(", ")", "{", "}"}
+# Token categories (keywords, operators, separators) live in master_lexer.py;
+# the combined pattern is compiled once and classifies each lexeme as it matches.
+_lexer = simple_lexer()
 
 def lexer(statement):
-    # Regex: match identifiers, numbers, operators, separators, or invalid chunks
-    tokens = re.findall(r'[A-Za-z_]\w*|\d+|==|!=|=|\+|\-|\*|/|;|,|\(|\)|\{|\}|\S+', statement)
-    
-    result = []
-    for tok in tokens:
-        if tok in keywords:
-            result.append((tok, "Keyword"))
-        elif tok in operators:
-            result.append((tok, "Operator"))
-        elif tok in separators:
-            result.append((tok, "Separator"))
-        elif re.fullmatch(r'\d+', tok):
-            result.append((tok, "Number"))
-        elif re.fullmatch(r'[A-Za-z_]\w*', tok):
-            result.append((tok, "Identifier"))
-        else:
-            result.append((tok, "Invalid"))
-    return result
+    # (lexeme, token type) pairs; _lexer.tokenize() gives a TokenBuffer instead
+    return _lexer.lex(statement)
 
 
 # -------- Main Program --------
-statement = input("Enter a statement: ") # ইউজার ইনপুট নেবে
-# statement = "int a = b + 10c + 7;"  
-output = lexer(statement)
+if __name__ == "__main__":
+    statement = input("Enter a statement: ") # ইউজার ইনপুট নেবে
+    # statement = "int a = b + 10c + 7;"  
+    output = lexer(statement)
 
-print("\nLexeme\t\tToken Type")
-print("---------------------------")
-for lex, typ in output:
-    print(f"{lex:10}\t{typ}")
+    print("\nLexeme\t\tToken Type")
+    print("---------------------------")
+    for lex, typ in output:
+        print(f"{lex:10}\t{typ}")
@@ -0,0 +1,387 @@
+# Shared master-pattern lexer.
+# All token rules are joined into ONE named-group regex that is compiled once.
+# The token kind comes straight from match.lastgroup through a precomputed
+# kind-id table, so no lexeme is scanned a second time to classify it.
+#
+# lex() can go one step further (memo=True): a match object per token costs
+# more than the classification it replaces, so the lexemes are collected by
+# findall() in C and each DISTINCT lexeme is resolved through lastgroup once.
+# That is only valid when a token's kind depends on its text alone.
+#
+# Comments can bypass the regex (comments=...): the text is cut at comment
+# openers found with str.find(), only the code between comments goes through
+# the pattern, and a comment is one find() for its closer. A block opener
+# with no closer after it is code (/* lexes as the operators / and *, as the
+# lazy regex decides), and since no later opener can have a closer either,
+# the closer is searched for once: unterminated openers cost O(n) in total,
+# where the regex rescans the rest of the text for each one. This needs
+# rules in which an opener can only appear at a token boundary.
+#
+# keep_trivia=False drops the comments and the `whitespace` rules from the
+# output; the whitespace rules also leave the pattern, so blank runs are
+# jumped over by finditer()'s search in C instead of matched one by one.
+
+import re
+
+from token_buffer import TokenBuffer
+
+_MISSING = object()
+
+
+class MasterLexer:
+    """Single-pass lexer built from a list of (group_name, regex) rules.
+
+    rules         -- (group_name, regex) pairs, in priority order
+    labels        -- {group_name: label} printed by lex(); defaults to the name
+    keywords      -- lexemes of `keyword_group` that are reported as KEYWORD
+    skip          -- group names whose matches are dropped
+    display       -- {group_name: text} shown by lex() instead of the lexeme
+    memo          -- memoize (lexeme -> token) in lex(); see the note above
+    comments      -- (group_name, line_opener, (block_opener, block_closer)):
+                     comments of that rule are found with str.find(); either
+                     opener may be None
+    whitespace    -- group names of rules that match whitespace only
+    keep_trivia   -- False drops comments and whitespace from the output
+    """
+
+    MEMO_LIMIT = 1 << 16
+
+    def __init__(self, rules, labels=None, keywords=(), keyword_group="IDENTIFIER",
+                 keyword_label="Keyword", skip=(), display=None, flags=0, memo=False,
+                 comments=None, whitespace=(), keep_trivia=True):
+        labels = labels or {}
+        # kind id -> name / label; the keyword kind is appended after the rules
+        self.kind_names = [name for name, _ in rules] + ["KEYWORD"]
+        self.kind_labels = [labels.get(name, name) for name, _ in rules] + [keyword_label]
+        self.KEYWORD = len(rules)
+        # lastgroup -> kind id (the dispatch table)
+        self.kind_of = {name: kind for kind, name in enumerate(self.kind_names)}
+
+        self.keywords = frozenset(keywords)
+        self.keyword_group = self.kind_of[keyword_group] if self.keywords else -1
+        self.display = [None] * len(self.kind_names)
+        for name, text in (display or {}).items():
+            self.display[self.kind_of[name]] = text
+
+        # rules handled outside the pattern
+        skip = set(skip)
+        outside = set()
+        self.comment_kind = -1
+        self.line_comment = self.block_comment = None
+        if comments is not None:
+            group, self.line_comment, self.block_comment = comments
+            self.comment_kind = self.kind_of[group]
+            outside.add(group)
+            if not keep_trivia:
+                skip.add(group)
+        if not keep_trivia:
+            skip.update(whitespace)
+            outside.update(whitespace)
+        self.skip = frozenset(self.kind_of[name] for name in skip)
+        self.keep_trivia = keep_trivia
+        code_rules = [(name, regex) for name, regex in rules if name not in outside]
+        self.pattern = re.compile(
+            "|".join(f"(?P<{name}>{regex})" for name, regex in code_rules), flags)
+
+        # same alternation without named groups, so findall() returns lexemes
+        self.plain = None
+        self.memo = {}
+        if memo:
+            plain = re.compile("|".join(f"(?:{regex})" for _, regex in code_rules), flags)
+            if plain.groups == 0:
+                self.plain = plain
+
+    def _segments(self, text, pos, endpos, unterminated=None):
+        """Cut text[pos:endpos] at its comments.
+
+        Yields (code_end, comment_end) pairs: the code runs from the previous
+        pair's comment_end (at first, pos) to code_end, and the comment from
+        code_end to comment_end; the last pair is (endpos, endpos). The offset
+        of the first unterminated block opener is appended to `unterminated`.
+        """
+        if self.comment_kind == -1:
+            yield endpos, endpos
+            return
+        find = text.find
+        line = self.line_comment
+        opener, closer = self.block_comment or (None, None)
+        next_line = find(line, pos, endpos) if line else -1
+        next_block = find(opener, pos, endpos) if opener else -1
+        while next_line != -1 or next_block != -1:
+            if next_block == -1 or next_line != -1 and next_line < next_block:
+                start = next_line
+                end = find("\n", start, endpos)
+                if end == -1:
+                    end = endpos
+            else:
+                start = next_block
+                end = find(closer, start + len(opener), endpos)
+                if end == -1:
+                    # code, like every later opener: none of them has a closer
+                    if unterminated is not None:
+                        unterminated.append(start)
+                    next_block = -1
+                    continue
+                end += len(closer)
+            yield start, end
+            if next_line != -1 and next_line < end:
+                next_line = find(line, end, endpos)
+            if next_block != -1 and next_block < end:
+                next_block = find(opener, end, endpos)
+        yield endpos, endpos
+
+    def unterminated_comment(self, text, pos=0, endpos=None):
+        """Offset of the first block comment opener with no closer, or -1."""
+        found = []
+        for _ in self._segments(text, pos, len(text) if endpos is None else endpos, found):
+            pass
+        return found[0] if found else -1
+
+    def scan(self, text, pos=0, endpos=None):
+        """Yield (kind_id, start, end) for every token of `text`."""
+        kind_of = self.kind_of
+        keyword_group = self.keyword_group
+        keywords = self.keywords
+        KEYWORD = self.KEYWORD
+        skip = self.skip
+        comment = -1 if self.comment_kind in skip else self.comment_kind
+        finditer = self.pattern.finditer
+        if endpos is None:
+            endpos = len(text)
+        for code_end, comment_end in self._segments(text, pos, endpos):
+            for match in finditer(text, pos, code_end):
+                kind = kind_of[match.lastgroup]
+                if kind in skip:
+                    continue
+                start, end = match.span()
+                if kind == keyword_group and text[start:end] in keywords:
+                    kind = KEYWORD
+                yield kind, start, end
+            if comment != -1 and comment_end != code_end:
+                yield comment, code_end, comment_end
+            pos = comment_end
+
+    def tokenize(self, text, pos=0, endpos=None):
+        """Return a TokenBuffer: array columns, lexemes cut from `text` on request.
+
+        Slower than lex() (a match object per token, where lex() shares its
+        memoized tuples); use it for the offsets, the lines or the footprint.
+        """
+        buf = TokenBuffer(text, self.kind_names, self.kind_labels, self.display)
+        self.fill_columns((buf.kind, buf.start, buf.end, buf.line), text, pos, endpos)
+        return buf
+
+    def fill_columns(self, columns, text, pos=0, endpos=None, base=0, line=None):
+        """Append the tokens of text[pos:endpos] to the (kind, start, end, line) arrays.
+
+        `base` is added to every offset and `line` is the line number at pos
+        (default: counted from the start of text), so a piece of a larger
+        text can be lexed straight into that text's positions.
+        """
+        kinds, starts, ends, lines = columns
+        kind_of = self.kind_of
+        keyword_group = self.keyword_group
+        keywords = self.keywords
+        KEYWORD = self.KEYWORD
+        skip = self.skip
+        comment = -1 if self.comment_kind in skip else self.comment_kind
+        finditer = self.pattern.finditer
+        count = text.count
+        if line is None:
+            line = 1 + count("\n", 0, pos)
+        last = pos
+        if endpos is None:
+            endpos = len(text)
+        # scan() inlined: the columns are filled straight from the matches
+        for code_end, comment_end in self._segments(text, pos, endpos):
+            for match in finditer(text, pos, code_end):
+                kind = kind_of[match.lastgroup]
+                if kind in skip:
+                    continue
+                start, end = match.span()
+                if kind == keyword_group and text[start:end] in keywords:
+                    kind = KEYWORD
+                line += count("\n", last, start)
+                last = start
+                kinds.append(kind)
+                starts.append(start + base)
+                ends.append(end + base)
+                lines.append(line)
+            if comment != -1 and comment_end != code_end:
+                line += count("\n", last, code_end)
+                last = code_end
+                kinds.append(comment)
+                starts.append(code_end + base)
+                ends.append(comment_end + base)
+                lines.append(line)
+            pos = comment_end
+
+    def lex(self, text):
+        """Return a list of (lexeme, label) tuples."""
+        if self.plain is None:
+            return self._lex_matches(text)
+        memo = self.memo
+        get = memo.get
+        classify = self._classify
+        findall = self.plain.findall
+        comment = -1 if self.comment_kind in self.skip else self.comment_kind
+        result = []
+        append = result.append
+        pos = 0
+        for code_end, comment_end in self._segments(text, 0, len(text)):
+            for lexeme in findall(text, pos, code_end):
+                token = get(lexeme, _MISSING)
+                if token is _MISSING:
+                    token = classify(lexeme)
+                if token is not None:
+                    append(token)
+            if comment != -1 and comment_end != code_end:
+                append((self.display[comment] or text[code_end:comment_end],
+                        self.kind_labels[comment]))
+            pos = comment_end
+        return result
+
+    def _classify(self, lexeme):
+        kind = self.kind_of[self.pattern.fullmatch(lexeme).lastgroup]
+        if kind in self.skip:
+            token = None
+        else:
+            if kind == self.keyword_group and lexeme in self.keywords:
+                kind = self.KEYWORD
+            token = (self.display[kind] or lexeme, self.kind_labels[kind])
+        if len(self.memo) < self.MEMO_LIMIT:
+            self.memo[lexeme] = token
+        return token
+
+    def _lex_matches(self, text):
+        kind_of = self.kind_of
+        keyword_group = self.keyword_group
+        keywords = self.keywords
+        KEYWORD = self.KEYWORD
+        skip = self.skip
+        labels = self.kind_labels
+        display = self.display
+        comment = -1 if self.comment_kind in skip else self.comment_kind
+        finditer = self.pattern.finditer
+        result = []
+        append = result.append
+        pos = 0
+        for code_end, comment_end in self._segments(text, 0, len(text)):
+            for match in finditer(text, pos, code_end):
+                kind = kind_of[match.lastgroup]
+                if kind in skip:
+                    continue
+                lexeme = match.group()
+                if kind == keyword_group and lexeme in keywords:
+                    kind = KEYWORD
+                append((display[kind] or lexeme, labels[kind]))
+            if comment != -1 and comment_end != code_end:
+                append((display[comment] or text[code_end:comment_end], labels[comment]))
+            pos = comment_end
+        return result
+
+    def kind_name(self, kind):
+        return self.kind_names[kind]
+
+    def kind_label(self, kind):
+        return self.kind_labels[kind]
+
+
+# -------- Rule sets used in this repo --------
+
+# lexicalAnalyzer.py
+SIMPLE_KEYWORDS = {"int", "float", "if", "else", "while", "for", "return"}
+SIMPLE_RULES = [
+    ("IDENTIFIER", r'[A-Za-z_]\w*'),
+    ("NUMBER",     r'\d+'),
+    ("OPERATOR",   r'==|!=|=|\+|\-|\*|/'),
+    ("SEPARATOR",  r'[;,(){}]'),
+    ("INVALID",    r'\S+'),
+]
+SIMPLE_LABELS = {
+    "IDENTIFIER": "Identifier",
+    "NUMBER":     "Number",
+    "OPERATOR":   "Operator",
+    "SEPARATOR":  "Separator",
+    "INVALID":    "Invalid",
+}
+
+# Final_exam/lab_01.py
+C_KEYWORDS = {"int", "float", "char", "double", "if", "else", "while", "for", "return",
+              "void", "main", "include", "printf", "scanf", "const", "static"}
+# the fixed-string token classes, also used by aho_corasick.c_fixed_tokens()
+C_OPERATORS = ("==", "!=", "<=", ">=", "++", "--", "&&", "||",
+               "+", "-", "*", "/", "=", "<", ">", "!", "&", "|", "^", "~", "%")
+C_PUNCTUATION = (";", ",", "(", ")", "{", "}", "[", "]", ".", "?", ":")
+
+
+def _alternation(strings):
+    """Regex matching any of `strings`, longer alternatives tried first."""
+    longer = [re.escape(s) for s in sorted(strings, key=len, reverse=True) if len(s) > 1]
+    single = "".join(re.escape(s) for s in strings if len(s) == 1)
+    return "|".join(longer + ([f"[{single}]"] if single else []))
+
+
+C_RULES = [
+    ("COMMENT",     r'/\*[\s\S]*?\*/|//.*?$'),
+    ("IDENTIFIER",  r'[A-Za-z_]\w*'),
+    ("FLOAT",       r'\d+\.\d+'),
+    ("INVALID",     r'\d+\.'),
+    ("INTEGER",     r'\d+'),
+    ("OPERATOR",    _alternation(C_OPERATORS)),
+    ("PUNCTUATION", _alternation(C_PUNCTUATION)),
+    # whitespace runs: a run with a newline is a Newline, else with a tab a Tab,
+    # a single blank is a White space; any other run is dropped
+    ("NEWLINE",     r'[^\S\n]*\n\s*'),
+    ("TAB",         r'[^\S\n]*\t[^\S\n]*'),
+    ("SPACE",       r' (?!\s)'),
+    ("WHITESPACE",  r'\s+'),
+]
+C_LABELS = {
+    "COMMENT":     "Comment",
+    "IDENTIFIER":  "Identifier",
+    "FLOAT":       "Float Constant",
+    "INVALID":     "Invalid",
+    "INTEGER":     "Integer Constant",
+    "OPERATOR":    "Operator",
+    "PUNCTUATION": "Punctuation",
+    "NEWLINE":     "Newline",
+    "TAB":         "Tab",
+    "SPACE":       "White space",
+}
+C_DISPLAY = {"NEWLINE": "\\n", "TAB": "\\t", "SPACE": "space"}
+C_COMMENTS = ("COMMENT", "//", ("/*", "*/"))
+C_WHITESPACE = ("NEWLINE", "TAB", "SPACE", "WHITESPACE")
+
+# the DFA scanner benchmarks (scanner_tables, scanner_codegen, bench_lexers):
+# only syntax regex_nfa accepts, and no KEYWORD rule -- ahead of IDENT it
+# would make re cut "integer" into "int" and "eger" while the DFA's longest
+# match keeps one IDENT, and build_tables() refuses such rules. Keywords are
+# IDENT tokens, told apart by a set lookup.
+DFA_C_RULES = [
+    ("IDENT",    r"[a-zA-Z_]\w*"),
+    ("FLOAT",    r"\d+\.\d+"),
+    ("INT",      r"\d+"),
+    ("STRING",   r'"[^"\n]*"'),
+    ("COMMENT",  r"//[^\n]*"),
+    ("OP",       r"==|!=|<=|>=|&&|\|\||[+\-*/%=<>!&|]"),
+    ("PUNCT",    r"[(){}\[\];,.]"),
+    ("SKIP",     r"[ \t\n]+"),
+    ("MISMATCH", r"."),
+]
+
+
+def simple_lexer():
+    return MasterLexer(SIMPLE_RULES, SIMPLE_LABELS, SIMPLE_KEYWORDS, memo=True)
+
+
+def c_lexer(keep_trivia=True):
+    return MasterLexer(C_RULES, C_LABELS, C_KEYWORDS, skip=("WHITESPACE",),
+                       display=C_DISPLAY, flags=re.MULTILINE, memo=True,
+                       comments=C_COMMENTS, whitespace=C_WHITESPACE, keep_trivia=keep_trivia)
+
+
+if __name__ == "__main__":
+    lexer = c_lexer()
+    for lexeme, label in lexer.lex("int sum = a + b * 10; // total"):
+        print(f"{lexeme:<12}\t{label}")
@@ -0,0 +1,145 @@
+# Multi-process lexing of large C sources with the lab_01 rules (c_lexer()).
+# The text is cut at split points that are token boundaries in every
+# sequential run, the chunks are lexed in a ProcessPoolExecutor, and the
+# per-chunk TokenBuffer columns are concatenated. Each chunk is sent with the
+# character offset and line number it starts at, so the workers return
+# columns that already hold global positions and the merge is plain
+# array.extend().
+#
+# A safe split point is the first non-blank character after a blank run that
+# contains a newline, outside any block comment: the C rules turn such a run
+# into one NEWLINE token (no other rule can consume a newline, except a block
+# comment), so a token always starts there. Whether a point is inside a block
+# comment is decided by a pre-scan that walks the comment openers with
+# str.find(), following the lexer's rules:
+#   //  runs to the end of its line
+#   /*  is a comment only if a closing */ follows, otherwise it lexes as
+#       the operators / and *
+# Nothing but comments can hide a comment opener in these rules (there is no
+# string literal rule), so the pre-scan and the lexer always agree.
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from master_lexer import c_lexer
+from token_buffer import TokenBuffer
+
+MIN_CHUNK = 1 << 20
+
+
+def _skip_comments(text, pos, limit, unclosed=False):
+    """Walk the comments that start in text[pos:limit].
+
+    Returns (pos, inside, unclosed): the position reached, whether a block
+    comment runs past `limit` (pos is then the end of that comment), and
+    whether a /* with no closer has been seen. Pass `unclosed` back in: no
+    later /* can have a closer either, so openers are not searched for again
+    and unterminated ones cost O(n) in total, as in MasterLexer._segments().
+    """
+    find = text.find
+    line = find("//", pos, limit)
+    block = -1 if unclosed else find("/*", pos, limit)
+    while line != -1 or block != -1:
+        if block == -1 or line != -1 and line < block:
+            end = find("\n", line)
+            if end == -1 or end >= limit:
+                return limit, False, unclosed
+        else:
+            close = find("*/", block + 2)
+            if close == -1:
+                # the operators / and *, like every later opener
+                unclosed = True
+                block = -1
+                continue
+            end = close + 2
+            if end > limit:
+                return end, True, unclosed
+        if line != -1 and line < end:
+            line = find("//", end, limit)
+        if block != -1 and block < end:
+            block = find("/*", end, limit)
+    return limit, False, unclosed
+
+
+def _line_start(text, pos):
+    """First non-blank character after a newline at or after `pos`, or -1."""
+    newline = text.find("\n", pos)
+    if newline == -1:
+        return -1
+    n = len(text)
+    i = newline + 1
+    while i < n and text[i].isspace():
+        i += 1
+    return i if i < n else -1
+
+
+def split_points(text, chunks):
+    """Offsets that cut `text` into about `chunks` pieces at safe token boundaries."""
+    points = []
+    scanned = 0
+    unclosed = False
+    for k in range(1, chunks):
+        target = max(len(text) * k // chunks, scanned)
+        while True:
+            point = _line_start(text, target)
+            if point == -1:
+                return points
+            scanned, inside, unclosed = _skip_comments(text, scanned, point, unclosed)
+            if not inside:
+                break
+            target = scanned          # the comment ends past `point`; look after it
+        if not points or point > points[-1]:
+            points.append(point)
+        scanned = point
+    return points
+
+
+# ---- workers ----
+
+_lexer = None
+
+
+def _init_worker(factory):
+    global _lexer
+    _lexer = factory()
+
+
+def _lex_chunk(chunk, base, line_base, typecode):
+    columns = array("i"), array(typecode), array(typecode), array("i")
+    _lexer.fill_columns(columns, chunk, base=base, line=line_base + 1)
+    return columns
+
+
+def parallel_tokenize(text, workers=None, chunks=None, lexer_factory=c_lexer):
+    """TokenBuffer of `text`, lexed in parallel; identical to lexer_factory().tokenize(text)."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunks is None:
+        chunks = min(workers, max(1, len(text) // MIN_CHUNK))
+    lexer = lexer_factory()
+    if workers <= 1 or chunks <= 1:
+        return lexer.tokenize(text)
+
+    bounds = [0] + split_points(text, chunks) + [len(text)]
+    result = TokenBuffer(text, lexer.kind_names, lexer.kind_labels, lexer.display)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(lexer_factory,)) as pool:
+        # the line each chunk starts on comes from the result's own index,
+        # built once here and shared with later position() lookups
+        line = result.index.line
+        futures = [pool.submit(_lex_chunk, text[lo:hi], lo, line(lo) - 1, result.start.typecode)
+                   for lo, hi in zip(bounds, bounds[1:])]
+        for future in futures:
+            kinds, starts, ends, lines = future.result()
+            result.kind.extend(kinds)
+            result.start.extend(starts)
+            result.end.extend(ends)
+            result.line.extend(lines)
+    return result
+
+
+def parallel_tokenize_file(path, workers=None, chunks=None, lexer_factory=c_lexer):
+    with open(path, encoding="utf-8", newline="") as f:
+        text = f.read()
+    return parallel_tokenize(text, workers, chunks, lexer_factory)
@@ -0,0 +1,71 @@
+# Offset -> (line, column) lookup for a source text.
+# The offsets where lines start are collected once, with find() jumping from
+# newline to newline, into an array; after that any offset is placed with one
+# bisect, O(log lines), instead of counting newlines from the start of the
+# text per reported position. find() is all it needs, so a str, bytes or a
+# memory-mapped file can be indexed without a copy, and extend() indexes a
+# long source a piece at a time, as a streaming reader gets to it.
+
+from array import array
+from bisect import bisect_right
+
+
+class SourceIndex:
+    """Line starts of `source`; lines and columns are 1-based."""
+
+    def __init__(self, source, end=None):
+        """Index the lines of source[:end], by default all of it."""
+        self.source = source
+        self._newline = "\n" if isinstance(source, str) else b"\n"
+        self.line_starts = array("q", [0])
+        self.indexed = 0
+        self.extend(len(source) if end is None else end)
+
+    def extend(self, end):
+        """Index the newlines of source[:end] not indexed yet."""
+        if end <= self.indexed:
+            return
+        append = self.line_starts.append
+        find = self.source.find
+        newline = self._newline
+        pos = find(newline, self.indexed, end)
+        while pos != -1:
+            append(pos + 1)
+            pos = find(newline, pos + 1, end)
+        self.indexed = end
+
+    def __len__(self):
+        """Number of lines (a text ending in a newline has an empty last line)."""
+        return len(self.line_starts)
+
+    def line(self, offset):
+        return bisect_right(self.line_starts, offset)
+
+    def position(self, offset):
+        """(line, column) of `offset`."""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def positions(self, offsets):
+        """[(line, column), ...] for many offsets."""
+        starts = self.line_starts
+        result = []
+        append = result.append
+        for offset in offsets:
+            line = bisect_right(starts, offset)
+            append((line, offset - starts[line - 1] + 1))
+        return result
+
+    def line_span(self, line):
+        """(start, end) offsets of `line`, without its newline."""
+        start = self.line_starts[line - 1]
+        if line < len(self.line_starts):
+            return start, self.line_starts[line] - 1
+        return start, len(self.source)
+
+    def line_text(self, line):
+        start, end = self.line_span(line)
+        return self.source[start:end]
+
+    def __repr__(self):
+        return f"<SourceIndex {len(self)} lines>"
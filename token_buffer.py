@@ -0,0 +1,116 @@
+# Struct-of-arrays token storage.
+# A TokenBuffer keeps four parallel integer columns -- kind id, start offset,
+# end offset and line -- over the source text, 16 bytes per token, instead of
+# a (lexeme, label) tuple with two strings per token. Lexemes are cut from the
+# source only when asked for: a str slice for text, a zero-copy memoryview for
+# bytes-like sources.
+#
+# Iterating, indexing and slicing a TokenBuffer still give (lexeme, label)
+# pairs, and it compares equal to a list of the same pairs, so code written
+# for the list-of-tuples lexers keeps working.
+
+from array import array
+from collections.abc import Sequence
+
+from source_index import SourceIndex
+
+_OFFSET_LIMIT = 1 << 31   # past this the columns switch from 'i' to 'q'
+
+
+class TokenBuffer:
+    """Tokens of `source` as parallel array columns.
+
+    kind_names   -- kind id -> name
+    kind_labels  -- kind id -> label shown when iterating; defaults to the name
+    display      -- kind id -> text shown instead of the lexeme, or None
+    """
+
+    def __init__(self, source, kind_names, kind_labels=None, display=None):
+        self.source = source
+        self.kind_names = list(kind_names)
+        self.kind_labels = list(kind_labels) if kind_labels is not None else self.kind_names
+        self.display = list(display) if display is not None else [None] * len(self.kind_names)
+        typecode = "q" if len(source) >= _OFFSET_LIMIT else "i"
+        self.kind = array("i")
+        self.start = array(typecode)
+        self.end = array(typecode)
+        self.line = array("i")
+        self._view = None if isinstance(source, str) else memoryview(source)
+        self._index = None
+
+    @classmethod
+    def from_spans(cls, source, spans, kind_names, kind_labels=None, display=None):
+        """Build from (kind_id, start, end) tuples in source order; lines are counted here."""
+        buf = cls(source, kind_names, kind_labels, display)
+        newline = "\n" if isinstance(source, str) else b"\n"
+        count = source.count
+        kinds, starts, ends, lines = buf.kind, buf.start, buf.end, buf.line
+        line = 1
+        last = 0
+        for kind, start, end in spans:
+            line += count(newline, last, start)
+            last = start
+            kinds.append(kind)
+            starts.append(start)
+            ends.append(end)
+            lines.append(line)
+        return buf
+
+    def append(self, kind, start, end, line):
+        self.kind.append(kind)
+        self.start.append(start)
+        self.end.append(end)
+        self.line.append(line)
+
+    def __len__(self):
+        return len(self.kind)
+
+    def lexeme(self, i):
+        """Text of token i: a str slice, or a memoryview for bytes-like sources."""
+        if self._view is not None:
+            return self._view[self.start[i]:self.end[i]]
+        return self.source[self.start[i]:self.end[i]]
+
+    def token(self, i):
+        return self.kind[i], self.start[i], self.end[i], self.line[i]
+
+    @property
+    def index(self):
+        """SourceIndex of the source, built on first use and then shared."""
+        if self._index is None:
+            self._index = SourceIndex(self.source)
+        return self._index
+
+    def position(self, i):
+        """(line, column) where token i starts."""
+        line = self.line[i]
+        return line, self.start[i] - self.index.line_starts[line - 1] + 1
+
+    def __getitem__(self, i):
+        """(lexeme, label) of token i, as the list-returning lexers gave; a list of them for a slice."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        kind = self.kind[i]
+        return self.display[kind] or self.lexeme(i), self.kind_labels[kind]
+
+    def __iter__(self):
+        source = self.source if self._view is None else self._view
+        labels = self.kind_labels
+        display = self.display
+        for kind, start, end in zip(self.kind, self.start, self.end):
+            yield display[kind] or source[start:end], labels[kind]
+
+    def __eq__(self, other):
+        """Equal to another TokenBuffer or a sequence with the same (lexeme, label) pairs."""
+        if not isinstance(other, (TokenBuffer, Sequence)) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def nbytes(self):
+        """Bytes held by the columns (the source is not counted)."""
+        return sum(len(col) * col.itemsize for col in (self.kind, self.start, self.end, self.line))
+
+    def __repr__(self):
+        return f"<TokenBuffer {len(self)} tokens, {self.nbytes()} bytes>"